@@ -1,7 +1,9 @@
-from typing import AsyncGenerator, Optional, List
+from typing import AsyncGenerator, Optional, List, Tuple
+import asyncio
 import logging
-from datetime import datetime
-from app.domain.models.session import Session
+from datetime import datetime, timedelta, UTC
+from app.domain.models.session import Session, SessionMetadata
+from app.application.errors.exceptions import BadRequestError
 from app.domain.repositories.session_repository import SessionRepository
 
 from app.interfaces.schemas.session import ShellViewResponse
@@ -15,8 +17,9 @@ from app.domain.external.sandbox import Sandbox
 from app.domain.external.search import SearchEngine
 from app.domain.external.llm import LLM
 from app.domain.external.file import FileStorage
+from app.domain.external.session_notifier import SessionNotifier
 from app.domain.repositories.agent_repository import AgentRepository
-from app.domain.external.task import Task
+from app.domain.external.task import Task, TaskPriority
 from app.domain.utils.json_parser import JsonParser
 from app.domain.models.file import FileInfo
 from app.domain.repositories.mcp_repository import MCPRepository
@@ -25,6 +28,27 @@ from app.domain.models.session import SessionStatus
 # Set up logger
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _encode_session_cursor(session: Session) -> str:
+    """Encode the list position of a session as `<latest message epoch ms>_<session id>`"""
+    latest = session.latest_message_at
+    if latest is None:
+        return f"_{session.id}"
+    if latest.tzinfo is None:
+        # MongoDB returns naive UTC datetimes
+        latest = latest.replace(tzinfo=UTC)
+    return f"{(latest - _EPOCH) // timedelta(milliseconds=1)}_{session.id}"
+
+
+def _decode_session_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    millis, _, session_id = cursor.partition("_")
+    if not session_id or (millis and not millis.isdigit()):
+        raise BadRequestError("Invalid session list cursor")
+    return (_EPOCH + timedelta(milliseconds=int(millis)) if millis else None), session_id
+
+
 class AgentService:
     def __init__(
         self,
@@ -37,10 +61,13 @@ class AgentService:
         file_storage: FileStorage,
         mcp_repository: MCPRepository,
         search_engine: Optional[SearchEngine] = None,
+        session_notifier: Optional[SessionNotifier] = None,
+        dispatch_to_workers: bool = False,
     ):
         logger.info("Initializing AgentService")
         self._agent_repository = agent_repository
         self._session_repository = session_repository
+        self._session_notifier = session_notifier
         self._file_storage = file_storage
         self._scheduled_task_service = None
         self._agent_domain_service = AgentDomainService(
@@ -53,6 +80,7 @@ class AgentService:
             file_storage,
             mcp_repository,
             search_engine,
+            dispatch_to_workers=dispatch_to_workers,
         )
         self._llm = llm
         self._search_engine = search_engine
@@ -97,15 +125,33 @@ class AgentService:
         message: Optional[str] = None,
         timestamp: Optional[datetime] = None,
         event_id: Optional[str] = None,
-        attachments: Optional[List[dict]] = None
+        attachments: Optional[List[dict]] = None,
+        priority: TaskPriority = TaskPriority.INTERACTIVE,
     ) -> AsyncGenerator[AgentEvent, None]:
-        logger.info(f"Starting chat with session {session_id}: {message[:50]}...")
+        logger.info(f"Starting chat with session {session_id}: {(message or '')[:50]}...")
         # Directly use the domain service's chat method, which will check if the session exists
-        async for event in self._agent_domain_service.chat(session_id, user_id, message, timestamp, event_id, attachments):
+        async for event in self._agent_domain_service.chat(
+            session_id, user_id, message, timestamp, event_id, attachments, priority
+        ):
             logger.debug(f"Received event: {event}")
             yield event
         logger.info(f"Chat with session {session_id} completed")
     
+    async def execute_task(
+        self,
+        session_id: str,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.INTERACTIVE,
+    ) -> Optional[Task]:
+        """Run a task taken from the agent job queue in this process"""
+        logger.info(f"Executing task {task_id} of session {session_id}")
+        return await self._agent_domain_service.execute_task(session_id, task_id, priority)
+
+    async def fail_queued_task(self, session_id: str, task_id: str, error: str) -> None:
+        """Tell a session that its queued task was lost before a worker took it"""
+        logger.warning(f"Task {task_id} of session {session_id} failed in the job queue: {error}")
+        await self._agent_domain_service.fail_queued_task(session_id, task_id, error)
+
     async def get_session(self, session_id: str, user_id: Optional[str] = None) -> Optional[Session]:
         """Get a session by ID, ensuring it belongs to the user"""
         logger.info(f"Getting session {session_id} for user {user_id}")
@@ -117,19 +163,100 @@ class AgentService:
             logger.error(f"Session {session_id} not found for user {user_id}")
         return session
     
+    async def _get_owned_metadata(self, session_id: str, user_id: str) -> SessionMetadata:
+        """Get the cached metadata of a session, ensuring it belongs to the user"""
+        metadata = await self._session_repository.get_metadata(session_id)
+        if not metadata or metadata.user_id != user_id:
+            logger.error(f"Session {session_id} not found for user {user_id}")
+            raise RuntimeError("Session not found")
+        return metadata
+
+    async def get_session_events(self, session_id: str) -> List[AgentEvent]:
+        """Get all events of a session in order"""
+        return await self._session_repository.get_events(session_id)
+
+    async def get_session_events_page(
+        self,
+        session_id: str,
+        limit: int,
+        after_event_id: Optional[str] = None,
+        before_event_id: Optional[str] = None,
+    ) -> Tuple[List[AgentEvent], bool]:
+        """Get one page of session events in chronological order
+
+        Without a cursor the latest events are returned.
+
+        Args:
+            session_id: Session ID
+            limit: Maximum number of events to return
+            after_event_id: Return events following this event
+            before_event_id: Return the events right before this event
+
+        Returns:
+            The events and whether more events exist beyond the page
+        """
+        if after_event_id:
+            after_seq = await self._session_repository.get_event_seq(session_id, after_event_id)
+            if after_seq is None:
+                raise BadRequestError(f"Event {after_event_id} not found in session")
+            events = await self._session_repository.get_events(session_id, after_seq=after_seq, limit=limit + 1)
+            return events[:limit], len(events) > limit
+
+        before_seq = None
+        if before_event_id:
+            before_seq = await self._session_repository.get_event_seq(session_id, before_event_id)
+            if before_seq is None:
+                raise BadRequestError(f"Event {before_event_id} not found in session")
+        events = await self._session_repository.get_latest_events(session_id, limit + 1, before_seq=before_seq)
+        return events[-limit:], len(events) > limit
+
+    async def subscribe_session_changes(self, user_id: str) -> "asyncio.Queue[Optional[str]]":
+        """Start receiving IDs of the user's sessions as they change
+
+        A None item means changes may have been missed and the list should be reloaded.
+        """
+        if not self._session_notifier:
+            raise RuntimeError("Session change notifications are not configured")
+        return await self._session_notifier.subscribe(user_id)
+
+    async def unsubscribe_session_changes(self, user_id: str, queue: "asyncio.Queue[Optional[str]]") -> None:
+        """Stop receiving session changes on a queue from subscribe_session_changes"""
+        if self._session_notifier:
+            await self._session_notifier.unsubscribe(user_id, queue)
+
     async def get_all_sessions(self, user_id: str) -> List[Session]:
-        """Get all sessions for a specific user"""
+        """Get all sessions for a specific user, with only the fields shown in the session list"""
         logger.info(f"Getting all sessions for user {user_id}")
-        return await self._session_repository.find_by_user_id(user_id)
+        return await self._session_repository.find_list_by_user_id(user_id)
+
+    async def get_sessions_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Session], Optional[str]]:
+        """Get one page of the session list, with only the fields shown in the list
+
+        Args:
+            user_id: Owner of the sessions
+            limit: Maximum number of sessions to return
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            The sessions and the cursor of the next page, None on the last page
+        """
+        before = _decode_session_cursor(cursor) if cursor else None
+        sessions = await self._session_repository.find_list_by_user_id(user_id, limit=limit + 1, before=before)
+        if len(sessions) <= limit:
+            return sessions, None
+        sessions = sessions[:limit]
+        return sessions, _encode_session_cursor(sessions[-1])
 
     async def delete_session(self, session_id: str, user_id: str) -> None:
         """Delete a session, ensuring it belongs to the user"""
         logger.info(f"Deleting session {session_id} for user {user_id}")
         # First verify the session belongs to the user
-        session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-        if not session:
-            logger.error(f"Session {session_id} not found for user {user_id}")
-            raise RuntimeError("Session not found")
+        session = await self._get_owned_metadata(session_id, user_id)
         
         await self._session_repository.delete(session_id)
         logger.info(f"Session {session_id} deleted successfully")
@@ -138,10 +265,7 @@ class AgentService:
         """Stop a session, ensuring it belongs to the user"""
         logger.info(f"Stopping session {session_id} for user {user_id}")
         # First verify the session belongs to the user
-        session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-        if not session:
-            logger.error(f"Session {session_id} not found for user {user_id}")
-            raise RuntimeError("Session not found")
+        session = await self._get_owned_metadata(session_id, user_id)
         await self._agent_domain_service.stop_session(session_id)
         logger.info(f"Session {session_id} stopped successfully")
 
@@ -160,10 +284,7 @@ class AgentService:
     async def shell_view(self, session_id: str, shell_session_id: str, user_id: str) -> ShellViewResponse:
         """View shell session output, ensuring session belongs to the user"""
         logger.info(f"Getting shell view for session {session_id} for user {user_id}")
-        session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-        if not session:
-            logger.error(f"Session {session_id} not found for user {user_id}")
-            raise RuntimeError("Session not found")
+        session = await self._get_owned_metadata(session_id, user_id)
         
         if not session.sandbox_id:
             raise RuntimeError("Session has no sandbox environment")
@@ -183,7 +304,7 @@ class AgentService:
         """Get VNC URL for a session, ensuring it belongs to the user"""
         logger.info(f"Getting VNC URL for session {session_id}")
         
-        session = await self._session_repository.find_by_id(session_id)
+        session = await self._session_repository.get_metadata(session_id)
         if not session:
             logger.error(f"Session {session_id} not found")
             raise RuntimeError("Session not found")
@@ -201,10 +322,7 @@ class AgentService:
     async def file_view(self, session_id: str, file_path: str, user_id: str) -> FileViewResponse:
         """View file content, ensuring session belongs to the user"""
         logger.info(f"Getting file view for session {session_id} for user {user_id}")
-        session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-        if not session:
-            logger.error(f"Session {session_id} not found for user {user_id}")
-            raise RuntimeError("Session not found")
+        session = await self._get_owned_metadata(session_id, user_id)
         
         if not session.sandbox_id:
             raise RuntimeError("Session has no sandbox environment")
@@ -223,7 +341,7 @@ class AgentService:
     async def is_session_shared(self, session_id: str) -> bool:
         """Check if a session is shared"""
         logger.info(f"Checking if session {session_id} is shared")
-        session = await self._session_repository.find_by_id(session_id)
+        session = await self._session_repository.get_metadata(session_id)
         if not session:
             logger.error(f"Session {session_id} not found")
             raise RuntimeError("Session not found")
@@ -248,10 +366,7 @@ class AgentService:
         """Share a session, ensuring it belongs to the user"""
         logger.info(f"Sharing session {session_id} for user {user_id}")
         # First verify the session belongs to the user
-        session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-        if not session:
-            logger.error(f"Session {session_id} not found for user {user_id}")
-            raise RuntimeError("Session not found")
+        session = await self._get_owned_metadata(session_id, user_id)
         
         await self._session_repository.update_shared_status(session_id, True)
         logger.info(f"Session {session_id} shared successfully")
@@ -260,10 +375,7 @@ class AgentService:
         """Unshare a session, ensuring it belongs to the user"""
         logger.info(f"Unsharing session {session_id} for user {user_id}")
         # First verify the session belongs to the user
-        session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-        if not session:
-            logger.error(f"Session {session_id} not found for user {user_id}")
-            raise RuntimeError("Session not found")
+        session = await self._get_owned_metadata(session_id, user_id)
         
         await self._session_repository.update_shared_status(session_id, False)
         logger.info(f"Session {session_id} unshared successfully")
@@ -8,18 +8,25 @@ from app.application.errors.exceptions import UnauthorizedError, ValidationError
 from app.core.config import get_settings
 from app.application.services.token_service import TokenService
 from app.domain.models.auth import AuthToken
+from app.domain.external.cache import Cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cache key of a user verified for request authentication
+USER_CACHE_KEY_PREFIX = "auth:user:"
+# Replaces a cached user on changes, so a request that read the old state before the write cannot cache it
+USER_CACHE_TOMBSTONE = ""
+
 
 class AuthService:
     """Authentication service handling user authentication and authorization"""
     
-    def __init__(self, user_repository: UserRepository, token_service: TokenService):
+    def __init__(self, user_repository: UserRepository, token_service: TokenService, cache: Optional[Cache] = None):
         self.user_repository = user_repository
         self.settings = get_settings()
         self.token_service = token_service
+        self.cache = cache
     
     def _hash_password(self, password: str) -> str:
         """Hash password using configured algorithm"""
@@ -214,10 +221,7 @@ class AuthService:
         
         # For database users, verify user still exists and is active
         if self.settings.auth_provider == "password":
-            user = await self.user_repository.get_user_by_id(user_info["id"])
-            if not user or not user.is_active:
-                return None
-            return user
+            return await self._get_active_user(user_info["id"])
         
         # For local/none authentication, create user from token info
         return User(
@@ -228,6 +232,43 @@ class AuthService:
             is_active=user_info.get("is_active", True)
         )
     
+    async def _get_active_user(self, user_id: str) -> Optional[User]:
+        """Get an active user for request authentication, cached for a short time
+
+        The cache is keyed by user rather than token, so one invalidation covers
+        every token of the user. Entries leave out the password hash and are
+        only filled where no key exists, so a tombstone left by _update_user
+        keeps a user loaded just before a change out of the cache.
+        """
+        ttl = self.settings.auth_user_cache_ttl_seconds
+        use_cache = self.cache is not None and ttl > 0
+        key = f"{USER_CACHE_KEY_PREFIX}{user_id}"
+        if use_cache:
+            cached = await self.cache.get(key)
+            if cached:
+                return User.model_validate(cached)
+
+        user = await self.user_repository.get_user_by_id(user_id)
+        if not user or not user.is_active:
+            return None
+        if use_cache:
+            await self.cache.set(
+                key, user.model_dump(mode="json", exclude={"password_hash"}), ttl=ttl, only_if_absent=True
+            )
+        return user
+
+    async def _update_user(self, user: User) -> User:
+        """Persist a changed user and replace its cache entry with a tombstone
+
+        The tombstone lives as long as a cached user would, so no state read
+        before the change can be cached afterwards.
+        """
+        updated_user = await self.user_repository.update_user(user)
+        ttl = self.settings.auth_user_cache_ttl_seconds
+        if self.cache is not None and ttl > 0:
+            await self.cache.set(f"{USER_CACHE_KEY_PREFIX}{user.id}", USER_CACHE_TOMBSTONE, ttl=ttl)
+        return updated_user
+
     async def logout(self, token: str) -> bool:
         """Logout user by revoking token"""
         if self.settings.auth_provider == "none":
@@ -261,7 +302,7 @@ class AuthService:
         user.password_hash = new_password_hash
         user.updated_at = datetime.utcnow()
         
-        await self.user_repository.update_user(user)
+        await self._update_user(user)
         
         logger.info(f"Password changed successfully for user: {user_id}")
         return True
@@ -286,7 +327,7 @@ class AuthService:
         user.fullname = new_fullname.strip()
         user.updated_at = datetime.utcnow()
         
-        updated_user = await self.user_repository.update_user(user)
+        updated_user = await self._update_user(user)
         
         logger.info(f"Fullname changed successfully for user: {user_id}")
         return updated_user
@@ -304,7 +345,7 @@ class AuthService:
             raise ValidationError("User not found")
         
         user.deactivate()
-        await self.user_repository.update_user(user)
+        await self._update_user(user)
         
         logger.info(f"User deactivated successfully: {user_id}")
         return True
@@ -318,7 +359,7 @@ class AuthService:
             raise ValidationError("User not found")
         
         user.activate()
-        await self.user_repository.update_user(user)
+        await self._update_user(user)
         
         logger.info(f"User activated successfully: {user_id}")
         return True
@@ -349,7 +390,7 @@ class AuthService:
         user.password_hash = new_password_hash
         user.updated_at = datetime.utcnow()
         
-        await self.user_repository.update_user(user)
+        await self._update_user(user)
         
         logger.info(f"Password reset successfully for user: {email}")
         return True 
\ No newline at end of file
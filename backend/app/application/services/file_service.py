@@ -1,5 +1,7 @@
-from typing import Dict, Any, Optional, BinaryIO, Tuple
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Any, Optional, BinaryIO, Tuple, List
 import logging
+import time
 from app.domain.external.file import FileStorage
 from app.domain.models.file import FileInfo
 from app.application.services.token_service import TokenService
@@ -7,10 +9,16 @@ from app.application.services.token_service import TokenService
 # Set up logger
 logger = logging.getLogger(__name__)
 
+SIGNED_URL_MAX_EXPIRE_MINUTES = 30
+# Cached signatures are handed out only while they stay valid at least this long
+SIGNED_URL_MIN_REMAINING_SECONDS = 300
+SIGNED_URL_CACHE_SIZE = 10000
+
 class FileService:
     def __init__(self, file_storage: Optional[FileStorage] = None, token_service: Optional[TokenService] = None):
         self._file_storage = file_storage
         self._token_service = token_service
+        self._signed_url_cache: "OrderedDict[Tuple[str, int, Optional[str]], Tuple[str, float]]" = OrderedDict()
 
     async def upload_file(self, file_data: BinaryIO, filename: str, user_id: str, content_type: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> FileInfo:
         """Upload file"""
@@ -42,6 +50,13 @@ class FileService:
             logger.error(f"Failed to download file {file_id} for user {user_id}: {str(e)}")
             raise
 
+    def stream_file(self, file_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream a byte range of a file, access must be checked with get_file_info first"""
+        if not self._file_storage:
+            logger.error("File storage service not available")
+            raise RuntimeError("File storage service not available")
+        return self._file_storage.stream_file(file_id, start, end)
+
     async def delete_file(self, file_id: str, user_id: str) -> bool:
         """Delete file"""
         logger.info(f"Delete file request: file_id={file_id}, user_id={user_id}")
@@ -90,31 +105,127 @@ class FileService:
             logger.error(f"Failed to enrich file info {file_info.file_id} with file URL: {str(e)}")
             raise
 
-    async def create_signed_url(self, file_id: str, user_id: Optional[str] = None, expire_minutes: int = 30) -> str:
-        """Create signed URL for file download"""
-        logger.info(f"Create signed URL request: file_id={file_id}, user_id={user_id}, expire_minutes={expire_minutes}")
-        
-        if not self._token_service:
-            logger.error("Token service not available")
-            raise RuntimeError("Token service not available")
-        
-        # Validate expiration time (max 15 minutes)
-        if expire_minutes > 30:
-            expire_minutes = 30
-        
-        # Check if file exists and user has access
-        file_info = await self.get_file_info(file_id, user_id)
-        if not file_info:
-            logger.warning(f"File not found or access denied for signed URL: file_id={file_id}, user_id={user_id}")
-            raise FileNotFoundError("File not found")
-        
-        # Create signed URL for file download
-        base_url = f"/api/v1/files/{file_id}"
+    def _sign_file_url(self, file_id: str, expire_minutes: int, verified_for: Optional[str]) -> Tuple[str, float]:
+        """Sign a file download URL, reusing a cached signature while it is fresh
+
+        Signatures are cached per file, lifetime and the user the file was
+        verified for, so a cached URL never skips a different ownership check.
+        Returns the URL with the time it expires at, which is earlier than the
+        requested lifetime when the signature comes from the cache.
+        """
+        key = (file_id, expire_minutes, verified_for)
+        now = time.time()
+        cached = self._signed_url_cache.get(key)
+        if cached and cached[1] - now >= SIGNED_URL_MIN_REMAINING_SECONDS:
+            self._signed_url_cache.move_to_end(key)
+            return cached
+
         signed_url = self._token_service.create_signed_url(
-            base_url=base_url,
+            base_url=f"/api/v1/files/{file_id}",
             expire_minutes=expire_minutes
         )
+        signed = (signed_url, now + expire_minutes * 60)
+        self._signed_url_cache[key] = signed
+        if len(self._signed_url_cache) > SIGNED_URL_CACHE_SIZE:
+            self._signed_url_cache.popitem(last=False)
+        return signed
+
+    def _cached_verification(self, file_id: str, expire_minutes: int, verified_for: str) -> bool:
+        """Whether a fresh signature exists for a file already verified for this user"""
+        cached = self._signed_url_cache.get((file_id, expire_minutes, verified_for))
+        return bool(cached and cached[1] - time.time() >= SIGNED_URL_MIN_REMAINING_SECONDS)
+
+    async def create_signed_url(self, file_id: str, user_id: Optional[str] = None, expire_minutes: int = 30, verify_file: bool = True) -> str:
+        """Create signed URL for file download
         
-        logger.info(f"Created signed URL for file download for user {user_id}, file {file_id}")
-        
+        Pass verify_file=False for IDs allocated by the backend itself, such as
+        screenshots whose upload may still be in progress.
+        """
+        signed_url, _ = await self.create_signed_url_with_expiry(file_id, user_id, expire_minutes, verify_file)
         return signed_url
+
+    async def create_signed_url_with_expiry(
+        self,
+        file_id: str,
+        user_id: Optional[str] = None,
+        expire_minutes: int = 30,
+        verify_file: bool = True,
+    ) -> Tuple[str, int]:
+        """Create signed URL for file download along with its remaining lifetime in seconds"""
+        logger.debug(f"Create signed URL request: file_id={file_id}, user_id={user_id}, expire_minutes={expire_minutes}")
+        signed_urls = await self._sign_file_urls([file_id], user_id, expire_minutes, verify_file)
+        if file_id not in signed_urls:
+            logger.warning(f"File not found or access denied for signed URL: file_id={file_id}, user_id={user_id}")
+            raise FileNotFoundError("File not found")
+        signed_url, expires_at = signed_urls[file_id]
+        return signed_url, max(int(expires_at - time.time()), 0)
+
+    async def create_signed_urls(
+        self,
+        file_ids: List[str],
+        user_id: Optional[str] = None,
+        expire_minutes: int = 30,
+        verify_files: bool = True,
+    ) -> Dict[str, str]:
+        """Create signed download URLs for several files at once
+
+        Files that still need verification are looked up with a single query.
+
+        Args:
+            file_ids: File IDs to sign
+            user_id: Only sign files owned by this user when given
+            expire_minutes: URL lifetime, capped at 30 minutes
+            verify_files: Check that the files exist before signing
+
+        Returns:
+            Signed URL by file ID, files that are missing or not accessible are left out
+        """
+        signed_urls = await self._sign_file_urls(file_ids, user_id, expire_minutes, verify_files)
+        return {file_id: signed_url for file_id, (signed_url, _) in signed_urls.items()}
+
+    async def _sign_file_urls(
+        self,
+        file_ids: List[str],
+        user_id: Optional[str],
+        expire_minutes: int,
+        verify_files: bool,
+    ) -> Dict[str, Tuple[str, float]]:
+        """Sign URLs for the accessible files, keyed by file ID with the time each one expires at"""
+        if not self._token_service:
+            logger.error("Token service not available")
+            raise RuntimeError("Token service not available")
+        
+        # Validate expiration time (max 30 minutes)
+        expire_minutes = min(expire_minutes, SIGNED_URL_MAX_EXPIRE_MINUTES)
+        file_ids = list(dict.fromkeys(file_ids))
+        if not verify_files:
+            return {file_id: self._sign_file_url(file_id, expire_minutes, None) for file_id in file_ids}
+
+        if not self._file_storage:
+            logger.error("File storage service not available")
+            raise RuntimeError("File storage service not available")
+
+        verified_for = user_id or ""
+        unverified = [
+            file_id for file_id in file_ids
+            if not self._cached_verification(file_id, expire_minutes, verified_for)
+        ]
+        existing = set(file_ids) - set(unverified)
+        if unverified:
+            existing.update(await self._file_storage.get_file_infos(unverified, user_id))
+
+        return {
+            file_id: self._sign_file_url(file_id, expire_minutes, verified_for)
+            for file_id in file_ids if file_id in existing
+        }
+
+    async def enrich_with_file_urls(self, file_infos: List[FileInfo]) -> List[FileInfo]:
+        """Enrich several file informations with file URLs, verifying them per owner in bulk"""
+        by_user: Dict[str, List[FileInfo]] = {}
+        for file_info in file_infos:
+            by_user.setdefault(file_info.user_id, []).append(file_info)
+        for user_id, user_files in by_user.items():
+            signed_urls = await self.create_signed_urls([file_info.file_id for file_info in user_files], user_id)
+            for file_info in user_files:
+                file_info.file_url = signed_urls.get(file_info.file_id)
+        return file_infos
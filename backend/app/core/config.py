@@ -31,6 +31,22 @@ class Settings(BaseSettings):
     redis_db: int = 0
     redis_password: str | None = None
 
+    # Task stream retention
+    task_stream_max_len: int = 10000  # Approximate max entries per task stream, 0 disables
+    task_stream_max_age_seconds: int = 0  # Trim entries older than this instead of by length, 0 disables
+    task_stream_ttl_seconds: int = 3600  # Expire task streams this long after the task finishes
+    task_stream_orphan_idle_seconds: int = 86400  # Delete streams without expiry idle this long
+    task_stream_sweep_interval_seconds: int = 600  # 0 disables the orphan sweeper
+    task_input_claim_idle_seconds: int = 600  # Redeliver input left unacknowledged this long by a crashed consumer
+    task_lease_seconds: int = 30  # A node that misses heartbeats this long loses ownership of its tasks
+    max_concurrent_tasks_per_node: int = 0  # Tasks executing at once in one process, 0 for no limit
+    max_concurrent_tasks: int = 0  # Tasks executing at once across all nodes, 0 for no limit
+
+    # Agent workers
+    agent_workers_enabled: bool = False  # Queue tasks for `python -m app.worker` instead of running them in the API
+    agent_worker_processes: int = 1  # Worker processes started by one worker entry point
+    agent_worker_concurrency: int = 4  # Tasks run at once by each worker process
+
     # Sandbox configuration
     sandbox_address: str | None = None
     sandbox_image: str | None = None
@@ -42,6 +58,31 @@ class Settings(BaseSettings):
     sandbox_http_proxy: str | None = None
     sandbox_no_proxy: str | None = None
 
+    # Browser configuration
+    browser_view_mode: str = "compact"  # "compact", "markdown"
+    browser_view_llm_refine: bool = False  # Post-process compact page outlines with the LLM
+    browser_page_load_timeout: int = 15  # Seconds to wait for a page to settle before viewing
+    browser_network_idle_timeout_ms: int = 1000  # Max wait for network idle after load, 0 disables
+    browser_dom_quiet_ms: int = 300  # Mutation-free period that counts as a settled DOM, 0 disables
+    browser_blocked_resource_types: str = "image,media,font"  # Comma separated, empty disables
+    browser_block_trackers: bool = True  # Block well-known ad and analytics domains
+    browser_blocked_domains: str = ""  # Extra comma separated domains to block
+
+    # Screenshot configuration
+    screenshot_format: str = "jpeg"  # "jpeg", "webp", "png"
+    screenshot_quality: int = 75  # Ignored for png
+    screenshot_dedup_enabled: bool = True
+    screenshot_dedup_threshold: int = 0  # Max perceptual hash distance treated as duplicate
+
+    # Session event persistence
+    session_event_flush_interval_ms: int = 200  # Longest time an event waits to be written to MongoDB
+    session_event_flush_max_batch: int = 100
+    session_cache_ttl_seconds: int = 300  # Lifetime of cached session metadata, 0 disables the cache
+
+    # File storage
+    file_blob_gc_interval_seconds: int = 3600  # 0 disables collecting unreferenced blobs
+    file_blob_gc_grace_seconds: int = 3600  # Keep unreferenced blobs this long for re-uploads of the same content
+
     # Search engine configuration
     search_provider: str | None = "bing"  # "baidu", "google", "bing"
     google_search_api_key: str | None = None
@@ -54,6 +95,7 @@ class Settings(BaseSettings):
     password_hash_algorithm: str = "pbkdf2_sha256"
     local_auth_email: str = "admin@example.com"
     local_auth_password: str = "admin"
+    auth_user_cache_ttl_seconds: int = 30  # Cache of users verified from access tokens, 0 disables it
 
     # Email configuration
     email_host: str | None = None  # "smtp.gmail.com"
@@ -8,8 +8,13 @@ class Browser(Protocol):
         """View current page content"""
         ...
     
-    async def navigate(self, url: str) -> ToolResult:
-        """Navigate to specified URL"""
+    async def navigate(self, url: str, load_media: Optional[bool] = None) -> ToolResult:
+        """Navigate to specified URL
+        
+        Args:
+            url: URL to navigate to
+            load_media: Whether to load images, video and fonts from now on, None keeps the current setting
+        """
         ...
     
     async def restart(self, url: str) -> ToolResult:
@@ -72,9 +77,17 @@ class Browser(Protocol):
     
     async def screenshot(
         self,
-        full_page: Optional[bool] = False
+        full_page: Optional[bool] = False,
+        image_format: str = "png",
+        quality: Optional[int] = None
     ) -> bytes:
-        """Take a screenshot of the current page"""
+        """Take a screenshot of the current page
+        
+        Args:
+            full_page: Whether to capture the full page or just the viewport
+            image_format: Image encoding, one of "png", "jpeg" or "webp"
+            quality: Compression quality 0-100, ignored for PNG
+        """
         ...
     
     async def console_exec(self, javascript: str) -> ToolResult:
@@ -4,13 +4,14 @@ from datetime import timedelta
 class Cache(Protocol):
     """Cache storage interface for temporary data storage"""
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, only_if_absent: bool = False) -> bool:
         """Store a value with optional TTL (time to live)
         
         Args:
             key: The cache key
             value: The value to store (will be JSON serialized)
             ttl: Time to live in seconds, None means no expiration
+            only_if_absent: Only store the value if the key does not exist
             
         Returns:
             bool: True if stored successfully, False otherwise
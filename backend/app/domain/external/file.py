@@ -1,4 +1,4 @@
-from typing import Protocol, BinaryIO, Optional, Dict, Any, Tuple
+from typing import AsyncIterator, Protocol, BinaryIO, Optional, Dict, Any, Tuple, List
 from app.domain.models.file import FileInfo
 
 class FileStorage(Protocol):
@@ -10,7 +10,8 @@ class FileStorage(Protocol):
         filename: str,
         user_id: str,
         content_type: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None
     ) -> FileInfo:
         """Upload file to storage
         
@@ -20,12 +21,23 @@ class FileStorage(Protocol):
             user_id: ID of the user uploading the file
             content_type: MIME type of the file (optional)
             metadata: Additional metadata to store with the file (optional)
+            file_id: ID previously allocated with new_file_id (optional)
             
         Returns:
             FileUploadResult containing file_id and upload information
         """
         ...
     
+    def new_file_id(self) -> str:
+        """Allocate a file ID ahead of upload
+        
+        Lets callers reference a file before its upload has finished.
+        
+        Returns:
+            A file ID that can be passed to upload_file
+        """
+        ...
+    
     async def download_file(
         self,
         file_id: str,
@@ -42,7 +54,25 @@ class FileStorage(Protocol):
         """
         ...
     
-
+    def stream_file(
+        self,
+        file_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream file content without loading the whole file
+        
+        Access control is left to the caller, check it with get_file_info first.
+        
+        Args:
+            file_id: File ID
+            start: Offset of the first byte to return
+            end: Offset after the last byte to return, None for the end of the file
+            
+        Returns:
+            Async iterator over consecutive pieces of the requested range
+        """
+        ...
     
     async def delete_file(
         self,
@@ -76,3 +106,19 @@ class FileStorage(Protocol):
         """
         ...
 
+    async def get_file_infos(
+        self,
+        file_ids: List[str],
+        user_id: Optional[str] = None
+    ) -> Dict[str, FileInfo]:
+        """Get metadata of several files in one lookup
+        
+        Args:
+            file_ids: File IDs
+            user_id: Only return files owned by this user when given
+            
+        Returns:
+            FileInfo by file ID, files that are missing or not accessible are left out
+        """
+        ...
+
@@ -1,4 +1,4 @@
-from typing import Any, Protocol, Tuple, Optional
+from typing import Any, Protocol, Tuple, Optional, List
 
 class MessageQueue(Protocol):
     """Message queue interface for agent communication"""
@@ -23,6 +23,19 @@ class MessageQueue(Protocol):
         """
         ...
     
+    async def get_batch(self, start_id: Optional[str] = None, count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Get up to count messages after start_id in a single read
+        
+        Args:
+            start_id: Message ID to start reading after, defaults to "0" meaning from the earliest message
+            count: Maximum number of messages to return
+            block_ms: Block time in milliseconds when no message is available, None means no blocking
+            
+        Returns:
+            List[Tuple[str, Any]]: (Message ID, Message content) pairs in order, empty if no message
+        """
+        ...
+    
     async def pop(self) -> Tuple[str, Any]:
         """Get and remove the first message from the queue
         
@@ -31,10 +44,39 @@ class MessageQueue(Protocol):
         """
         ...
     
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge that a popped message has been handled
+        
+        Queues that remove messages on pop treat this as a no-op.
+        
+        Args:
+            message_id: ID of the message returned by pop
+            
+        Returns:
+            bool: True if the message was acknowledged, False otherwise
+        """
+        ...
+    
+    async def get_latest_id(self) -> str:
+        """Get the ID of the newest message
+        
+        Returns:
+            str: Latest message ID, returns "0" if no messages
+        """
+        ...
+    
     async def clear(self) -> None:
         """Clear all messages from the queue"""
         ...
     
+    async def expire(self, seconds: int) -> bool:
+        """Delete the queue and its messages after the given number of seconds
+        
+        Returns:
+            bool: True if the expiry was set, False if the queue does not exist
+        """
+        ...
+    
     async def is_empty(self) -> bool:
         """Check if the queue is empty"""
         ...
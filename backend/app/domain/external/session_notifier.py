@@ -0,0 +1,31 @@
+import asyncio
+from typing import Optional, Protocol
+
+
+class SessionNotifier(Protocol):
+    """Change notification bus for the sessions of a user"""
+
+    async def publish(self, user_id: str, session_id: str) -> None:
+        """Notify listeners of a user that one of their sessions changed
+
+        Args:
+            user_id: Owner of the session
+            session_id: ID of the created, updated or deleted session
+        """
+        ...
+
+    async def subscribe(self, user_id: str) -> "asyncio.Queue[Optional[str]]":
+        """Start listening for changes to a user's sessions
+
+        Args:
+            user_id: User whose sessions to watch
+
+        Returns:
+            Queue receiving changed session IDs, or None when notifications may
+            have been missed and the listener should reload everything
+        """
+        ...
+
+    async def unsubscribe(self, user_id: str, queue: "asyncio.Queue[Optional[str]]") -> None:
+        """Stop listening with a queue returned by subscribe"""
+        ...
@@ -1,8 +1,15 @@
 from typing import Protocol, Any, Awaitable, Optional, Callable
 from abc import ABC, abstractmethod
+from enum import IntEnum
 from app.domain.external.message_queue import MessageQueue
 
 
+class TaskPriority(IntEnum):
+    """Order in which waiting tasks get an execution slot, lower first"""
+    INTERACTIVE = 0
+    SCHEDULED = 1
+
+
 class TaskRunner(ABC):
     """Abstract base class defining the interface for task runners.
     
@@ -46,10 +53,18 @@ class TaskRunner(ABC):
 class Task(Protocol):
     """Protocol defining the interface for task management operations."""
     
-    async def run(self) -> None:
-        """Run a task."""
+    async def run(self, priority: TaskPriority = TaskPriority.INTERACTIVE) -> None:
+        """Run a task.
+
+        Args:
+            priority (TaskPriority): Rank of the task while it waits for an execution slot
+        """
         ...
     
+    async def wait(self) -> None:
+        """Wait until the task is done."""
+        ...
+
     def cancel(self) -> bool:
         """Cancel a task.
 
@@ -83,8 +98,8 @@ class Task(Protocol):
         ...
     
     @classmethod
-    def get(cls, task_id: str) -> Optional["Task"]:
-        """Get a task by its ID.
+    async def get(cls, task_id: str) -> Optional["Task"]:
+        """Get a task by its ID, including tasks running in other processes.
 
         Returns:
             Optional[Task]: Task instance if found, None otherwise
@@ -92,17 +107,30 @@ class Task(Protocol):
         ...
     
     @classmethod
-    def create(cls, runner: TaskRunner) -> "Task":
+    def create(cls, runner: TaskRunner, task_id: Optional[str] = None) -> "Task":
         """Create a new task instance with the specified task runner.
 
         Args:
             runner (TaskRunner): The task runner that will execute this task
+            task_id (Optional[str]): ID to run the task under, a new ID is generated when omitted
 
         Returns:
             Task: New task instance
         """
         ...
 
+    @classmethod
+    def create_queued(cls, session_id: str) -> "Task":
+        """Create a task that a worker process executes once it is run.
+
+        Args:
+            session_id (str): Session the worker builds the task runner for
+
+        Returns:
+            Task: New task instance without a local runner
+        """
+        ...
+
     @classmethod
     async def destroy(cls) -> None:
         """Destroy all task instances.
@@ -127,6 +127,13 @@ class SkillEvent(BaseEvent):
     status: SkillStatus
 
 
+class QueuedEvent(BaseEvent):
+    """Task waiting for an execution slot, not persisted"""
+    type: Literal["queued"] = "queued"
+    position: int
+    eta_seconds: Optional[int] = None
+
+
 AgentEvent = Union[
     ErrorEvent,
     PlanEvent,
@@ -137,4 +144,5 @@ AgentEvent = Union[
     TitleEvent,
     WaitEvent,
     SkillEvent,
+    QueuedEvent,
 ]
@@ -1,8 +1,8 @@
-from typing import Optional, Protocol, List
+from typing import Any, Dict, Optional, Protocol, List, Tuple
 from datetime import datetime
-from app.domain.models.session import Session, SessionStatus
+from app.domain.models.session import Session, SessionMetadata, SessionStatus
 from app.domain.models.file import FileInfo
-from app.domain.models.event import BaseEvent
+from app.domain.models.event import BaseEvent, AgentEvent
 
 class SessionRepository(Protocol):
     """Repository interface for Session aggregate"""
@@ -11,14 +11,42 @@ class SessionRepository(Protocol):
         """Save or update a session"""
         ...
     
+    async def update_fields(self, session_id: str, fields: Dict[str, Any]) -> None:
+        """Update only the given fields of a session, leaving the others untouched"""
+        ...
+    
     async def find_by_id(self, session_id: str) -> Optional[Session]:
         """Find a session by its ID"""
         ...
     
+    async def get_metadata(self, session_id: str) -> Optional[SessionMetadata]:
+        """Get the fields needed to authorize and route requests for a session
+
+        Served from a cache kept current by the update methods of this repository.
+        """
+        ...
+
     async def find_by_user_id(self, user_id: str) -> List[Session]:
         """Find all sessions for a specific user"""
         ...
     
+    async def find_list_by_user_id(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[Optional[datetime], str]] = None,
+    ) -> List[Session]:
+        """Find a user's sessions for the session list, most recent message first
+
+        Only the fields shown in the list are loaded, files are left empty.
+
+        Args:
+            user_id: Owner of the sessions
+            limit: Maximum number of sessions to return, None for all
+            before: Return sessions after this (latest_message_at, session_id) position in the list
+        """
+        ...
+
     async def find_by_id_and_user_id(self, session_id: str, user_id: str) -> Optional[Session]:
         """Find a session by ID and user ID (for authorization)"""
         ...
@@ -34,6 +62,41 @@ class SessionRepository(Protocol):
     async def add_event(self, session_id: str, event: BaseEvent) -> None:
         """Add an event to a session"""
         ...
+
+    async def add_events(
+        self,
+        session_id: str,
+        events: List[BaseEvent],
+        fields: Optional[Dict[str, Any]] = None,
+        unread_increment: int = 0,
+        documents: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Append events to the session's event log and update the session in one write
+
+        Args:
+            session_id: Session ID
+            events: Events in the order they occurred
+            fields: Session fields to set
+            unread_increment: Amount added to the unread message count
+            documents: The events serialized with event_to_document, stored as they are when given
+        """
+        ...
+
+    async def get_events(self, session_id: str, after_seq: int = 0, limit: Optional[int] = None) -> List[AgentEvent]:
+        """Get events of a session in order, starting after the given sequence number"""
+        ...
+
+    async def get_latest_events(self, session_id: str, limit: int, before_seq: Optional[int] = None) -> List[AgentEvent]:
+        """Get the latest events of a session in chronological order, optionally only those before a sequence number"""
+        ...
+
+    async def get_event_seq(self, session_id: str, event_id: str) -> Optional[int]:
+        """Get the sequence number of an event by its ID"""
+        ...
+
+    async def get_last_event(self, session_id: str, event_type: str) -> Optional[AgentEvent]:
+        """Get the most recent event of a given type"""
+        ...
     
     async def add_file(self, session_id: str, file_info: FileInfo) -> None:
         """Add a file to a session"""
@@ -1,18 +1,19 @@
-from typing import Optional, AsyncGenerator, List
+from typing import Optional, AsyncGenerator, Dict, List, Union
 import logging
 import time
 from datetime import datetime
-from app.domain.models.session import Session, SessionStatus
+from app.domain.models.session import Session, SessionMetadata, SessionStatus
 from app.domain.external.llm import LLM
 from app.domain.external.sandbox import Sandbox
 from app.domain.external.search import SearchEngine
 from app.domain.models.event import BaseEvent, ErrorEvent, DoneEvent, MessageEvent, WaitEvent, AgentEvent
-from pydantic import TypeAdapter
 from app.domain.repositories.agent_repository import AgentRepository
 from app.domain.repositories.session_repository import SessionRepository
 from app.domain.services.agent_task_runner import AgentTaskRunner
-from app.domain.external.task import Task
+from app.domain.services.event_stream_hub import EventStreamHub
+from app.domain.external.task import Task, TaskPriority
 from app.domain.utils.json_parser import JsonParser
+from app.domain.utils.event_codec import encode_event, decode_event
 from typing import Type
 from app.domain.external.file import FileStorage
 from app.domain.models.file import FileInfo
@@ -21,6 +22,11 @@ from app.domain.repositories.mcp_repository import MCPRepository
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of events read from the output stream per round trip
+EVENT_BATCH_SIZE = 100
+# How long a read blocks before re-checking whether the task is still running
+EVENT_BLOCK_MS = 5000
+
 class AgentDomainService:
     """
     Agent domain service, responsible for coordinating the work of planning agent and execution agent
@@ -38,6 +44,7 @@ class AgentDomainService:
         mcp_repository: MCPRepository,
         search_engine: Optional[SearchEngine] = None,
         scheduled_task_service = None,
+        dispatch_to_workers: bool = False,
     ):
         self._repository = agent_repository
         self._session_repository =session_repository
@@ -49,6 +56,10 @@ class AgentDomainService:
         self._file_storage = file_storage
         self._mcp_repository = mcp_repository
         self._scheduled_task_service = scheduled_task_service
+        # Leave execution to agent worker processes and only stream their output
+        self._dispatch_to_workers = dispatch_to_workers
+        # One hub per running task so concurrent viewers share a single stream reader
+        self._event_hubs: Dict[str, EventStreamHub] = {}
         logger.info("AgentDomainService initialization completed")
             
     async def shutdown(self) -> None:
@@ -57,24 +68,26 @@ class AgentDomainService:
         await self._task_cls.destroy()
         logger.info("All agents closed successfully")
 
-    async def _create_task(self, session: Session) -> Task:
-        """Create a new agent task"""
+    async def _get_sandbox(self, session: Session) -> Sandbox:
+        """Get the session's sandbox, creating one if it has none or it is gone
+
+        A new sandbox ID is only set on the session, the caller persists it.
+        """
         sandbox = None
-        sandbox_id = session.sandbox_id
-        if sandbox_id:
-            sandbox = await self._sandbox_cls.get(sandbox_id)
+        if session.sandbox_id:
+            sandbox = await self._sandbox_cls.get(session.sandbox_id)
         if not sandbox:
             sandbox = await self._sandbox_cls.create()
             session.sandbox_id = sandbox.id
-            await self._session_repository.save(session)
+        return sandbox
+
+    async def _create_task_runner(self, session: Session, sandbox: Sandbox) -> AgentTaskRunner:
         browser = await sandbox.get_browser()
         if not browser:
-            logger.error(f"Failed to get browser for Sandbox {sandbox_id}")
-            raise RuntimeError(f"Failed to get browser for Sandbox {sandbox_id}")
-        
-        await self._session_repository.save(session)
+            logger.error(f"Failed to get browser for Sandbox {sandbox.id}")
+            raise RuntimeError(f"Failed to get browser for Sandbox {sandbox.id}")
 
-        task_runner = AgentTaskRunner(
+        return AgentTaskRunner(
             session_id=session.id,
             agent_id=session.agent_id,
             user_id=session.user_id,
@@ -90,24 +103,80 @@ class AgentDomainService:
             scheduled_task_service=self._scheduled_task_service,
         )
 
-        task = self._task_cls.create(task_runner)
+    async def _create_task(self, session: Session) -> Task:
+        """Create a new agent task"""
+        sandbox = await self._get_sandbox(session)
+
+        if self._dispatch_to_workers:
+            # A worker builds the runner once the task is queued
+            task = self._task_cls.create_queued(session.id)
+        else:
+            task_runner = await self._create_task_runner(session, sandbox)
+            task = self._task_cls.create(task_runner)
         session.task_id = task.id
-        await self._session_repository.save(session)
+        await self._session_repository.update_fields(
+            session.id, {"sandbox_id": session.sandbox_id, "task_id": task.id}
+        )
 
         return task
+
+    async def execute_task(
+        self,
+        session_id: str,
+        task_id: str,
+        priority: TaskPriority = TaskPriority.INTERACTIVE,
+    ) -> Optional[Task]:
+        """Run a task queued by another process in this one
+
+        Args:
+            session_id: Session the task belongs to
+            task_id: ID the task was queued under
+            priority: Rank of the task while it waits for an execution slot
+
+        Returns:
+            Optional[Task]: The running task, None if the session is gone or moved on to another task
+        """
+        session = await self._session_repository.find_by_id(session_id)
+        if not session or session.task_id != task_id:
+            logger.warning(f"Skipping task {task_id}, Session {session_id} no longer runs it")
+            return None
+        sandbox_id = session.sandbox_id
+        sandbox = await self._get_sandbox(session)
+        if session.sandbox_id != sandbox_id:
+            await self._session_repository.update_fields(session.id, {"sandbox_id": session.sandbox_id})
+        task_runner = await self._create_task_runner(session, sandbox)
+        task = self._task_cls.create(task_runner, task_id=task_id)
+        await task.run(priority)
+        return task
         
-    async def _get_task(self, session: Session) -> Optional[Task]:
+    async def fail_queued_task(self, session_id: str, task_id: str, error: str) -> None:
+        """Report a queued task that can no longer run to its session
+
+        Args:
+            session_id: Session the task belongs to
+            task_id: ID the task was queued under
+            error: Error shown to the user in place of the agent's reply
+        """
+        metadata = await self._session_repository.get_metadata(session_id)
+        if not metadata or metadata.task_id != task_id:
+            logger.warning(f"Not reporting lost task {task_id}, Session {session_id} no longer runs it")
+            return
+        await self._session_repository.add_events(
+            session_id, [ErrorEvent(error=error)], fields={"status": SessionStatus.COMPLETED}
+        )
+
+    async def _get_task(self, session: Union[Session, SessionMetadata]) -> Optional[Task]:
         """Get a task for the given session"""
 
         task_id = session.task_id
         if not task_id:
             return None
         
-        return self._task_cls.get(task_id)
+        return await self._task_cls.get(task_id)
 
     async def stop_session(self, session_id: str) -> None:
         """Stop a session"""
-        session = await self._session_repository.find_by_id(session_id)
+        session = await self._session_repository.get_metadata(session_id)
         if not session:
             logger.error(f"Attempted to stop non-existent Session {session_id}")
             raise RuntimeError("Session not found")
@@ -116,6 +185,76 @@ class AgentDomainService:
             task.cancel()
         await self._session_repository.update_status(session_id, SessionStatus.COMPLETED)
 
+    def _get_event_hub(self, task: Task) -> EventStreamHub:
+        hub = self._event_hubs.get(task.id)
+        if hub is None:
+            hub = EventStreamHub(task.output_stream, batch_size=EVENT_BATCH_SIZE, block_ms=EVENT_BLOCK_MS)
+            self._event_hubs[task.id] = hub
+        return hub
+
+    def _decode_messages(self, messages: List[tuple]) -> List[AgentEvent]:
+        events: List[AgentEvent] = []
+        for event_id, event_str in messages:
+            if event_str is None:
+                continue
+            event = decode_event(event_str)
+            event.id = event_id
+            events.append(event)
+        return events
+
+    async def _task_batches(
+        self,
+        session_id: str,
+        task: Task,
+        latest_event_id: Optional[str] = None,
+    ) -> AsyncGenerator[List[tuple], None]:
+        """Yield batches of a task's output after latest_event_id through its shared hub"""
+        hub = self._get_event_hub(task)
+        subscription = hub.subscribe(latest_event_id)
+        try:
+            async for messages in subscription:
+                if messages:
+                    latest_event_id = messages[-1][0]
+                    yield messages
+                elif task.done:
+                    # The task ended during the idle read, drain what it wrote last
+                    while True:
+                        messages = await task.output_stream.get_batch(start_id=latest_event_id, count=EVENT_BATCH_SIZE)
+                        if not messages:
+                            return
+                        latest_event_id = messages[-1][0]
+                        yield messages
+                else:
+                    logger.debug(f"No event found in Session {session_id}'s event queue")
+        finally:
+            await subscription.aclose()
+            if hub.subscriber_count == 0 and self._event_hubs.get(task.id) is hub:
+                del self._event_hubs[task.id]
+
+    async def _follow_task(
+        self,
+        session_id: str,
+        task: Task,
+        latest_event_id: Optional[str] = None,
+    ) -> AsyncGenerator[AgentEvent, None]:
+        """Yield a task's output events after latest_event_id until it finishes or waits"""
+        batches = self._task_batches(session_id, task, latest_event_id)
+        try:
+            async for messages in batches:
+                events = self._decode_messages(messages)
+                logger.debug(f"Got {len(events)} events from Session {session_id}'s event queue")
+
+                # Only assistant messages raise the unread count, so reset it once per batch that has any
+                if any(isinstance(event, MessageEvent) for event in events):
+                    await self._session_repository.update_unread_message_count(session_id, 0)
+
+                for event in events:
+                    yield event
+                    if isinstance(event, (DoneEvent, ErrorEvent, WaitEvent)):
+                        return
+        finally:
+            await batches.aclose()
+
     async def chat(
         self,
         session_id: str,
@@ -123,22 +262,28 @@ class AgentDomainService:
         message: Optional[str] = None,
         timestamp: Optional[datetime] = None,
         latest_event_id: Optional[str] = None,
-        attachments: Optional[List[dict]] = None
+        attachments: Optional[List[dict]] = None,
+        priority: TaskPriority = TaskPriority.INTERACTIVE,
     ) -> AsyncGenerator[BaseEvent, None]:
         """
         Chat with an agent
         """
 
         try:
-            session = await self._session_repository.find_by_id_and_user_id(session_id, user_id)
-            if not session:
+            metadata = await self._session_repository.get_metadata(session_id)
+            if not metadata or metadata.user_id != user_id:
                 logger.error(f"Attempted to chat with non-existent Session {session_id} for user {user_id}")
                 raise RuntimeError("Session not found")
 
-            task = await self._get_task(session)
+            task = await self._get_task(metadata)
 
             if message:
-                if session.status != SessionStatus.RUNNING:
+                # Messages for a live task, even one still waiting for a slot, go to its input stream
+                new_task = not task or task.done
+                if new_task:
+                    session = await self._session_repository.find_by_id(session_id)
+                    if not session:
+                        raise RuntimeError("Session not found")
                     task = await self._create_task(session)
                     if not task:
                         raise RuntimeError("Failed to create task")
@@ -151,30 +296,23 @@ class AgentDomainService:
                     attachments=[FileInfo(file_id=attachment["file_id"], filename=attachment["filename"]) for attachment in attachments] if attachments else None
                 )
 
-                event_id = await task.input_stream.put(message_event.model_dump_json())
+                event_id = await task.input_stream.put(encode_event(message_event))
 
                 message_event.id = event_id
-                await self._session_repository.add_event(session_id, message_event)
+                if new_task:
+                    # Nothing of the session is buffered before a new task starts, so the message goes first.
+                    # A live task's runner persists the message itself, after the events it emitted before it
+                    await self._session_repository.add_event(session_id, message_event)
                 
-                await task.run()
+                await task.run(priority)
                 logger.debug(f"Put message into Session {session_id}'s event queue: {message[:50]}...")
             
             logger.info(f"Session {session_id} started")
             logger.debug(f"Session {session_id} task: {task}")
            
-            while task and not task.done:
-                event_id, event_str = await task.output_stream.get(start_id=latest_event_id, block_ms=0)
-                latest_event_id = event_id
-                if event_str is None:
-                    logger.debug(f"No event found in Session {session_id}'s event queue")
-                    continue
-                event = TypeAdapter(AgentEvent).validate_json(event_str)
-                event.id = event_id
-                logger.debug(f"Got event from Session {session_id}'s event queue: {type(event).__name__}")
-                await self._session_repository.update_unread_message_count(session_id, 0)
-                yield event
-                if isinstance(event, (DoneEvent, ErrorEvent, WaitEvent)):
-                    break
+            if task:
+                async for event in self._follow_task(session_id, task, latest_event_id):
+                    yield event
             
             logger.info(f"Session {session_id} completed")
 
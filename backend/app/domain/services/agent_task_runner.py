@@ -1,7 +1,6 @@
 from typing import Optional, AsyncGenerator, List
 import asyncio
 import logging
-from pydantic import TypeAdapter
 from app.domain.models.message import Message
 from app.domain.models.event import (
     BaseEvent,
@@ -33,9 +32,13 @@ from app.domain.repositories.mcp_repository import MCPRepository
 from app.domain.models.session import SessionStatus
 from app.domain.models.file import FileInfo
 from app.domain.utils.json_parser import JsonParser
+from app.domain.utils.event_codec import decode_event, document_to_json, event_to_document
 from app.domain.services.tools.mcp import MCPTool
 from app.domain.models.tool_result import ToolResult
 from app.domain.models.search import SearchResults
+from app.domain.services.screenshot_service import ScreenshotService
+from app.domain.services.session_event_writer import SessionEventWriter
+from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +74,22 @@ class AgentTaskRunner(TaskRunner):
         self._mcp_repository = mcp_repository
         self._scheduled_task_service = scheduled_task_service
         self._mcp_tool = MCPTool()
+        settings = get_settings()
+        self._screenshot_service = ScreenshotService(
+            browser=self._browser,
+            file_storage=self._file_storage,
+            user_id=self._user_id,
+            image_format=settings.screenshot_format,
+            quality=settings.screenshot_quality,
+            dedup_enabled=settings.screenshot_dedup_enabled,
+            dedup_threshold=settings.screenshot_dedup_threshold,
+        )
+        self._event_writer = SessionEventWriter(
+            self._session_repository,
+            self._session_id,
+            flush_interval=settings.session_event_flush_interval_ms / 1000,
+            max_batch=settings.session_event_flush_max_batch,
+        )
         self._flow = PlanActFlow(
             self._agent_id,
             self._repository,
@@ -87,23 +106,25 @@ class AgentTaskRunner(TaskRunner):
         )
 
     async def _put_and_add_event(self, task: Task, event: AgentEvent) -> None:
-        event_id = await task.output_stream.put(event.model_dump_json())
-        event.id = event_id
-        await self._session_repository.add_event(self._session_id, event)
+        # Serialize once for both the output stream and MongoDB
+        document = event_to_document(event)
+        event_id = await task.output_stream.put(document_to_json(document))
+        event.id = document["id"] = event_id
+        await self._event_writer.add(event, document)
     
     async def _pop_event(self, task: Task) -> AgentEvent:
         event_id, event_str = await task.input_stream.pop()
         if event_str is None:
             logger.warning(f"Agent {self._agent_id} received empty message")
+            if event_id is not None:
+                await task.input_stream.ack(event_id)
             return
-        event = TypeAdapter(AgentEvent).validate_json(event_str)
+        event = decode_event(event_str)
         event.id = event_id
         return event
     
     async def _get_browser_screenshot(self) -> str:
-        screenshot = await self._browser.screenshot()
-        result = await self._file_storage.upload_file(screenshot, "screenshot.png", self._user_id)
-        return result.file_id
+        return await self._screenshot_service.capture()
 
     async def _sync_file_to_storage(self, file_path: str) -> Optional[FileInfo]:
         """Upload or update file and return FileInfo"""
@@ -220,37 +241,61 @@ class AgentTaskRunner(TaskRunner):
             await self._mcp_tool.initialized(await self._mcp_repository.get_mcp_config())
             while not await task.input_stream.is_empty():
                 event = await self._pop_event(task)
-                message = ""
-                if isinstance(event, MessageEvent):
-                    message = event.message or ""
-                    await self._sync_message_attachments_to_sandbox(event)
-                    
-                logger.info(f"Agent {self._agent_id} received new message: {message[:50]}...")
+                if event is None:
+                    continue
+                input_id = event.id
+                try:
+                    if isinstance(event, MessageEvent) and await self._session_repository.get_event_seq(
+                        self._session_id, event.id
+                    ) is None:
+                        # Sent while the task was running, keep it behind the events emitted so far
+                        await self._event_writer.add(event)
+                    message = ""
+                    if isinstance(event, MessageEvent):
+                        message = event.message or ""
+                        await self._sync_message_attachments_to_sandbox(event)
+                        
+                    logger.info(f"Agent {self._agent_id} received new message: {message[:50]}...")
 
-                message_obj = Message(message=message, attachments=[attachment.file_path for attachment in event.attachments])
-                
-                async for event in self._run_flow(message_obj):
-                    await self._put_and_add_event(task, event)
-                    if isinstance(event, TitleEvent):
-                        await self._session_repository.update_title(self._session_id, event.title)
-                    elif isinstance(event, MessageEvent):
-                        await self._session_repository.update_latest_message(self._session_id, event.message, event.timestamp)
-                        await self._session_repository.increment_unread_message_count(self._session_id)
-                    elif isinstance(event, WaitEvent):
-                        await self._session_repository.update_status(self._session_id, SessionStatus.WAITING)
-                        return
-                    if not await task.input_stream.is_empty():
-                        break
+                    message_obj = Message(message=message, attachments=[attachment.file_path for attachment in event.attachments])
+
+                    # The flow reloads the latest plan from MongoDB, so events of an interrupted run must be written first
+                    await self._event_writer.flush()
+                    
+                    async for event in self._run_flow(message_obj):
+                        # Session updates are written together with the event, the wait event flushes them
+                        if isinstance(event, TitleEvent):
+                            self._event_writer.set_fields(title=event.title)
+                        elif isinstance(event, MessageEvent):
+                            self._event_writer.set_fields(latest_message=event.message, latest_message_at=event.timestamp)
+                            self._event_writer.increment_unread()
+                        elif isinstance(event, WaitEvent):
+                            self._event_writer.set_fields(status=SessionStatus.WAITING)
+                        await self._put_and_add_event(task, event)
+                        if isinstance(event, WaitEvent):
+                            return
+                        if not await task.input_stream.is_empty():
+                            break
+                finally:
+                    # Only input lost with a crashed process is redelivered
+                    await task.input_stream.ack(input_id)
 
-            await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
+            self._event_writer.set_fields(status=SessionStatus.COMPLETED)
+            await self._event_writer.flush()
         except asyncio.CancelledError:
             logger.info(f"Agent {self._agent_id} task cancelled")
+            self._event_writer.set_fields(status=SessionStatus.COMPLETED)
             await self._put_and_add_event(task, DoneEvent())
-            await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
         except Exception as e:
             logger.exception(f"Agent {self._agent_id} task encountered exception: {str(e)}")
+            self._event_writer.set_fields(status=SessionStatus.COMPLETED)
             await self._put_and_add_event(task, ErrorEvent(error=f"Task error: {str(e)}"))
-            await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
+        finally:
+            try:
+                await self._event_writer.flush()
+            except Exception as e:
+                logger.exception(f"Agent {self._agent_id} failed to write session events: {e}")
+            await self._screenshot_service.flush()
     
     async def _run_flow(self, message: Message) -> AsyncGenerator[BaseEvent, None]:
         """Process a single message through the agent's flow and yield events"""
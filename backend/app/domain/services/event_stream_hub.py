@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, List, Optional, Set, Tuple
+
+from app.domain.external.message_queue import MessageQueue
+
+logger = logging.getLogger(__name__)
+
+# Batches a subscriber may fall behind before it is detached and made to catch up
+SUBSCRIBER_BUFFER_BATCHES = 64
+# Pause before the reader retries after a failed read
+READ_RETRY_SECONDS = 1.0
+
+
+class _Subscriber:
+    """Bounded buffer of batches waiting for one client"""
+
+    def __init__(self, max_batches: int):
+        self.queue: asyncio.Queue[List[Tuple[str, Any]]] = asyncio.Queue(maxsize=max_batches)
+        self.overflowed = False
+
+
+class EventStreamHub:
+    """Fan out one output stream to many subscribers in this process
+
+    A single reader task follows the stream and copies every batch into each
+    subscriber's bounded buffer, so any number of viewers of a session costs
+    one blocking read. A subscriber that starts from an older message, or that
+    falls behind and overflows its buffer, reads the gap directly from the
+    stream before rejoining the live feed.
+    """
+
+    def __init__(
+        self,
+        stream: MessageQueue,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        buffer_batches: int = SUBSCRIBER_BUFFER_BATCHES,
+    ):
+        """
+        Args:
+            stream: Output stream to follow
+            batch_size: Maximum number of messages per read
+            block_ms: How long a read blocks before subscribers get an empty batch
+            buffer_batches: Batches buffered per subscriber before it is detached
+        """
+        self._stream = stream
+        self._batch_size = batch_size
+        self._block_ms = block_ms
+        self._buffer_batches = buffer_batches
+        self._subscribers: Set[_Subscriber] = set()
+        self._position: Optional[str] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def _attach(self) -> Tuple[_Subscriber, str]:
+        """Register a subscriber, returning the position live delivery starts after"""
+        async with self._lock:
+            if self._position is None:
+                self._position = await self._stream.get_latest_id()
+            subscriber = _Subscriber(self._buffer_batches)
+            self._subscribers.add(subscriber)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+            return subscriber, self._position
+
+    def _detach(self, subscriber: _Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    async def _read(self) -> None:
+        while self._subscribers:
+            try:
+                messages = await self._stream.get_batch(
+                    start_id=self._position,
+                    count=self._batch_size,
+                    block_ms=self._block_ms,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to read output stream: {e}")
+                await asyncio.sleep(READ_RETRY_SECONDS)
+                continue
+            if messages:
+                self._position = messages[-1][0]
+            # An empty batch tells subscribers the read timed out so they can check the task
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.queue.put_nowait(messages)
+                except asyncio.QueueFull:
+                    logger.debug("Detaching a slow output stream subscriber")
+                    subscriber.overflowed = True
+                    self._subscribers.discard(subscriber)
+
+    async def _catch_up(self, last_id: str, position: str) -> AsyncGenerator[List[Tuple[str, Any]], None]:
+        """Read messages after last_id up to and including position from the stream"""
+        while _id_tuple(last_id) < _id_tuple(position):
+            messages = await self._stream.get_batch(start_id=last_id, count=self._batch_size)
+            messages = [message for message in messages if _id_tuple(message[0]) <= _id_tuple(position)]
+            if not messages:
+                return
+            last_id = messages[-1][0]
+            yield messages
+
+    async def subscribe(self, start_id: Optional[str] = None) -> AsyncGenerator[List[Tuple[str, Any]], None]:
+        """Yield batches of messages after start_id until the caller stops iterating
+
+        An empty batch is yielded whenever the stream stayed idle for a whole read.
+
+        Args:
+            start_id: Message ID to resume after, None or an unknown format starts from the earliest message
+        """
+        last_id = start_id if start_id and _is_message_id(start_id) else "0"
+        subscriber, position = await self._attach()
+        try:
+            while True:
+                async for messages in self._catch_up(last_id, position):
+                    last_id = messages[-1][0]
+                    yield messages
+                while not (subscriber.overflowed and subscriber.queue.empty()):
+                    batch = await subscriber.queue.get()
+                    if not batch:
+                        yield batch
+                        continue
+                    # Live batches may overlap what the catch-up read already delivered
+                    messages = [message for message in batch if _id_tuple(message[0]) > _id_tuple(last_id)]
+                    if messages:
+                        last_id = messages[-1][0]
+                        yield messages
+                self._detach(subscriber)
+                subscriber, position = await self._attach()
+        finally:
+            self._detach(subscriber)
+
+
+def _is_message_id(message_id: str) -> bool:
+    try:
+        _id_tuple(message_id)
+    except ValueError:
+        return False
+    return True
+
+
+def _id_tuple(message_id: str) -> Tuple[int, int]:
+    milliseconds, _, sequence = message_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
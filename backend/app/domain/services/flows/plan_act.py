@@ -123,7 +123,7 @@ class PlanActFlow(BaseFlow):
     async def run(self, message: Message) -> AsyncGenerator[BaseEvent, None]:
 
         # TODO: move to task runner
-        session = await self._session_repository.find_by_id(self._session_id)
+        session = await self._session_repository.get_metadata(self._session_id)
         if not session:
             raise ValueError(f"Session {self._session_id} not found")
         
@@ -141,7 +141,8 @@ class PlanActFlow(BaseFlow):
             self.status = AgentStatus.EXECUTING
 
         await self._session_repository.update_status(self._session_id, SessionStatus.RUNNING)  
-        self.plan = session.get_last_plan()
+        plan_event = await self._session_repository.get_last_event(self._session_id, "plan")
+        self.plan = plan_event.plan if plan_event else None
 
         logger.info(f"Agent {self._agent_id} started processing message: {message.message[:50]}...")
         step = None
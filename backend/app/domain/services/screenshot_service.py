@@ -0,0 +1,138 @@
+import io
+import asyncio
+import logging
+from typing import Optional, Set
+
+from PIL import Image
+
+from app.domain.external.browser import Browser
+from app.domain.external.file import FileStorage
+
+logger = logging.getLogger(__name__)
+
+# Side length of the difference hash grid, giving HASH_SIZE * HASH_SIZE bits
+HASH_SIZE = 16
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+FILE_EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpg",
+    "webp": "webp",
+}
+
+
+def difference_hash(image_data: bytes, hash_size: int = HASH_SIZE) -> Optional[int]:
+    """Compute a perceptual difference hash (dHash) of an encoded image
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale grid and each
+    bit records whether a pixel is brighter than its right neighbour.
+
+    Args:
+        image_data: Encoded image bytes
+        hash_size: Side length of the hash grid
+
+    Returns:
+        Hash as an integer, None if the image cannot be decoded
+    """
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            # Let JPEG decode at reduced scale instead of full resolution
+            image.draft("L", (hash_size * 8, hash_size * 8))
+            pixels = list(image.convert("L").resize((hash_size + 1, hash_size)).getdata())
+    except Exception as e:
+        logger.warning(f"Failed to compute screenshot hash: {e}")
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_distance(left: int, right: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(left ^ right).count("1")
+
+
+class ScreenshotService:
+    """Capture browser screenshots and store them without blocking the agent
+
+    Screenshots are taken in a compressed format. A frame that looks the same as
+    the previously stored one reuses its file ID, and new frames are uploaded in
+    the background under a pre-allocated file ID so events can be published
+    before the upload finishes.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        file_storage: FileStorage,
+        user_id: str,
+        image_format: str = "jpeg",
+        quality: Optional[int] = 75,
+        dedup_enabled: bool = True,
+        dedup_threshold: int = 0,
+    ):
+        self._browser = browser
+        self._file_storage = file_storage
+        self._user_id = user_id
+        self._image_format = image_format
+        self._quality = None if image_format == "png" else quality
+        self._dedup_enabled = dedup_enabled
+        self._dedup_threshold = dedup_threshold
+        self._last_hash: Optional[int] = None
+        self._last_file_id: Optional[str] = None
+        self._uploads: Set[asyncio.Task] = set()
+
+    async def capture(self) -> str:
+        """Capture the current page and return the file ID it is stored under"""
+        screenshot = await self._browser.screenshot(image_format=self._image_format, quality=self._quality)
+
+        frame_hash = None
+        if self._dedup_enabled:
+            frame_hash = await asyncio.to_thread(difference_hash, screenshot)
+            if (
+                frame_hash is not None
+                and self._last_hash is not None
+                and hash_distance(frame_hash, self._last_hash) <= self._dedup_threshold
+            ):
+                logger.debug(f"Skipping duplicate screenshot, reusing file {self._last_file_id}")
+                return self._last_file_id
+
+        file_id = self._file_storage.new_file_id()
+        upload = asyncio.create_task(self._upload(file_id, screenshot))
+        self._uploads.add(upload)
+        upload.add_done_callback(self._uploads.discard)
+
+        self._last_hash = frame_hash
+        self._last_file_id = file_id
+        return file_id
+
+    async def _upload(self, file_id: str, screenshot: bytes) -> None:
+        """Upload a screenshot under its pre-allocated file ID"""
+        try:
+            await self._file_storage.upload_file(
+                io.BytesIO(screenshot),
+                f"screenshot.{FILE_EXTENSIONS.get(self._image_format, self._image_format)}",
+                self._user_id,
+                content_type=CONTENT_TYPES.get(self._image_format),
+                file_id=file_id,
+            )
+        except Exception as e:
+            logger.exception(f"Failed to upload screenshot {file_id}: {e}")
+            # Never hand out an ID whose upload failed as a duplicate of later frames
+            if self._last_file_id == file_id:
+                self._last_hash = None
+                self._last_file_id = None
+
+    async def flush(self) -> None:
+        """Wait for all pending uploads to finish"""
+        if self._uploads:
+            await asyncio.gather(*list(self._uploads), return_exceptions=True)
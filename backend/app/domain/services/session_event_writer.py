@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.domain.models.event import BaseEvent, DoneEvent, ErrorEvent, WaitEvent
+from app.domain.repositories.session_repository import SessionRepository
+from app.domain.utils.event_codec import event_to_document
+
+logger = logging.getLogger(__name__)
+
+# Events after which the session stops or waits for the user
+TERMINAL_EVENTS = (DoneEvent, ErrorEvent, WaitEvent)
+
+
+class SessionEventWriter:
+    """Write-behind buffer for the events and list fields of a running session
+
+    Events are persisted in batches together with the session fields they
+    change, one write per flush instead of several per event. Live viewers are
+    not delayed since they read the task output stream. Terminal events are
+    flushed immediately, so a session that stopped is fully persisted.
+    """
+
+    def __init__(
+        self,
+        session_repository: SessionRepository,
+        session_id: str,
+        flush_interval: float,
+        max_batch: int,
+    ):
+        """
+        Args:
+            session_repository: Repository the batches are written to
+            session_id: Session the events belong to
+            flush_interval: Seconds an event may stay buffered
+            max_batch: Number of buffered events that triggers a flush
+        """
+        self._session_repository = session_repository
+        self._session_id = session_id
+        self._flush_interval = flush_interval
+        self._max_batch = max(max_batch, 1)
+        self._events: List[BaseEvent] = []
+        self._documents: List[Dict[str, Any]] = []
+        self._fields: Dict[str, Any] = {}
+        self._unread_increment = 0
+        # Keeps batches in order when a timed flush overlaps an explicit one
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._error: Optional[Exception] = None
+
+    def set_fields(self, **fields: Any) -> None:
+        """Set session fields with the next flush"""
+        self._fields.update(fields)
+
+    def increment_unread(self) -> None:
+        """Increment the unread message count with the next flush"""
+        self._unread_increment += 1
+
+    async def add(self, event: BaseEvent, document: Optional[Dict[str, Any]] = None) -> None:
+        """Buffer an event, flushing right away for terminal events and full batches
+
+        Args:
+            event: Event to persist
+            document: The event already serialized with event_to_document, reused instead of serializing again
+
+        Raises:
+            Exception: The error of a failed timed flush
+        """
+        self._raise_pending_error()
+        self._events.append(event)
+        self._documents.append(document if document is not None else event_to_document(event))
+        if isinstance(event, TERMINAL_EVENTS) or len(self._events) >= self._max_batch:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        """Write everything buffered so far"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            self._raise_pending_error()
+            if not self._events and not self._fields and not self._unread_increment:
+                return
+            events, documents = self._events, self._documents
+            fields, unread_increment = self._fields, self._unread_increment
+            self._events, self._documents, self._fields, self._unread_increment = [], [], {}, 0
+            try:
+                await self._session_repository.add_events(
+                    self._session_id, events, fields=fields, unread_increment=unread_increment, documents=documents
+                )
+            except BaseException:
+                # Put the batch back in front of what was buffered meanwhile, the next flush retries it
+                self._events = events + self._events
+                self._documents = documents + self._documents
+                self._fields = {**fields, **self._fields}
+                self._unread_increment += unread_increment
+                raise
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        # Detach first so flush() does not cancel this task halfway through the write
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Failed to write events of Session {self._session_id}: {e}")
+            self._error = e
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
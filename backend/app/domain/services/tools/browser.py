@@ -38,20 +38,25 @@ class BrowserTool(BaseTool):
             "url": {
                 "type": "string",
                 "description": "Complete URL to visit. Must include protocol prefix."
+            },
+            "load_media": {
+                "type": "boolean",
+                "description": "(Optional) Load images, video and fonts, which are skipped by default for speed. Only set to true when the task depends on visual content. Applies to later navigations as well."
             }
         },
         required=["url"]
     )
-    async def browser_navigate(self, url: str) -> ToolResult:
+    async def browser_navigate(self, url: str, load_media: Optional[bool] = None) -> ToolResult:
         """Navigate browser to specified URL
         
         Args:
             url: Complete URL address, must include protocol prefix
+            load_media: (Optional) Whether to load images, video and fonts
             
         Returns:
             Navigation result
         """
-        return await self.browser.navigate(url)
+        return await self.browser.navigate(url, load_media=load_media)
     
     @tool(
         name="browser_restart",
@@ -0,0 +1,38 @@
+from typing import Annotated, Any, Dict, Union
+
+from pydantic import Field, TypeAdapter
+from pydantic_core import to_json
+
+from app.domain.models.event import AgentEvent, BaseEvent
+
+# Tagging the union by its "type" literal lets validation jump straight to the
+# matching event class instead of trying every member in turn
+TaggedAgentEvent = Annotated[AgentEvent, Field(discriminator="type")]
+
+# Building a TypeAdapter compiles a validator, so it is done once per process
+_event_adapter: TypeAdapter = TypeAdapter(TaggedAgentEvent)
+
+
+def event_to_document(event: BaseEvent) -> Dict[str, Any]:
+    """Serialize an event to a JSON-compatible dict
+
+    The same dict can be published with document_to_json and stored in
+    MongoDB, so an event is serialized only once. Datetimes become ISO
+    strings, which validation parses back.
+    """
+    return event.model_dump(mode="json")
+
+
+def document_to_json(document: Dict[str, Any]) -> str:
+    """Encode a dict from event_to_document for the task streams"""
+    return to_json(document).decode()
+
+
+def encode_event(event: BaseEvent) -> str:
+    """Serialize an event to JSON for the task streams"""
+    return document_to_json(event_to_document(event))
+
+
+def decode_event(data: Union[str, bytes]) -> AgentEvent:
+    """Parse an event serialized by encode_event"""
+    return _event_adapter.validate_json(data)
@@ -1,25 +1,32 @@
-from typing import Dict, Any, Optional, List
-from playwright.async_api import async_playwright, Browser, Page
+from typing import Dict, Any, Optional, List, Tuple
+from playwright.async_api import Browser, BrowserContext, Page, Route, TimeoutError as PlaywrightTimeoutError
 import asyncio
+import base64
 from markdownify import markdownify
 from app.infrastructure.external.llm.openai_llm import OpenAILLM
 from app.core.config import get_settings
 from app.domain.models.tool_result import ToolResult
+from app.infrastructure.external.browser.playwright_manager import get_playwright_manager
+from app.infrastructure.external.browser.request_policy import RequestPolicy, RequestAction, TRANSPARENT_GIF
 import logging
 
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# Maximum number of characters of page content returned to the agent
+MAX_CONTENT_LENGTH = 50000
+
 class PlaywrightBrowser:
     """Playwright client that provides specific implementation of browser operations"""
     
     def __init__(self, cdp_url: str):
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
-        self.playwright = None
         self.llm = OpenAILLM()
         self.settings = get_settings()
         self.cdp_url = cdp_url
+        self.request_policy = RequestPolicy.from_settings(self.settings)
+        self._routed_context: Optional[BrowserContext] = None
         
     async def initialize(self):
         """Initialize and ensure resources are available"""
@@ -28,9 +35,8 @@ class PlaywrightBrowser:
         retry_delay = 1  # Initial wait 1 second
         for attempt in range(max_retries):
             try:
-                self.playwright = await async_playwright().start()
-                # Connect to existing Chrome instance
-                self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                # Connect to existing Chrome instance through the shared driver
+                self.browser = await get_playwright_manager().get_browser(self.cdp_url)
                 # Get all contexts
                 contexts = self.browser.contexts
                 if contexts and len(contexts[0].pages) == 1:
@@ -52,6 +58,7 @@ class PlaywrightBrowser:
                     # Create a new page in other cases
                     context = contexts[0] if contexts else await self.browser.new_context()
                     self.page = await context.new_page()
+                await self._apply_request_policy()
                 return True
             except Exception as e:
                 # Clean up failed resources
@@ -68,7 +75,7 @@ class PlaywrightBrowser:
                 await asyncio.sleep(retry_delay)
 
     async def cleanup(self):
-        """Clean up Playwright resources, first close all tabs, then close the browser"""
+        """Clean up Playwright resources, first close all tabs, then release the browser connection"""
         try:
             # If browser exists, first close all tabs
             if self.browser:
@@ -88,13 +95,9 @@ class PlaywrightBrowser:
             if self.page and not self.page.is_closed():
                 await self.page.close()
                 
-            # Close the browser
+            # Release the pooled connection, the shared driver keeps running
             if self.browser:
-                await self.browser.close()
-                
-            # Stop playwright
-            if self.playwright:
-                await self.playwright.stop()
+                await get_playwright_manager().release(self.cdp_url)
                 
         except Exception as e:
             logger.error(f"Error occurred when cleaning up resources: {e}")
@@ -102,14 +105,47 @@ class PlaywrightBrowser:
             # Reset references
             self.page = None
             self.browser = None
-            self.playwright = None
+            self._routed_context = None
     
     async def _ensure_browser(self):
         """Ensure the browser is started"""
-        if not self.browser or not self.page:
+        if (
+            not self.browser
+            or not self.browser.is_connected()
+            or not self.page
+            or self.page.is_closed()
+        ):
             if not await self.initialize():
                 raise Exception("Unable to initialize browser resources")
     
+    async def _apply_request_policy(self) -> None:
+        """Intercept requests of the page's context according to the request policy"""
+        context = self.page.context
+        if not self.request_policy.enabled or self._routed_context is context:
+            return
+        await context.route("**/*", self._route_request)
+        self._routed_context = context
+    
+    async def _route_request(self, route: Route) -> None:
+        """Load, stub or block a single request"""
+        request = route.request
+        try:
+            main_frame = request.frame.parent_frame is None
+        except Exception:
+            # Service worker requests have no frame
+            main_frame = False
+        action = self.request_policy.action_for(request.resource_type, request.url, main_frame)
+        try:
+            if action == RequestAction.STUB:
+                await route.fulfill(status=200, content_type="image/gif", body=TRANSPARENT_GIF)
+            elif action == RequestAction.BLOCK:
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+        except Exception as e:
+            # The page may have navigated or closed while the request was paused
+            logger.debug(f"Failed to route request {request.url}: {e}")
+    
     async def _ensure_page(self):
         """Ensure the page is created and update to the current active tab (rightmost tab)"""
         await self._ensure_browser()
@@ -132,34 +168,94 @@ class PlaywrightBrowser:
                         # Update to the rightmost tab
                         self.page = rightmost_page
     
-    async def wait_for_page_load(self, timeout: int = 15) -> bool:
-        """Wait for the page to finish loading, waiting up to the specified timeout
+    async def wait_for_page_load(self, timeout: Optional[int] = None) -> bool:
+        """Wait for the page to settle, waiting up to the specified timeout
+        
+        Waits for the load event, then returns as soon as either the network goes
+        idle or the DOM has gone without mutations for the configured quiet period.
         
         Args:
-            timeout: Maximum wait time (seconds), default is 15 seconds
+            timeout: Maximum wait time (seconds), defaults to the configured page load timeout
             
         Returns:
-            bool: Whether successfully waited for the page to load completely
+            bool: Whether the page settled before the timeout
         """
         await self._ensure_page()
         
-        start_time = asyncio.get_event_loop().time()
-        check_interval = 5  # Check every 5 seconds
+        if timeout is None:
+            timeout = self.settings.browser_page_load_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         
-        while asyncio.get_event_loop().time() - start_time < timeout:
-            # Check if the page has completely loaded
-            is_loaded = await self.page.evaluate("""() => {
-                return document.readyState === 'complete';
-            }""")
-            
-            if is_loaded:
-                return True
-                
-            # Wait for a while before checking again
-            await asyncio.sleep(check_interval)
+        try:
+            await self.page.wait_for_load_state("load", timeout=timeout * 1000)
+        except PlaywrightTimeoutError:
+            # Timeout, page loading not completed
+            return False
+        
+        # Playwright treats a timeout of 0 as no timeout, so never hand the waiters an exhausted budget
+        remaining_ms = int((deadline - loop.time()) * 1000)
+        if remaining_ms <= 0:
+            return False
+        waiters = []
+        if self.settings.browser_network_idle_timeout_ms > 0:
+            waiters.append(asyncio.create_task(
+                self._wait_for_network_idle(min(self.settings.browser_network_idle_timeout_ms, remaining_ms))
+            ))
+        if self.settings.browser_dom_quiet_ms > 0:
+            waiters.append(asyncio.create_task(
+                self._wait_for_dom_quiet(self.settings.browser_dom_quiet_ms, remaining_ms)
+            ))
+        if not waiters:
+            return True
         
-        # Timeout, page loading not completed
-        return False
+        try:
+            pending = set(waiters)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(task.result() for task in done):
+                    return True
+            return False
+        finally:
+            for task in waiters:
+                task.cancel()
+    
+    async def _wait_for_network_idle(self, timeout_ms: int) -> bool:
+        """Wait for Playwright's network idle event"""
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=timeout_ms)
+            return True
+        except PlaywrightTimeoutError:
+            # Pages with long polling or streaming never go idle
+            return False
+        except Exception as e:
+            logger.debug(f"Network idle wait interrupted: {e}")
+            return False
+    
+    async def _wait_for_dom_quiet(self, quiet_ms: int, timeout_ms: int) -> bool:
+        """Wait until the DOM has gone quiet_ms without mutations, using a MutationObserver"""
+        try:
+            return await self.page.evaluate("""({ quietMs, timeoutMs }) => new Promise((resolve) => {
+                let quietTimer = null;
+                let deadlineTimer = null;
+                const observer = new MutationObserver(() => {
+                    clearTimeout(quietTimer);
+                    quietTimer = setTimeout(() => finish(true), quietMs);
+                });
+                const finish = (settled) => {
+                    observer.disconnect();
+                    clearTimeout(quietTimer);
+                    clearTimeout(deadlineTimer);
+                    resolve(settled);
+                };
+                observer.observe(document, { childList: true, subtree: true, characterData: true });
+                quietTimer = setTimeout(() => finish(true), quietMs);
+                deadlineTimer = setTimeout(() => finish(false), timeoutMs);
+            })""", {"quietMs": quiet_ms, "timeoutMs": timeout_ms})
+        except Exception as e:
+            # The page navigated away while observing
+            logger.debug(f"DOM stability check interrupted: {e}")
+            return False
     
     async def _extract_content(self) -> Dict[str, Any]:
         """Extract content from the current page"""
@@ -215,34 +311,202 @@ class PlaywrightBrowser:
         # Convert to Markdown
         markdown_content = markdownify(visible_content)
 
-        max_content_length = min(50000, len(markdown_content))
+        return await self._refine_content(markdown_content)
+
+    async def _refine_content(self, content: str) -> str:
+        """Let the LLM rewrite extracted page content as clean Markdown"""
         response = await self.llm.ask([{
             "role": "system",
             "content": "You are a professional web page information extraction assistant. Please extract all information from the current page content and convert it to Markdown format."
         },
         {
             "role": "user",
-            "content": markdown_content[:max_content_length]
+            "content": content[:MAX_CONTENT_LENGTH]
         }
         ])
         
         return response.get("content", "")
+
+    async def _extract_compact_outline(self) -> Tuple[List[str], str]:
+        """Extract a deduplicated text outline and the interactive elements of the viewport
+        
+        Walks the DOM once and emits each visible text node a single time, so nested
+        elements are never serialized twice. Interactive elements are tagged with
+        data-manus-id and inlined into the outline as index:<tag>text</tag>.
+        
+        Returns:
+            Tuple[List[str], str]: (Formatted interactive elements, outline content)
+        """
+        await self._ensure_page()
+        
+        # Clear the current page's cache to ensure we always get the latest list of elements
+        self.page.interactive_elements_cache = []
+        
+        outline = await self.page.evaluate("""() => {
+            const viewportHeight = window.innerHeight;
+            const viewportWidth = window.innerWidth;
+            const interactiveSelector = 'button, a, input, textarea, select, [role="button"], [tabindex]:not([tabindex="-1"])';
+            const skippedTags = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'CANVAS', 'IFRAME']);
+            
+            const lines = [];
+            const seenLines = new Set();
+            const interactiveElements = [];
+            let buffer = [];
+            let validElementIndex = 0;
+            
+            const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+            
+            // Emit the current block as one line, dropping lines already emitted
+            const flush = () => {
+                const line = clean(buffer.join(' '));
+                buffer = [];
+                if (line && !seenLines.has(line)) {
+                    seenLines.add(line);
+                    lines.push(line);
+                }
+            };
+            
+            const labelOf = (element) => {
+                if (element.id) {
+                    const label = document.querySelector(`label[for="${CSS.escape(element.id)}"]`);
+                    if (label) return clean(label.innerText);
+                }
+                const parentLabel = element.closest('label');
+                return parentLabel ? clean(parentLabel.innerText) : '';
+            };
+            
+            const describe = (element, tagName) => {
+                let text = '';
+                if (element.value && ['input', 'textarea', 'select'].includes(tagName)) {
+                    text = element.value;
+                } else if (element.innerText && clean(element.innerText)) {
+                    text = clean(element.innerText);
+                } else if (element.alt) {
+                    text = element.alt;
+                } else if (element.title) {
+                    text = element.title;
+                } else if (element.getAttribute('aria-label')) {
+                    text = element.getAttribute('aria-label');
+                } else if (element.type) {
+                    text = `[${element.type}]`;
+                } else {
+                    text = '[No text]';
+                }
+                if (tagName === 'input') {
+                    const labelText = labelOf(element);
+                    if (labelText) text = `[Label: ${labelText}] ${text}`;
+                    if (element.placeholder) text = `${text} [Placeholder: ${element.placeholder}]`;
+                }
+                text = clean(text);
+                // Maximum limit on text length to keep it clear
+                return text.length > 100 ? text.substring(0, 97) + '...' : text;
+            };
+            
+            // Drop indices left over from previous views so selectors stay unambiguous
+            document.querySelectorAll('[data-manus-id]').forEach((element) => element.removeAttribute('data-manus-id'));
+            
+            const walk = (parent) => {
+                for (const node of parent.childNodes) {
+                    if (node.nodeType === Node.TEXT_NODE) {
+                        const text = clean(node.textContent);
+                        if (text) buffer.push(text);
+                        continue;
+                    }
+                    if (node.nodeType !== Node.ELEMENT_NODE || skippedTags.has(node.tagName.toUpperCase())) continue;
+                    
+                    // Check if the element is visible (not hidden by CSS)
+                    const style = window.getComputedStyle(node);
+                    if (
+                        style.display === 'none' ||
+                        style.visibility === 'hidden' ||
+                        style.opacity === '0'
+                    ) continue;
+                    
+                    // Skip subtrees that are entirely outside the viewport
+                    const rect = node.getBoundingClientRect();
+                    const hasSize = rect.width > 0 && rect.height > 0;
+                    if (hasSize && (
+                        rect.bottom < 0 ||
+                        rect.top > viewportHeight ||
+                        rect.right < 0 ||
+                        rect.left > viewportWidth
+                    )) continue;
+                    
+                    const tagName = node.tagName.toLowerCase();
+                    
+                    if (node.matches(interactiveSelector)) {
+                        if (!hasSize) continue;
+                        const text = describe(node, tagName);
+                        node.setAttribute('data-manus-id', `manus-element-${validElementIndex}`);
+                        interactiveElements.push({
+                            index: validElementIndex,
+                            tag: tagName,
+                            text: text,
+                            selector: `[data-manus-id="manus-element-${validElementIndex}"]`
+                        });
+                        buffer.push(`${validElementIndex}:<${tagName}>${text}</${tagName}>`);
+                        validElementIndex++;
+                        continue;
+                    }
+                    
+                    if (tagName === 'img') {
+                        if (hasSize && node.alt) buffer.push(`![${clean(node.alt)}]`);
+                        continue;
+                    }
+                    
+                    const isBlock = !style.display.startsWith('inline');
+                    if (isBlock) flush();
+                    if (/^h[1-6]$/.test(tagName)) {
+                        buffer.push('#'.repeat(Number(tagName[1])));
+                    } else if (tagName === 'li') {
+                        buffer.push('-');
+                    }
+                    walk(node);
+                    if (isBlock) flush();
+                }
+            };
+            
+            if (document.body) walk(document.body);
+            flush();
+            
+            return {
+                content: lines.join('\\n'),
+                elements: interactiveElements
+            };
+        }""")
+        
+        interactive_elements = outline.get("elements", [])
+        
+        # Update cache
+        self.page.interactive_elements_cache = interactive_elements
+        
+        formatted_elements = [
+            f"{el['index']}:<{el['tag']}>{el['text']}</{el['tag']}>"
+            for el in interactive_elements
+        ]
+        return formatted_elements, outline.get("content", "")[:MAX_CONTENT_LENGTH]
     
     async def view_page(self) -> ToolResult:
         """View visible elements within the current page's viewport and convert to Markdown format"""
         await self._ensure_page()
         
-        # Wait for the page to load completely, maximum wait 15 seconds
+        # Wait for the page to settle, bounded by the configured page load timeout
         await self.wait_for_page_load()
         
-        # First update the interactive elements cache
-        interactive_elements = await self._extract_interactive_elements()
+        if self.settings.browser_view_mode == "markdown":
+            # First update the interactive elements cache
+            interactive_elements = await self._extract_interactive_elements()
+            content = await self._extract_content()
+        else:
+            interactive_elements, content = await self._extract_compact_outline()
+            if self.settings.browser_view_llm_refine and content:
+                content = await self._refine_content(content)
         
         return ToolResult(
             success=True,
             data={
                 "interactive_elements": interactive_elements,
-                "content": await self._extract_content(),
+                "content": content,
             }
         )
     
@@ -404,14 +668,18 @@ class PlaywrightBrowser:
         
         return formatted_elements
     
-    async def navigate(self, url: str, timeout: Optional[int] = 15000) -> ToolResult:
+    async def navigate(self, url: str, timeout: Optional[int] = 15000, load_media: Optional[bool] = None) -> ToolResult:
         """Navigate to the specified URL
         
         Args:
             url: URL to navigate to
             timeout: Navigation timeout (milliseconds), default is 60 seconds
+            load_media: Load images, video and fonts for this and later navigations
+                in the session, None keeps the current setting
         """
         await self._ensure_page()
+        if load_media is not None:
+            self.request_policy.allow_media = load_media
         try:
             # Clear cache as the page is about to change
             self.page.interactive_elements_cache = []
@@ -591,27 +859,59 @@ class PlaywrightBrowser:
     
     async def screenshot(
         self,
-        full_page: Optional[bool] = False
+        full_page: Optional[bool] = False,
+        image_format: str = "png",
+        quality: Optional[int] = None
     ) -> bytes:
         """Take a screenshot of the current page
         
         Args:
             full_page: Whether to capture the full page or just the viewport
+            image_format: Image encoding, one of "png", "jpeg" or "webp"
+            quality: Compression quality 0-100, ignored for PNG
             
         Returns:
-            bytes: PNG screenshot data
+            bytes: Encoded screenshot data
         """
         await self._ensure_page()
         
+        if image_format == "webp":
+            return await self._screenshot_webp(full_page, quality)
+        
         # Configure screenshot options
         screenshot_options = {
             "full_page": full_page,
-            "type": "png"
+            "type": image_format
         }
+        if image_format == "jpeg" and quality is not None:
+            screenshot_options["quality"] = quality
         
         # Return bytes data directly
         return await self.page.screenshot(**screenshot_options)
     
+    async def _screenshot_webp(self, full_page: Optional[bool], quality: Optional[int]) -> bytes:
+        """Capture a WebP screenshot through CDP, since Playwright only encodes PNG and JPEG"""
+        cdp_session = await self.page.context.new_cdp_session(self.page)
+        try:
+            params: Dict[str, Any] = {"format": "webp"}
+            if quality is not None:
+                params["quality"] = quality
+            if full_page:
+                metrics = await cdp_session.send("Page.getLayoutMetrics")
+                content_size = metrics["cssContentSize"]
+                params["captureBeyondViewport"] = True
+                params["clip"] = {
+                    "x": 0,
+                    "y": 0,
+                    "width": content_size["width"],
+                    "height": content_size["height"],
+                    "scale": 1
+                }
+            result = await cdp_session.send("Page.captureScreenshot", params)
+            return base64.b64decode(result["data"])
+        finally:
+            await cdp_session.detach()
+    
     async def console_exec(self, javascript: str) -> ToolResult:
         """Execute JavaScript code"""
         await self._ensure_page()
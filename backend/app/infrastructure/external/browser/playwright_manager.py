@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Dict, Optional
+
+from playwright.async_api import async_playwright, Browser, Playwright
+
+logger = logging.getLogger(__name__)
+
+
+class PlaywrightManager:
+    """Process-wide owner of the Playwright driver and CDP browser connections
+
+    A single driver subprocess is shared by every PlaywrightBrowser in the
+    process, and CDP connections are pooled by CDP URL so that later turns of the
+    same session reuse the connection to their sandbox browser.
+    """
+
+    def __init__(self):
+        self._playwright: Optional[Playwright] = None
+        self._browsers: Dict[str, Browser] = {}
+        self._driver_lock = asyncio.Lock()
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+
+    async def _ensure_driver(self) -> Playwright:
+        """Start the Playwright driver if it is not running"""
+        async with self._driver_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                logger.info("Playwright driver started")
+            return self._playwright
+
+    async def _reset_driver(self) -> None:
+        """Stop the driver so the next connection starts a fresh one"""
+        async with self._driver_lock:
+            if self._playwright is None:
+                return
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Error stopping Playwright driver: {e}")
+            finally:
+                self._playwright = None
+                self._browsers.clear()
+            logger.info("Playwright driver reset")
+
+    async def get_browser(self, cdp_url: str) -> Browser:
+        """Get a connected browser for a CDP URL, connecting lazily when needed
+
+        Args:
+            cdp_url: CDP endpoint of the sandbox browser
+
+        Returns:
+            Browser: A connected Playwright browser
+        """
+        browser = self._browsers.get(cdp_url)
+        if browser and browser.is_connected():
+            return browser
+
+        lock = self._connect_locks.setdefault(cdp_url, asyncio.Lock())
+        async with lock:
+            # Another caller may have connected while we waited
+            browser = self._browsers.get(cdp_url)
+            if browser and browser.is_connected():
+                return browser
+
+            playwright = await self._ensure_driver()
+            try:
+                browser = await playwright.chromium.connect_over_cdp(cdp_url)
+            except Exception:
+                # A dead driver breaks every connection; restart it if nothing is still alive
+                if not any(other.is_connected() for other in self._browsers.values()):
+                    await self._reset_driver()
+                raise
+
+            browser.on("disconnected", lambda _: self._forget(cdp_url, browser))
+            self._browsers[cdp_url] = browser
+            logger.info(f"Connected to browser at {cdp_url} ({len(self._browsers)} pooled connections)")
+            return browser
+
+    def _forget(self, cdp_url: str, browser: Browser) -> None:
+        """Drop a disconnected browser from the pool"""
+        if self._browsers.get(cdp_url) is browser:
+            del self._browsers[cdp_url]
+            self._connect_locks.pop(cdp_url, None)
+            logger.info(f"Browser at {cdp_url} disconnected")
+
+    async def release(self, cdp_url: str) -> None:
+        """Close the pooled connection for a CDP URL
+
+        Args:
+            cdp_url: CDP endpoint of the sandbox browser
+        """
+        browser = self._browsers.pop(cdp_url, None)
+        self._connect_locks.pop(cdp_url, None)
+        if browser and browser.is_connected():
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing browser connection {cdp_url}: {e}")
+
+    async def shutdown(self) -> None:
+        """Close all connections and stop the driver"""
+        for cdp_url in list(self._browsers):
+            await self.release(cdp_url)
+        await self._reset_driver()
+
+
+@lru_cache()
+def get_playwright_manager() -> PlaywrightManager:
+    """Get the process-wide Playwright manager"""
+    return PlaywrightManager()
@@ -0,0 +1,109 @@
+from enum import Enum
+from typing import Iterable, Set
+from urllib.parse import urlsplit
+
+from app.core.config import Settings
+
+# Resource types whose loading the agent can switch back on per session
+MEDIA_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Well-known advertising and analytics hosts, subdomains included
+TRACKER_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "facebook.net",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "hotjar.com",
+    "clarity.ms",
+    "mixpanel.com",
+    "segment.io",
+    "quantserve.com",
+    "moatads.com",
+}
+
+# 1x1 transparent GIF served in place of blocked images so pages don't retry or show broken icons
+TRANSPARENT_GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\x00\x00\x00"
+    b"!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+def _split_csv(value: str) -> Set[str]:
+    return {item.strip().lower() for item in (value or "").split(",") if item.strip()}
+
+
+class RequestAction(str, Enum):
+    """What to do with an intercepted request"""
+    ALLOW = "allow"
+    BLOCK = "block"
+    STUB = "stub"
+
+
+class RequestPolicy:
+    """Decide which sandbox browser requests are loaded, stubbed or blocked"""
+
+    def __init__(
+        self,
+        blocked_resource_types: Iterable[str] = (),
+        blocked_domains: Iterable[str] = (),
+        allow_media: bool = False,
+    ):
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.blocked_domains = set(blocked_domains)
+        self.allow_media = allow_media
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "RequestPolicy":
+        """Build the default policy from configuration"""
+        blocked_domains = _split_csv(settings.browser_blocked_domains)
+        if settings.browser_block_trackers:
+            blocked_domains |= TRACKER_DOMAINS
+        return cls(
+            blocked_resource_types=_split_csv(settings.browser_blocked_resource_types),
+            blocked_domains=blocked_domains,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any request can be intercepted at all"""
+        return bool(self.blocked_resource_types or self.blocked_domains)
+
+    def _is_blocked_host(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or "").lower()
+        if not host:
+            return False
+        parts = host.split(".")
+        # Check the host and each parent domain against the block list
+        return any(".".join(parts[i:]) in self.blocked_domains for i in range(len(parts) - 1))
+
+    def action_for(self, resource_type: str, url: str, main_frame: bool = False) -> RequestAction:
+        """Decide how to handle a request
+
+        Args:
+            resource_type: Playwright resource type, e.g. "document" or "image"
+            url: Request URL
+            main_frame: Whether the request navigates the top-level page
+
+        Returns:
+            RequestAction for the request
+        """
+        # Never block a page the agent explicitly navigates to
+        if main_frame and resource_type == "document":
+            return RequestAction.ALLOW
+        if self.blocked_domains and self._is_blocked_host(url):
+            return RequestAction.BLOCK
+        if resource_type in self.blocked_resource_types:
+            if self.allow_media and resource_type in MEDIA_RESOURCE_TYPES:
+                return RequestAction.ALLOW
+            return RequestAction.STUB if resource_type == "image" else RequestAction.BLOCK
+        return RequestAction.ALLOW
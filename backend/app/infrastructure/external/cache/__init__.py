@@ -1,4 +1,5 @@
 from app.infrastructure.external.cache.redis_cache import RedisCache
+from app.infrastructure.external.cache.session_metadata_cache import SessionMetadataCache, get_session_metadata_cache
 from functools import lru_cache
 
 @lru_cache()
@@ -6,4 +7,4 @@ def get_cache():
     """Get cache implementation"""
     return RedisCache()
 
-__all__ = ['get_cache', 'RedisCache']
+__all__ = ['get_cache', 'RedisCache', 'SessionMetadataCache', 'get_session_metadata_cache']
@@ -13,7 +13,7 @@ class RedisCache:
     def __init__(self):
         self.redis_client = get_redis()
     
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, only_if_absent: bool = False) -> bool:
         """Store a value with optional TTL"""
         try:
             await self.redis_client.initialize()
@@ -21,14 +21,10 @@ class RedisCache:
             # Serialize value to JSON
             serialized_value = json.dumps(value)
             
-            if ttl is not None:
-                # Set with TTL
-                result = await self.redis_client.client.setex(key, ttl, serialized_value)
-            else:
-                # Set without TTL
-                result = await self.redis_client.client.set(key, serialized_value)
+            # SET with EX and NX covers all cases, without TTL the key never expires
+            result = await self.redis_client.client.set(key, serialized_value, ex=ttl, nx=only_if_absent)
             
-            return result is not None
+            return bool(result)
             
         except Exception as e:
             logger.error(f"Failed to set cache key {key}: {str(e)}")
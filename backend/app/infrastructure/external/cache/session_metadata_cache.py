@@ -0,0 +1,77 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import get_settings
+from app.domain.models.session import SessionMetadata
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "session:meta:"
+# Marks a just invalidated entry, long enough for reads that started before the write to finish
+TOMBSTONE = ""
+TOMBSTONE_MS = 2000
+
+
+class SessionMetadataCache:
+    """Redis cache of session metadata, shared by all API nodes and workers
+
+    Invalidation replaces the entry with a short-lived tombstone instead of
+    deleting it. Entries are only filled where no key exists, so a reader that
+    loaded the old state just before a write cannot put it back.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        """
+        Args:
+            ttl_seconds: Lifetime of cached entries, 0 disables the cache
+        """
+        self._redis = get_redis()
+        self._ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"{KEY_PREFIX}{session_id}"
+
+    async def get(self, session_id: str) -> Optional[SessionMetadata]:
+        """Get cached metadata, None on a miss or a recent invalidation"""
+        if self._ttl_seconds <= 0:
+            return None
+        try:
+            await self._redis.initialize()
+            value = await self._redis.client.get(self._key(session_id))
+            if not value:
+                return None
+            return SessionMetadata.model_validate_json(value)
+        except Exception as e:
+            logger.warning(f"Failed to read cached metadata of Session {session_id}: {e}")
+            return None
+
+    async def fill(self, metadata: SessionMetadata) -> None:
+        """Cache metadata loaded from the database unless the entry was invalidated meanwhile"""
+        if self._ttl_seconds <= 0:
+            return
+        try:
+            await self._redis.client.set(
+                self._key(metadata.id), metadata.model_dump_json(), ex=self._ttl_seconds, nx=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache metadata of Session {metadata.id}: {e}")
+
+    async def invalidate(self, session_id: str) -> None:
+        """Drop cached metadata after the session changed"""
+        if self._ttl_seconds <= 0:
+            return
+        try:
+            await self._redis.initialize()
+            await self._redis.client.set(self._key(session_id), TOMBSTONE, px=TOMBSTONE_MS)
+        except Exception as e:
+            # The stale entry expires with its TTL
+            logger.warning(f"Failed to invalidate cached metadata of Session {session_id}: {e}")
+
+
+@lru_cache()
+def get_session_metadata_cache() -> SessionMetadataCache:
+    """Get the process-wide session metadata cache"""
+    return SessionMetadataCache(ttl_seconds=get_settings().session_cache_ttl_seconds)
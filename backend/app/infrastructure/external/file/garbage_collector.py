@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import get_settings
+from app.infrastructure.external.file.gridfsfile import GridFSFileStorage, get_file_storage
+
+logger = logging.getLogger(__name__)
+
+
+class FileBlobCollector:
+    """Periodically delete stored blobs that no file references anymore
+
+    A blob whose last file was deleted is kept for a grace period, so content
+    uploaded again shortly afterwards reuses it instead of being sent again.
+    """
+
+    def __init__(self, storage: GridFSFileStorage, grace_seconds: int, interval_seconds: int):
+        self._storage = storage
+        self._grace_seconds = grace_seconds
+        self._interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start collecting in the background"""
+        if self._interval_seconds <= 0 or self._task is not None:
+            return
+        await self._storage.ensure_indexes()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"File blob collector started, interval {self._interval_seconds}s")
+
+    async def stop(self) -> None:
+        """Stop the background collection"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.collect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"File blob collection failed: {e}")
+            await asyncio.sleep(self._interval_seconds)
+
+    async def collect(self) -> int:
+        """Delete unreferenced blobs once
+
+        Returns:
+            int: Number of blobs deleted
+        """
+        deleted = await self._storage.collect_garbage(self._grace_seconds)
+        if deleted:
+            logger.info(f"File blob collector deleted {deleted} unreferenced blobs")
+        return deleted
+
+
+@lru_cache()
+def get_file_blob_collector() -> FileBlobCollector:
+    """Get the process-wide file blob collector"""
+    settings = get_settings()
+    return FileBlobCollector(
+        storage=get_file_storage(),
+        grace_seconds=settings.file_blob_gc_grace_seconds,
+        interval_seconds=settings.file_blob_gc_interval_seconds,
+    )
@@ -1,9 +1,14 @@
+import asyncio
+import hashlib
 import logging
 import io
-from typing import BinaryIO, Optional, Dict, Any, Tuple
-from datetime import datetime
+import tempfile
+from typing import AsyncIterator, BinaryIO, Optional, Dict, Any, Tuple, List
+from datetime import datetime, timedelta
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket, AsyncIOMotorGridOut
+from pymongo import ReturnDocument
 
 from app.domain.external.file import FileStorage
 from app.domain.models.file import FileInfo
@@ -13,9 +18,19 @@ from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+HASH_CHUNK_SIZE = 1024 * 1024
+# Streams that cannot be rewound are kept in memory up to this size while hashing
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
 
 class GridFSFileStorage(FileStorage):
-    """MongoDB GridFS-based file storage implementation"""
+    """MongoDB GridFS-based file storage implementation
+
+    Content is addressed by its SHA-256: each distinct content is stored once as
+    a blob with a reference count, and every uploaded file is a record pointing
+    at its blob. Files uploaded before content addressing stay in the plain
+    GridFS bucket and are still served from there.
+    """
     
     def __init__(self, mongodb: MongoDB, bucket_name: str = "fs"):
         """
@@ -29,25 +44,35 @@ class GridFSFileStorage(FileStorage):
         self.bucket_name = bucket_name
         self.settings = get_settings()
     
-    def _get_gridfs_bucket(self) -> AsyncIOMotorGridFSBucket:
-        """Get async GridFS Bucket instance"""
+    def _get_database(self):
         if not self.mongodb.client:
             raise RuntimeError("MongoDB client not initialized")
         
         # Use database name from configuration
-        database = self.mongodb.client[self.settings.mongodb_database]
-        return AsyncIOMotorGridFSBucket(database, bucket_name=self.bucket_name)
+        return self.mongodb.client[self.settings.mongodb_database]
+    
+    def _get_gridfs_bucket(self) -> AsyncIOMotorGridFSBucket:
+        """Get the GridFS bucket of files stored before content addressing"""
+        return AsyncIOMotorGridFSBucket(self._get_database(), bucket_name=self.bucket_name)
     
     def _get_files_collection(self):
-        """Get files collection for querying file metadata"""
-        if not self.mongodb.client:
-            raise RuntimeError("MongoDB client not initialized")
-        
-        database = self.mongodb.client[self.settings.mongodb_database]
-        return database[f"{self.bucket_name}.files"]
+        """Get the files collection of the legacy bucket"""
+        return self._get_database()[f"{self.bucket_name}.files"]
+    
+    def _get_blob_bucket(self) -> AsyncIOMotorGridFSBucket:
+        """Get the GridFS bucket holding one copy of each distinct content"""
+        return AsyncIOMotorGridFSBucket(self._get_database(), bucket_name=f"{self.bucket_name}.blobs")
+    
+    def _get_blobs_collection(self):
+        """Get the blob index, keyed by SHA-256 with the GridFS id and reference count"""
+        return self._get_database()[f"{self.bucket_name}.blobs.refs"]
+    
+    def _get_records_collection(self):
+        """Get the file records, shaped like GridFS file documents plus the blob hash"""
+        return self._get_database()[f"{self.bucket_name}.records"]
     
     def _create_file_info(self, file_info: Dict[str, Any], file_id: str) -> FileInfo:
-        """Create FileInfo object from GridFS file metadata"""
+        """Create FileInfo object from a file record or GridFS file document"""
         metadata = file_info.get('metadata', {})
         return FileInfo(
             file_id=str(file_info['_id']),
@@ -59,18 +84,77 @@ class GridFSFileStorage(FileStorage):
             user_id=metadata.get('user_id', '')  # Get user_id from metadata
         )
     
+    @staticmethod
+    def _parse_file_id(file_id: str) -> ObjectId:
+        try:
+            return ObjectId(file_id)
+        except Exception:
+            raise ValueError(f"Invalid file ID format: {file_id}")
+    
+    async def _find_file(self, obj_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """Find a file record, falling back to files uploaded before content addressing"""
+        file_info = await self._get_records_collection().find_one({"_id": obj_id})
+        if file_info is None:
+            file_info = await self._get_files_collection().find_one({"_id": obj_id})
+        return file_info
+    
+    async def _open_content(self, file_info: Dict[str, Any]) -> AsyncIOMotorGridOut:
+        """Open the stored content of a file record or legacy file document"""
+        if 'sha256' not in file_info:
+            return await self._get_gridfs_bucket().open_download_stream(file_info['_id'])
+        blob = await self._get_blobs_collection().find_one({"_id": file_info['sha256']})
+        if blob is None:
+            raise FileNotFoundError(f"Content of file {file_info['_id']} is missing")
+        return await self._get_blob_bucket().open_download_stream(blob['gridfs_id'])
+    
+    async def _acquire_blob(self, content: BinaryIO, sha256: str) -> None:
+        """Take a reference on the blob with this hash, storing the content if it is new"""
+        blobs = self._get_blobs_collection()
+        # Taking a reference also revives a blob released but not yet collected
+        acquire = {"$inc": {"refcount": 1}, "$unset": {"released_at": ""}}
+        if await blobs.find_one_and_update({"_id": sha256}, acquire):
+            return
+
+        grid_in = self._get_blob_bucket().open_upload_stream(sha256, metadata={"sha256": sha256})
+        try:
+            await grid_in.write(content)
+            await grid_in.close()
+        except BaseException:
+            await grid_in.abort()
+            raise
+
+        # The blob document only appears once its content is complete, concurrent
+        # uploads of the same content race here and all but one drop their copy
+        blob = await blobs.find_one_and_update(
+            {"_id": sha256},
+            {
+                "$setOnInsert": {"gridfs_id": grid_in._id, "size": grid_in.length, "created_at": datetime.utcnow()},
+                **acquire,
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if blob["gridfs_id"] != grid_in._id:
+            await self._get_blob_bucket().delete(grid_in._id)
+    
+    async def _release_blob(self, sha256: str) -> None:
+        """Drop a reference, the garbage collector removes blobs left without any"""
+        await self._get_blobs_collection().update_one(
+            {"_id": sha256},
+            {"$inc": {"refcount": -1}, "$set": {"released_at": datetime.utcnow()}},
+        )
+    
     async def upload_file(
         self,
         file_data: BinaryIO,
         filename: str,
         user_id: str,
         content_type: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None
     ) -> FileInfo:
-        """Upload file to GridFS"""
+        """Upload file, storing its content only once per distinct SHA-256"""
         try:
-            bucket = self._get_gridfs_bucket()
-            
             # Prepare metadata
             file_metadata = {
                 'filename': filename,
@@ -82,22 +166,28 @@ class GridFSFileStorage(FileStorage):
             if content_type:
                 file_metadata['contentType'] = content_type
             
-            # Upload directly from file stream to avoid loading entire file into memory
-            file_id = await bucket.upload_from_stream(
-                filename,
-                file_data,
-                metadata=file_metadata
-            )
+            # Hash before uploading so content that is already stored is never sent again
+            content, sha256, file_size = await asyncio.to_thread(_hash_content, file_data)
+            await self._acquire_blob(content, sha256)
             
-            # Get file size (can be retrieved from GridFS if needed)
-            files_collection = self._get_files_collection()
-            file_info = await files_collection.find_one({"_id": file_id})
-            file_size = file_info.get('length', 0) if file_info else 0
+            record = {
+                '_id': ObjectId(file_id) if file_id else ObjectId(),
+                'filename': filename,
+                'length': file_size,
+                'uploadDate': file_metadata['uploadDate'],
+                'metadata': file_metadata,
+                'sha256': sha256,
+            }
+            try:
+                await self._get_records_collection().insert_one(record)
+            except BaseException:
+                await self._release_blob(sha256)
+                raise
             
-            logger.info(f"File uploaded successfully: {filename} (ID: {file_id}) for user {user_id}")
+            logger.info(f"File uploaded successfully: {filename} (ID: {record['_id']}, SHA-256: {sha256}) for user {user_id}")
             
             return FileInfo(
-                file_id=str(file_id),
+                file_id=str(record['_id']),
                 filename=filename,
                 size=file_size,
                 content_type=content_type,
@@ -110,20 +200,17 @@ class GridFSFileStorage(FileStorage):
             logger.error(f"Failed to upload file {filename} for user {user_id}: {str(e)}")
             raise
     
+    def new_file_id(self) -> str:
+        """Allocate an ObjectId for a file that will be uploaded later"""
+        return str(ObjectId())
+    
     async def download_file(self, file_id: str, user_id: Optional[str] = None) -> Tuple[BinaryIO, FileInfo]:
         """Download file by file ID"""
         try:
-            bucket = self._get_gridfs_bucket()
-            files_collection = self._get_files_collection()
-            
-            # Convert ObjectId
-            try:
-                obj_id = ObjectId(file_id)
-            except Exception:
-                raise ValueError(f"Invalid file ID format: {file_id}")
+            obj_id = self._parse_file_id(file_id)
             
             # Get file information and check user ownership
-            file_info = await files_collection.find_one({"_id": obj_id})
+            file_info = await self._find_file(obj_id)
             if not file_info:
                 raise FileNotFoundError(f"File not found with ID: {file_id}")
             
@@ -132,33 +219,47 @@ class GridFSFileStorage(FileStorage):
                 file_user_id = file_info.get('metadata', {}).get('user_id')
                 if file_user_id != user_id:
                     raise PermissionError(f"Access denied: file {file_id} does not belong to user {user_id}")
-            stream = io.BytesIO()
-            await bucket.download_to_stream(obj_id, stream)
-            stream.seek(0)
+            grid_out = await self._open_content(file_info)
+            try:
+                stream = io.BytesIO(await grid_out.read())
+            finally:
+                grid_out.close()
             return stream, self._create_file_info(file_info, file_id)
             
-        except FileNotFoundError:
-            raise
         except (FileNotFoundError, PermissionError):
             raise
         except Exception as e:
             logger.error(f"Failed to download file {file_id} for user {user_id}: {str(e)}")
             raise
     
+    async def stream_file(self, file_id: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream a byte range of a file one GridFS chunk at a time"""
+        file_info = await self._find_file(self._parse_file_id(file_id))
+        if not file_info:
+            raise FileNotFoundError(f"File not found with ID: {file_id}")
+
+        grid_out = await self._open_content(file_info)
+        try:
+            end = grid_out.length if end is None else min(end, grid_out.length)
+            grid_out.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = await grid_out.readchunk()
+                if not chunk:
+                    break
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            grid_out.close()
+    
     async def delete_file(self, file_id: str, user_id: str) -> bool:
         """Delete file"""
         try:
-            bucket = self._get_gridfs_bucket()
-            files_collection = self._get_files_collection()
-            
-            # Convert ObjectId
-            try:
-                obj_id = ObjectId(file_id)
-            except Exception:
-                raise ValueError(f"Invalid file ID format: {file_id}")
+            obj_id = self._parse_file_id(file_id)
             
             # Check if file exists and belongs to user
-            file_info = await files_collection.find_one({"_id": obj_id})
+            file_info = await self._find_file(obj_id)
             if not file_info:
                 return False
             
@@ -168,8 +269,13 @@ class GridFSFileStorage(FileStorage):
                 logger.warning(f"Delete access denied: file {file_id} does not belong to user {user_id}")
                 return False
             
-            # Delete file
-            await bucket.delete(obj_id)
+            if 'sha256' in file_info:
+                # Only the request that removed the record gives up its blob reference
+                result = await self._get_records_collection().delete_one({"_id": obj_id})
+                if result.deleted_count:
+                    await self._release_blob(file_info['sha256'])
+            else:
+                await self._get_gridfs_bucket().delete(obj_id)
             logger.info(f"File deleted successfully: {file_id} by user {user_id}")
             return True
             
@@ -180,16 +286,10 @@ class GridFSFileStorage(FileStorage):
     async def get_file_info(self, file_id: str, user_id: Optional[str] = None) -> Optional[FileInfo]:
         """Get file information"""
         try:
-            files_collection = self._get_files_collection()
-            
-            # Convert ObjectId
-            try:
-                obj_id = ObjectId(file_id)
-            except Exception:
-                raise ValueError(f"Invalid file ID format: {file_id}")
+            obj_id = self._parse_file_id(file_id)
             
             # Get file information and check user ownership
-            file_info = await files_collection.find_one({"_id": obj_id})
+            file_info = await self._find_file(obj_id)
             if not file_info:
                 return None
             
@@ -205,6 +305,83 @@ class GridFSFileStorage(FileStorage):
             logger.error(f"Failed to get file info {file_id} for user {user_id}: {str(e)}")
             return None
 
+    async def get_file_infos(self, file_ids: List[str], user_id: Optional[str] = None) -> Dict[str, FileInfo]:
+        """Get information of several files with one $in query per collection"""
+        obj_ids = []
+        for file_id in set(file_ids):
+            try:
+                obj_ids.append(ObjectId(file_id))
+            except Exception:
+                logger.warning(f"Invalid file ID format: {file_id}")
+        if not obj_ids:
+            return {}
+
+        file_infos = {}
+        for collection in (self._get_records_collection(), self._get_files_collection()):
+            query: Dict[str, Any] = {"_id": {"$in": obj_ids}}
+            if user_id is not None:
+                query["metadata.user_id"] = user_id
+            async for file_info in collection.find(query):
+                file_id = str(file_info["_id"])
+                file_infos[file_id] = self._create_file_info(file_info, file_id)
+            obj_ids = [obj_id for obj_id in obj_ids if str(obj_id) not in file_infos]
+            if not obj_ids:
+                break
+        return file_infos
+
+    async def ensure_indexes(self) -> None:
+        """Create the index the garbage collector scans unreferenced blobs with"""
+        await self._get_blobs_collection().create_index([("refcount", 1), ("released_at", 1)])
+
+    async def collect_garbage(self, grace_seconds: int) -> int:
+        """Delete blobs that have had no references for longer than the grace period
+
+        Args:
+            grace_seconds: How long a released blob stays available for new uploads of the same content
+
+        Returns:
+            int: Number of blobs deleted
+        """
+        blobs = self._get_blobs_collection()
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        unreferenced = {"refcount": {"$lte": 0}, "released_at": {"$lt": cutoff}}
+        deleted = 0
+        async for blob in blobs.find(unreferenced, {"gridfs_id": 1}):
+            # The conditional delete loses against an upload that takes a new reference
+            result = await blobs.delete_one({"_id": blob["_id"], **unreferenced})
+            if not result.deleted_count:
+                continue
+            try:
+                await self._get_blob_bucket().delete(blob["gridfs_id"])
+            except NoFile:
+                pass
+            deleted += 1
+        return deleted
+
+
+def _hash_content(file_data: BinaryIO) -> Tuple[BinaryIO, str, int]:
+    """Compute the SHA-256 and size of a stream and rewind it for the upload
+
+    Streams that cannot seek are spooled to a temporary file while hashing.
+
+    Returns:
+        Tuple[BinaryIO, str, int]: Readable content, hex digest and size in bytes
+    """
+    seekable = getattr(file_data, "seekable", None)
+    spool = None if seekable and seekable() else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    start = file_data.tell() if spool is None else 0
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := file_data.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+        if spool is not None:
+            spool.write(chunk)
+    content = file_data if spool is None else spool
+    content.seek(start)
+    return content, digest.hexdigest(), size
+
+
 @lru_cache()
 def get_file_storage() -> FileStorage:
     """Get file storage instance"""
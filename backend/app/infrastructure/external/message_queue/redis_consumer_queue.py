@@ -0,0 +1,155 @@
+import os
+import time
+import uuid
+import socket
+import logging
+from typing import Any, Optional, Set, Tuple
+
+from redis.exceptions import ResponseError
+
+from app.infrastructure.external.message_queue.redis_stream_queue import RedisStreamQueue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GROUP_NAME = "consumers"
+
+
+class RedisStreamConsumerQueue(RedisStreamQueue):
+    """Redis Stream queue consumed through a consumer group
+
+    pop() delivers each message to one consumer with a single XREADGROUP, and
+    the message stays pending until ack() removes it. Messages left pending by
+    a consumer that crashed are reclaimed with XAUTOCLAIM once they have been
+    idle long enough, giving at-least-once delivery.
+    """
+
+    def __init__(
+        self,
+        stream_name: str,
+        group_name: str = DEFAULT_GROUP_NAME,
+        claim_idle_ms: int = 600000,
+        claim_interval_seconds: float = 30,
+        max_len: Optional[int] = None,
+        max_age_seconds: Optional[int] = None,
+    ):
+        """
+        Args:
+            stream_name: Redis key of the stream
+            group_name: Consumer group reading the stream
+            claim_idle_ms: Idle time after which another consumer's pending message is reclaimed
+            claim_interval_seconds: Minimum time between two reclaim attempts
+            max_len: Approximate number of entries to keep, None keeps all
+            max_age_seconds: Trim entries older than this on add, takes precedence over max_len
+        """
+        super().__init__(stream_name, max_len=max_len, max_age_seconds=max_age_seconds)
+        self._group_name = group_name
+        self._consumer_name = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._claim_idle_ms = claim_idle_ms
+        self._claim_interval_seconds = claim_interval_seconds
+        self._next_claim_at = 0.0
+        self._group_ready = False
+        self._in_flight: Set[str] = set()
+
+    async def _ensure_group(self) -> None:
+        """Create the consumer group, delivering messages already in the stream"""
+        if self._group_ready:
+            return
+        try:
+            await self._redis.client.xgroup_create(self._stream_name, self._group_name, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _claim(self) -> Optional[Tuple[str, Any]]:
+        """Take over one message left pending by a dead consumer"""
+        now = time.monotonic()
+        if now < self._next_claim_at:
+            return None
+        self._next_claim_at = now + self._claim_interval_seconds
+        result = await self._redis.client.xautoclaim(
+            self._stream_name,
+            self._group_name,
+            self._consumer_name,
+            min_idle_time=self._claim_idle_ms,
+            start_id="0-0",
+            count=1,
+        )
+        claimed = result[1] if result and len(result) > 1 else []
+        for message_id, message_data in claimed:
+            # Entries deleted while pending come back without data
+            if message_data is None:
+                await self._redis.client.xack(self._stream_name, self._group_name, message_id)
+                continue
+            logger.warning(f"Reclaimed pending message {message_id} from stream ({self._stream_name})")
+            return message_id, message_data.get("data")
+        return None
+
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
+        """Deliver the next message to this consumer
+
+        The message must be acknowledged with ack() once it has been handled,
+        otherwise it is redelivered after the claim idle time.
+
+        Args:
+            block_ms: Block time in milliseconds, defaults to None meaning no blocking
+
+        Returns:
+            Tuple[str, Any]: (Message ID, Message content), returns (None, None) if no message
+        """
+        await self._ensure_group()
+        message = await self._claim()
+        if message is None:
+            messages = await self._redis.client.xreadgroup(
+                self._group_name,
+                self._consumer_name,
+                {self._stream_name: ">"},
+                count=1,
+                block=block_ms,
+            )
+            if not messages or not messages[0][1]:
+                return None, None
+            message_id, message_data = messages[0][1][0]
+            message = (message_id, message_data.get("data"))
+        self._in_flight.add(message[0])
+        return message
+
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge a handled message and remove it from the stream"""
+        self._in_flight.discard(message_id)
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            pipe.xack(self._stream_name, self._group_name, message_id)
+            pipe.xdel(self._stream_name, message_id)
+            acked, _ = await pipe.execute()
+        return acked == 1
+
+    async def is_empty(self) -> bool:
+        """Check if no message is waiting to be delivered or reclaimed"""
+        await self._ensure_group()
+        groups = await self._redis.client.xinfo_groups(self._stream_name)
+        group = next((group for group in groups if group["name"] == self._group_name), None)
+        if group is None:
+            return await self.size() == 0
+        # Messages this consumer is still handling are not waiting, others' only once reclaimable
+        if group["pending"] > len(self._in_flight):
+            reclaimable = await self._redis.client.xpending_range(
+                self._stream_name,
+                self._group_name,
+                min="-",
+                max="+",
+                count=1,
+                idle=self._claim_idle_ms,
+            )
+            if reclaimable:
+                self._next_claim_at = 0.0
+                return False
+        lag = group.get("lag")
+        if lag is not None:
+            return lag == 0
+        latest_id = await self.get_latest_id()
+        return latest_id == "0" or _id_tuple(latest_id) <= _id_tuple(group["last-delivered-id"])
+
+
+def _id_tuple(message_id: str) -> Tuple[int, int]:
+    milliseconds, sequence = message_id.split("-")
+    return int(milliseconds), int(sequence)
@@ -1,7 +1,8 @@
 import json
+import time
 import uuid
 import asyncio
-from typing import Any, AsyncGenerator, Optional, Tuple
+from typing import Any, AsyncGenerator, Optional, Tuple, List
 import logging
 from app.infrastructure.storage.redis import get_redis
 from app.domain.external.message_queue import MessageQueue
@@ -11,10 +12,18 @@ logger = logging.getLogger(__name__)
 class RedisStreamQueue(MessageQueue):
     """Redis Stream implementation of message queue"""
     
-    def __init__(self, stream_name: str):
+    def __init__(self, stream_name: str, max_len: Optional[int] = None, max_age_seconds: Optional[int] = None):
+        """
+        Args:
+            stream_name: Redis key of the stream
+            max_len: Approximate number of entries to keep, None keeps all
+            max_age_seconds: Trim entries older than this on add, takes precedence over max_len
+        """
         self._stream_name = stream_name
         self._redis = get_redis()
         self._lock_expire_seconds = 10  # Lock expiration time
+        self._max_len = max_len
+        self._max_age_seconds = max_age_seconds
     
     async def _acquire_lock(self, lock_key: str, timeout_seconds: int = 5) -> Optional[str]:
         """Acquire distributed lock
@@ -83,7 +92,13 @@ class RedisStreamQueue(MessageQueue):
             str: Message ID
         """
         logger.debug(f"Putting message into stream ({self._stream_name}): {message}")
-        message_id = await self._redis.client.xadd(self._stream_name, {"data": message})
+        # Approximate trimming lets Redis drop whole macro nodes, keeping XADD O(1)
+        trim = {}
+        if self._max_age_seconds:
+            trim = {"minid": f"{int((time.time() - self._max_age_seconds) * 1000)}-0", "approximate": True}
+        elif self._max_len:
+            trim = {"maxlen": self._max_len, "approximate": True}
+        message_id = await self._redis.client.xadd(self._stream_name, {"data": message}, **trim)
         return message_id
     
     async def get(self, start_id: str = "0", block_ms: Optional[int] = None) -> Tuple[str, Any]:
@@ -124,6 +139,34 @@ class RedisStreamQueue(MessageQueue):
         except (KeyError, json.JSONDecodeError):
             return None, None
     
+    async def get_batch(self, start_id: str = "0", count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Get up to count messages after start_id with a single XREAD
+        
+        Args:
+            start_id: Message ID to start reading after, defaults to "0" meaning from the earliest message
+            count: Maximum number of messages to return
+            block_ms: Block time in milliseconds when no message is available, None means no blocking
+            
+        Returns:
+            List[Tuple[str, Any]]: (Message ID, Message content) pairs in order, empty if no message
+        """
+        if start_id is None:
+            start_id = "0"
+        
+        messages = await self._redis.client.xread(
+            {self._stream_name: start_id},
+            count=count,
+            block=block_ms
+        )
+        if not messages:
+            return []
+        
+        return [(message_id, message_data.get("data")) for message_id, message_data in messages[0][1]]
+    
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge a handled message, pop already removed it from the stream"""
+        return True
+    
     async def get_range(self, start_id: str = "-", end_id: str = "+", count: int = 100) -> AsyncGenerator[Tuple[str, Any], None]:
         """Get messages within a specified range
         
@@ -163,6 +206,14 @@ class RedisStreamQueue(MessageQueue):
         """Clear all messages from the stream"""
         await self._redis.client.xtrim(self._stream_name, 0)
     
+    async def expire(self, seconds: int) -> bool:
+        """Delete the stream after the given number of seconds
+
+        Returns:
+            bool: True if the expiry was set, False if the stream does not exist
+        """
+        return bool(await self._redis.client.expire(self._stream_name, seconds))
+
     async def is_empty(self) -> bool:
         """Check if the stream is empty"""
         return await self.size() == 0
@@ -0,0 +1,9 @@
+from app.infrastructure.external.notifier.redis_session_notifier import RedisSessionNotifier
+from functools import lru_cache
+
+@lru_cache()
+def get_session_notifier():
+    """Get session change notifier implementation"""
+    return RedisSessionNotifier()
+
+__all__ = ['get_session_notifier', 'RedisSessionNotifier']
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+from redis.asyncio.client import PubSub
+
+from app.domain.external.session_notifier import SessionNotifier
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "session_changes:"
+RECONNECT_DELAY_SECONDS = 1
+
+
+class RedisSessionNotifier(SessionNotifier):
+    """Redis pub/sub implementation of SessionNotifier
+
+    Each user has a channel. A process shares one pub/sub connection between all
+    of its listeners and only subscribes to the channels of users with an open
+    listener, so idle processes receive nothing.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._pubsub: Optional[PubSub] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _channel(user_id: str) -> str:
+        return f"{CHANNEL_PREFIX}{user_id}"
+
+    async def publish(self, user_id: str, session_id: str) -> None:
+        """Notify listeners of a user that one of their sessions changed"""
+        try:
+            await self._redis.initialize()
+            await self._redis.client.publish(self._channel(user_id), session_id)
+        except Exception as e:
+            # Listeners resync on reconnect, a lost notification must not fail the write
+            logger.warning(f"Failed to publish session change {session_id}: {e}")
+
+    async def subscribe(self, user_id: str) -> "asyncio.Queue[Optional[str]]":
+        """Start listening for changes to a user's sessions"""
+        queue: asyncio.Queue = asyncio.Queue()
+        async with self._lock:
+            listeners = self._listeners.setdefault(user_id, set())
+            listeners.add(queue)
+            if len(listeners) == 1:
+                try:
+                    pubsub = await self._ensure_pubsub()
+                    await pubsub.subscribe(self._channel(user_id))
+                except Exception as e:
+                    # The reader reconnects and resubscribes every listened channel
+                    logger.warning(f"Failed to subscribe to session changes of user {user_id}: {e}")
+                    await self._close_pubsub()
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read_loop())
+        return queue
+
+    async def unsubscribe(self, user_id: str, queue: "asyncio.Queue[Optional[str]]") -> None:
+        """Stop listening with a queue returned by subscribe"""
+        async with self._lock:
+            listeners = self._listeners.get(user_id)
+            if not listeners or queue not in listeners:
+                return
+            listeners.discard(queue)
+            if listeners:
+                return
+            del self._listeners[user_id]
+            if self._pubsub is not None:
+                try:
+                    await self._pubsub.unsubscribe(self._channel(user_id))
+                except Exception as e:
+                    logger.warning(f"Failed to unsubscribe from session changes of user {user_id}: {e}")
+            if not self._listeners:
+                await self._stop_reader()
+
+    async def _ensure_pubsub(self) -> PubSub:
+        if self._pubsub is None:
+            await self._redis.initialize()
+            self._pubsub = self._redis.client.pubsub(ignore_subscribe_messages=True)
+        return self._pubsub
+
+    async def _stop_reader(self) -> None:
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.cancel()
+        await self._close_pubsub()
+
+    async def _read_loop(self) -> None:
+        """Dispatch published changes to the local listeners of each user"""
+        while self._listeners:
+            try:
+                if self._pubsub is None:
+                    await self._resubscribe()
+                    continue
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                if not message or message.get("type") != "message":
+                    continue
+                user_id = message["channel"][len(CHANNEL_PREFIX):]
+                for queue in self._listeners.get(user_id, ()):
+                    queue.put_nowait(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Session change subscription lost, reconnecting: {e}")
+                await self._close_pubsub()
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _close_pubsub(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close session change subscription: {e}")
+
+    async def _resubscribe(self) -> None:
+        """Subscribe again to every listened channel and ask listeners to resync"""
+        async with self._lock:
+            if not self._listeners:
+                return
+            pubsub = await self._ensure_pubsub()
+            await pubsub.subscribe(*[self._channel(user_id) for user_id in self._listeners])
+            # Changes published while disconnected were lost
+            for listeners in self._listeners.values():
+                for queue in listeners:
+                    queue.put_nowait(None)
@@ -11,6 +11,7 @@ from app.core.config import get_settings
 from app.domain.models.tool_result import ToolResult
 from app.domain.external.sandbox import Sandbox
 from app.infrastructure.external.browser.playwright_browser import PlaywrightBrowser
+from app.infrastructure.external.browser.playwright_manager import get_playwright_manager
 from app.domain.external.browser import Browser
 from app.domain.external.llm import LLM
 
@@ -25,6 +26,7 @@ class DockerSandbox(Sandbox):
         self._vnc_url = f"ws://{self.ip}:5901"
         self._cdp_url = f"http://{self.ip}:9222"
         self._container_name = container_name
+        self._browser: Optional[PlaywrightBrowser] = None
     
     @property
     def id(self) -> str:
@@ -469,6 +471,8 @@ class DockerSandbox(Sandbox):
         try:
             if self.client:
                 await self.client.aclose()
+            self._browser = None
+            await get_playwright_manager().release(self.cdp_url)
             if self.container_name:
                 docker_client = docker.from_env()
                 docker_client.containers.get(self.container_name).remove(force=True)
@@ -485,9 +489,12 @@ class DockerSandbox(Sandbox):
             
         Returns:
             Browser: Returns a configured PlaywrightBrowser instance
-                    connected using the sandbox's CDP URL
+                    connected using the sandbox's CDP URL, reused across
+                    turns of the same session
         """
-        return PlaywrightBrowser(self.cdp_url)
+        if self._browser is None:
+            self._browser = PlaywrightBrowser(self.cdp_url)
+        return self._browser
 
     @staticmethod
     @alru_cache(maxsize=128, typed=True)
@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import math
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+RUNNING_KEY = "task:admission:running"
+QUEUE_KEY = "task:admission:queue"
+SEEN_KEY = "task:admission:seen"
+# Waiters that stopped polling this many intervals ago are dropped from the cluster queue
+STALE_POLL_INTERVALS = 5
+# Weight of the latest task duration in the running average used for ETAs
+DURATION_SMOOTHING = 0.2
+
+# Drops expired slots and vanished waiters, then admits the caller if it is
+# within the free slots counted from the head of the queue. Returns 0 when
+# admitted, otherwise the caller's 1-based position among the waiters that
+# do not fit yet.
+_ADMIT_SCRIPT = """
+local now = tonumber(ARGV[2])
+redis.call('zremrangebyscore', KEYS[1], '-inf', now)
+local stale = redis.call('zrangebyscore', KEYS[3], '-inf', now - tonumber(ARGV[6]))
+for _, member in ipairs(stale) do
+    redis.call('zrem', KEYS[2], member)
+    redis.call('zrem', KEYS[3], member)
+end
+if redis.call('zscore', KEYS[1], ARGV[1]) then
+    redis.call('zadd', KEYS[1], ARGV[3], ARGV[1])
+    return 0
+end
+redis.call('zadd', KEYS[2], 'NX', ARGV[5], ARGV[1])
+redis.call('zadd', KEYS[3], now, ARGV[1])
+local rank = redis.call('zrank', KEYS[2], ARGV[1])
+local free = tonumber(ARGV[4]) - redis.call('zcard', KEYS[1])
+if rank < free then
+    redis.call('zrem', KEYS[2], ARGV[1])
+    redis.call('zrem', KEYS[3], ARGV[1])
+    redis.call('zadd', KEYS[1], ARGV[3], ARGV[1])
+    return 0
+end
+return rank - math.max(free, 0) + 1
+"""
+
+OnWait = Callable[[int, Optional[int]], Awaitable[None]]
+
+
+class TaskAdmissionController:
+    """Bound the number of tasks executing at once on this node and in the cluster
+
+    Tasks over a limit wait in priority order, ties broken by arrival. The
+    node limit is enforced in memory. The cluster limit uses sorted sets in
+    Redis: running slots scored by lease expiry and renewed by a heartbeat,
+    waiting tasks scored by priority and arrival, and the last poll of each
+    waiter so that waiters of a crashed node do not block the queue.
+    """
+
+    def __init__(self, node_limit: int, cluster_limit: int, lease_seconds: int, poll_seconds: float = 2.0):
+        """
+        Args:
+            node_limit: Maximum tasks executing in this process, 0 for no limit
+            cluster_limit: Maximum tasks executing across all nodes, 0 for no limit
+            lease_seconds: Time without heartbeat after which a cluster slot is freed
+            poll_seconds: How often a task waiting for a cluster slot checks again
+        """
+        self._redis = get_redis()
+        self._node_limit = node_limit
+        self._cluster_limit = cluster_limit
+        self._lease_ms = lease_seconds * 1000
+        self._heartbeat_seconds = max(lease_seconds / 3, 1)
+        self._poll_seconds = poll_seconds
+        self._active: Dict[str, float] = {}
+        self._waiting: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+        self._average_seconds: Optional[float] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._node_limit > 0 or self._cluster_limit > 0
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _eta_seconds(self, position: int) -> Optional[int]:
+        if self._average_seconds is None:
+            return None
+        limit = self._cluster_limit or self._node_limit
+        return math.ceil(position / limit) * math.ceil(self._average_seconds)
+
+    async def acquire(self, task_id: str, priority: int, on_wait: OnWait) -> None:
+        """Wait until the task may execute
+
+        Args:
+            task_id: Task asking for a slot
+            priority: Rank among waiting tasks, lower goes first
+            on_wait: Called with the queue position and ETA in seconds whenever the position changes
+        """
+        if not self.enabled:
+            return
+        entry = (int(priority), next(self._sequence), task_id)
+        bisect.insort(self._waiting, entry)
+        # Tasks queued behind the newcomer moved back a position
+        self._notify()
+        queue_score = int(priority) * 10 ** 13 + int(time.time() * 1000)
+        reported = None
+        try:
+            while True:
+                changed = self._changed
+                position = await self._position(entry, queue_score)
+                if position == 0:
+                    break
+                if position != reported:
+                    reported = position
+                    await on_wait(position, self._eta_seconds(position))
+                try:
+                    await asyncio.wait_for(changed.wait(), self._poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            await self._leave_cluster_queue(task_id)
+            raise
+        finally:
+            self._waiting.remove(entry)
+            self._notify()
+        self._active[task_id] = time.monotonic()
+        if reported is not None:
+            logger.info(f"Task {task_id} admitted after waiting at position {reported}")
+
+    async def _position(self, entry: Tuple[int, int, str], queue_score: int) -> int:
+        """Position of a waiting task, 0 once it has been admitted"""
+        local_rank = self._waiting.index(entry)
+        if self._node_limit > 0:
+            free = self._node_limit - len(self._active)
+            if local_rank >= free:
+                return local_rank - max(free, 0) + 1
+        if self._cluster_limit <= 0:
+            return 0
+        return await self._admit_cluster(entry[2], queue_score)
+
+    async def _admit_cluster(self, task_id: str, queue_score: int) -> int:
+        await self._redis.initialize()
+        now_ms = int(time.time() * 1000)
+        position = await self._redis.client.eval(
+            _ADMIT_SCRIPT, 3, RUNNING_KEY, QUEUE_KEY, SEEN_KEY,
+            task_id, now_ms, now_ms + self._lease_ms, self._cluster_limit, queue_score,
+            int(self._poll_seconds * STALE_POLL_INTERVALS * 1000),
+        )
+        if position == 0 and self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        return int(position)
+
+    async def _leave_cluster_queue(self, task_id: str) -> None:
+        if self._cluster_limit <= 0:
+            return
+        try:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                pipe.zrem(QUEUE_KEY, task_id)
+                pipe.zrem(SEEN_KEY, task_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to remove task {task_id} from the admission queue: {e}")
+
+    async def release(self, task_id: str) -> None:
+        """Free the slot of a finished task, a no-op for tasks never admitted"""
+        started = self._active.pop(task_id, None)
+        if started is None:
+            return
+        duration = time.monotonic() - started
+        if self._average_seconds is None:
+            self._average_seconds = duration
+        else:
+            self._average_seconds += DURATION_SMOOTHING * (duration - self._average_seconds)
+        self._notify()
+        if self._cluster_limit > 0:
+            try:
+                await self._redis.client.zrem(RUNNING_KEY, task_id)
+            except Exception as e:
+                # The slot frees itself once its lease runs out
+                logger.warning(f"Failed to release admission slot of task {task_id}: {e}")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_seconds)
+            if not self._active:
+                continue
+            try:
+                expiry = int(time.time() * 1000) + self._lease_ms
+                await self._redis.client.zadd(RUNNING_KEY, {task_id: expiry for task_id in self._active}, xx=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Admission slot heartbeat failed: {e}")
+
+
+@lru_cache()
+def get_admission_controller() -> TaskAdmissionController:
+    """Get the process-wide task admission controller"""
+    settings = get_settings()
+    return TaskAdmissionController(
+        node_limit=settings.max_concurrent_tasks_per_node,
+        cluster_limit=settings.max_concurrent_tasks,
+        lease_seconds=settings.task_lease_seconds,
+    )
@@ -1,37 +1,90 @@
 import asyncio
+import json
 import uuid
 import logging
+from functools import lru_cache
 from typing import Optional, Dict
 
-from app.domain.external.task import Task, TaskRunner
+from app.core.config import get_settings
+from app.domain.external.task import Task, TaskPriority, TaskRunner
+from app.domain.models.event import QueuedEvent
+from app.domain.utils.event_codec import encode_event
 from app.infrastructure.external.message_queue.redis_stream_queue import RedisStreamQueue, MessageQueue
+from app.infrastructure.external.message_queue.redis_consumer_queue import RedisStreamConsumerQueue
+from app.infrastructure.external.task.admission import get_admission_controller
+from app.infrastructure.external.task.task_registry import get_task_registry
 
 logger = logging.getLogger(__name__)
 
+TASK_STREAM_PREFIX = "task:"
+# Tasks waiting for an agent worker, kept apart from the per-task streams
+AGENT_JOB_STREAM = "agent:jobs"
+# How often a handle to a remote task checks whether it finished
+REMOTE_WAIT_INTERVAL_SECONDS = 1.0
+
+
+@lru_cache()
+def get_agent_job_queue() -> RedisStreamConsumerQueue:
+    """Get the queue agent workers take tasks from"""
+    return RedisStreamConsumerQueue(
+        AGENT_JOB_STREAM,
+        group_name="agent_workers",
+        claim_idle_ms=get_settings().task_input_claim_idle_seconds * 1000,
+    )
+
 
 class RedisStreamTask(Task):
-    """Redis Stream-based task implementation following the Task protocol."""
+    """Redis Stream-based task implementation following the Task protocol.
+
+    A task created with a runner executes in this process and holds a lease in
+    the task registry while it runs. A task looked up by ID that runs on another
+    node is a handle without a runner: it shares the streams of the remote task,
+    and cancelling it asks the owning node to cancel. A queued task is such a
+    handle whose run() puts it on the job queue for an agent worker.
+    """
     
+    # Tasks executing in this process
     _task_registry: Dict[str, 'RedisStreamTask'] = {}
     
-    def __init__(self, runner: TaskRunner):
+    def __init__(
+        self,
+        runner: Optional[TaskRunner],
+        task_id: Optional[str] = None,
+        queued_session_id: Optional[str] = None,
+    ):
         """Initialize Redis Stream task with a task runner.
         
         Args:
-            runner: The TaskRunner instance that will execute this task
+            runner: The TaskRunner instance that will execute this task, None for a task running on another node
+            task_id: ID of an existing task, a new ID is generated when omitted
+            queued_session_id: Session an agent worker runs this task for, set for tasks not yet queued
         """
         self._runner = runner
-        self._id = str(uuid.uuid4())
+        self._id = task_id or str(uuid.uuid4())
+        self._queued_session_id = queued_session_id
         self._execution_task: Optional[asyncio.Task] = None
+        self._registry = get_task_registry()
         
         # Create input/output streams based on task ID
-        input_stream_name = f"task:input:{self._id}"
-        output_stream_name = f"task:output:{self._id}"
-        self._input_stream = RedisStreamQueue(input_stream_name)
-        self._output_stream = RedisStreamQueue(output_stream_name)
+        settings = get_settings()
+        input_stream_name = f"{TASK_STREAM_PREFIX}input:{self._id}"
+        output_stream_name = f"{TASK_STREAM_PREFIX}output:{self._id}"
+        self._input_stream = RedisStreamConsumerQueue(
+            input_stream_name,
+            claim_idle_ms=settings.task_input_claim_idle_seconds * 1000,
+            max_len=settings.task_stream_max_len or None,
+            max_age_seconds=settings.task_stream_max_age_seconds or None,
+        )
+        self._output_stream = RedisStreamQueue(
+            output_stream_name,
+            max_len=settings.task_stream_max_len or None,
+            max_age_seconds=settings.task_stream_max_age_seconds or None,
+        )
+        self._stream_ttl_seconds = settings.task_stream_ttl_seconds
         
         # Register task instance
-        RedisStreamTask._task_registry[self._id] = self
+        if runner is not None:
+            RedisStreamTask._task_registry[self._id] = self
         
     @property
     def id(self) -> str:
@@ -45,22 +98,55 @@ class RedisStreamTask(Task):
         Returns:
             bool: True if the task is done, False otherwise
         """
+        if self._runner is None:
+            return not self._registry.is_running(self._id)
         if self._execution_task is None:
             return True
         return self._execution_task.done()
     
-    async def run(self) -> None:
-        """Run the task using the provided TaskRunner."""
+    async def run(self, priority: TaskPriority = TaskPriority.INTERACTIVE) -> None:
+        """Run the task using the provided TaskRunner, once the admission controller lets it."""
+        # A remote task picks up new input from its own node
+        if self._runner is None:
+            if self._queued_session_id is not None:
+                await self._enqueue(priority)
+            return
         if self.done:
-            self._execution_task = asyncio.create_task(self._execute_task())
+            await self._registry.claim(self._id)
+            self._execution_task = asyncio.create_task(self._execute_task(priority))
             logger.info(f"Task {self._id} execution started")
     
+    async def _enqueue(self, priority: TaskPriority) -> None:
+        """Hand the task to an agent worker"""
+        await self._registry.queue(self._id)
+        await get_agent_job_queue().put(json.dumps({
+            "task_id": self._id,
+            "session_id": self._queued_session_id,
+            "priority": int(priority),
+        }))
+        self._queued_session_id = None
+        logger.info(f"Task {self._id} queued for an agent worker")
+
+    async def wait(self) -> None:
+        """Wait until the task is done."""
+        if self._execution_task is not None:
+            await asyncio.wait({self._execution_task})
+            return
+        while not self.done:
+            await asyncio.sleep(REMOTE_WAIT_INTERVAL_SECONDS)
+
     def cancel(self) -> bool:
         """Cancel the task.
 
         Returns:
             bool: True if the task is cancelled, False otherwise
         """
+        if self._runner is None:
+            if self.done:
+                return False
+            asyncio.create_task(self._registry.cancel(self._id))
+            logger.info(f"Task {self._id} cancel requested from its owner")
+            return True
         if not self.done:
             self._execution_task.cancel()
             logger.info(f"Task {self._id} cancelled")
@@ -85,7 +171,18 @@ class RedisStreamTask(Task):
         self._task_done = True
         if self._runner:
             asyncio.create_task(self._runner.on_done(self))
+        if self._stream_ttl_seconds:
+            asyncio.create_task(self._expire_streams())
+        asyncio.create_task(self._registry.release(self._id))
         self._cleanup_registry()
+
+    async def _expire_streams(self) -> None:
+        """Let the streams of a finished task expire once late readers had time to catch up"""
+        try:
+            await self._input_stream.expire(self._stream_ttl_seconds)
+            await self._output_stream.expire(self._stream_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Failed to set expiry on streams of task {self._id}: {e}")
     
     def _cleanup_registry(self) -> None:
         """Remove this task from the registry."""
@@ -93,47 +190,83 @@ class RedisStreamTask(Task):
             del RedisStreamTask._task_registry[self._id]
             logger.info(f"Task {self._id} removed from registry")
     
-    async def _execute_task(self):
+    async def _announce_queued(self, position: int, eta_seconds: Optional[int]) -> None:
+        """Tell the task's viewers where it stands in the admission queue"""
+        await self._output_stream.put(encode_event(QueuedEvent(position=position, eta_seconds=eta_seconds)))
+
+    async def _execute_task(self, priority: TaskPriority):
         """Execute the task using the TaskRunner."""
+        admission = get_admission_controller()
         try:
+            await admission.acquire(self._id, priority, self._announce_queued)
             await self._runner.run(self)
         except asyncio.CancelledError:
             logger.info(f"Task {self._id} execution cancelled")
         except Exception as e:
             logger.error(f"Task {self._id} execution failed: {str(e)}")
         finally:
+            await admission.release(self._id)
             self._on_task_done()
     
     @classmethod
-    def get(cls, task_id: str) -> Optional['RedisStreamTask']:
-        """Get a task by its ID.
+    async def get(cls, task_id: str) -> Optional['RedisStreamTask']:
+        """Get a task by its ID, wherever it runs.
 
         Returns:
             Optional[RedisStreamTask]: Task instance if found, None otherwise
         """
-        return cls._task_registry.get(task_id)
+        task = cls._task_registry.get(task_id)
+        if task is not None:
+            return task
+        if await get_task_registry().owner(task_id) is None:
+            return None
+        return cls(None, task_id)
+
+    @classmethod
+    def cancel_local(cls, task_id: str) -> None:
+        """Cancel a task executing in this process, used for cancel requests from other nodes"""
+        task = cls._task_registry.get(task_id)
+        if task is not None:
+            task.cancel()
     
     @classmethod
-    def create(cls, runner: TaskRunner) -> "RedisStreamTask":
+    def create(cls, runner: TaskRunner, task_id: Optional[str] = None) -> "RedisStreamTask":
         """Create a new task instance with the specified TaskRunner.
 
         Args:
             runner: The TaskRunner that will execute this task
+            task_id: ID to run the task under, a new ID is generated when omitted
 
         Returns:
             RedisStreamTask: New task instance
         """
-        return cls(runner)
+        return cls(runner, task_id=task_id)
+
+    @classmethod
+    def create_queued(cls, session_id: str) -> "RedisStreamTask":
+        """Create a task an agent worker executes once it is run.
+
+        Args:
+            session_id: Session the worker builds the task runner for
+
+        Returns:
+            RedisStreamTask: New task handle without a local runner
+        """
+        return cls(None, queued_session_id=session_id)
 
     @classmethod
     async def destroy(cls) -> None:
         """Destroy all task instances."""
-        for task_id in cls._task_registry:
+        registry = get_task_registry()
+        for task_id in list(cls._task_registry):
             task = cls._task_registry[task_id]
             task.cancel()
             if task._runner:
                 await task._runner.destroy()
+            # Let other nodes take over right away instead of waiting for the lease to expire
+            await registry.release(task_id)
         cls._task_registry.clear()
+        await registry.stop()
     
     def __repr__(self) -> str:
         """String representation of the task."""
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import get_settings
+from app.infrastructure.external.task.redis_task import TASK_STREAM_PREFIX
+from app.infrastructure.external.task.task_registry import get_task_registry
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamStats:
+    """Footprint of the task streams seen by one sweep"""
+    streams: int = 0
+    entries: int = 0
+    memory_bytes: int = 0
+    expiring: int = 0
+    removed: int = 0
+
+
+class TaskStreamSweeper:
+    """Periodically delete orphaned task streams and report their memory footprint
+
+    Streams normally expire after their task finishes. A stream without an expiry
+    whose task is not leased by any node and whose newest entry is older than
+    the idle limit was left behind by a crashed process and is deleted.
+    """
+
+    def __init__(self, orphan_idle_seconds: int, interval_seconds: int):
+        self._redis = get_redis()
+        self._registry = get_task_registry()
+        self._orphan_idle_seconds = orphan_idle_seconds
+        self._interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.last_stats: Optional[StreamStats] = None
+
+    async def start(self) -> None:
+        """Start sweeping in the background"""
+        if self._interval_seconds <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Task stream sweeper started, interval {self._interval_seconds}s")
+
+    async def stop(self) -> None:
+        """Stop the background sweep"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task stream sweep failed: {e}")
+            await asyncio.sleep(self._interval_seconds)
+
+    async def _last_entry_ms(self, key: str) -> Optional[int]:
+        """Timestamp of the newest entry, None for an empty stream"""
+        entries = await self._redis.client.xrevrange(key, "+", "-", count=1)
+        if not entries:
+            return None
+        return int(entries[0][0].split("-")[0])
+
+    async def sweep(self) -> StreamStats:
+        """Scan all task streams once
+
+        Returns:
+            StreamStats: Footprint of the streams left after the sweep
+        """
+        await self._redis.initialize()
+        client = self._redis.client
+        stats = StreamStats()
+        now_ms = int(time.time() * 1000)
+
+        async for key in client.scan_iter(match=f"{TASK_STREAM_PREFIX}*", count=500, _type="stream"):
+            task_id = key.rsplit(":", 1)[-1]
+            ttl = await client.ttl(key)
+            if ttl == -1 and await self._registry.owner(task_id) is None:
+                last_ms = await self._last_entry_ms(key)
+                if last_ms is None or now_ms - last_ms > self._orphan_idle_seconds * 1000:
+                    await client.delete(key)
+                    stats.removed += 1
+                    continue
+            if ttl >= 0:
+                stats.expiring += 1
+            stats.streams += 1
+            stats.entries += await client.xlen(key)
+            stats.memory_bytes += await client.memory_usage(key) or 0
+
+        self.last_stats = stats
+        logger.info(
+            f"Task streams: {stats.streams} streams, {stats.entries} entries, "
+            f"{stats.memory_bytes} bytes, {stats.expiring} expiring, {stats.removed} orphans removed"
+        )
+        return stats
+
+
+@lru_cache()
+def get_task_stream_sweeper() -> TaskStreamSweeper:
+    """Get the process-wide task stream sweeper"""
+    settings = get_settings()
+    return TaskStreamSweeper(
+        orphan_idle_seconds=settings.task_stream_orphan_idle_seconds,
+        interval_seconds=settings.task_stream_sweep_interval_seconds,
+    )
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from redis.asyncio.client import PubSub
+
+from app.core.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+LEASE_KEY_PREFIX = "task:lease:"
+# Marks a queued task that was cancelled, telling it apart from one whose queuing node died
+CANCELLED_KEY_PREFIX = "task:cancelled:"
+CANCELLED_MARKER_SECONDS = 86400
+CONTROL_CHANNEL = "task:control"
+# Lease holder of a task waiting on the job queue
+QUEUED_OWNER = "queued"
+RECONNECT_DELAY_SECONDS = 1
+
+# Only touch a lease that still belongs to this node
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+# Hand a queued task to a worker only while nobody else took it
+_TAKE_QUEUED_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('set', KEYS[1], ARGV[2], 'PX', ARGV[3]) and 1
+end
+return 0
+"""
+# Drop a task from the job queue and remember that it was cancelled
+_CANCEL_QUEUED_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    return redis.call('set', KEYS[2], '1', 'EX', ARGV[2]) and 1
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisTaskRegistry:
+    """Cluster-wide record of which node executes which task
+
+    A node holds a lease on every task it executes and renews it with a
+    heartbeat, so a crashed node's tasks are released when their leases
+    expire. The node that put a task on the job queue renews its queued lease
+    the same way until a worker takes it over. Cancel requests and completion are broadcast on a control channel:
+    the owner cancels its task, and other nodes stop treating it as running.
+    """
+
+    def __init__(self, lease_seconds: int):
+        """
+        Args:
+            lease_seconds: Time without heartbeat after which a node loses its tasks
+        """
+        self._redis = get_redis()
+        self._lease_ms = lease_seconds * 1000
+        self._heartbeat_seconds = max(lease_seconds / 3, 1)
+        self.node_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._owned: Set[str] = set()
+        # Tasks this node put on the job queue that no worker took yet
+        self._queued: Set[str] = set()
+        # Tasks of other nodes seen running, dropped on their done signal or lease expiry
+        self._remote_running: Set[str] = set()
+        self._cancel_handler: Optional[Callable[[str], None]] = None
+        self._pubsub: Optional[PubSub] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _lease_key(task_id: str) -> str:
+        return f"{LEASE_KEY_PREFIX}{task_id}"
+
+    async def start(self, cancel_handler: Callable[[str], None]) -> None:
+        """Start renewing leases and listening for control messages
+
+        Args:
+            cancel_handler: Called with the ID of a local task another node asked to cancel
+        """
+        self._cancel_handler = cancel_handler
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen_loop())
+
+    async def stop(self) -> None:
+        """Stop the background loops, leases left behind expire on their own"""
+        for task in (self._heartbeat, self._listener):
+            if task is not None:
+                task.cancel()
+        self._heartbeat = self._listener = None
+        await self._close_pubsub()
+
+    async def claim(self, task_id: str) -> None:
+        """Record this node as the owner of a task it is about to execute"""
+        self._owned.add(task_id)
+        await self._redis.initialize()
+        await self._redis.client.set(self._lease_key(task_id), self.node_id, px=self._lease_ms)
+
+    @staticmethod
+    def _cancelled_key(task_id: str) -> str:
+        return f"{CANCELLED_KEY_PREFIX}{task_id}"
+
+    async def queue(self, task_id: str) -> None:
+        """Hold a task for a worker, the worker's claim replaces this lease
+
+        The lease is renewed with this node's heartbeat for as long as the task
+        waits, so it only lapses if this node goes away first.
+
+        Args:
+            task_id: ID of the task put on the job queue
+        """
+        await self._redis.initialize()
+        await self._redis.client.set(self._lease_key(task_id), QUEUED_OWNER, px=self._lease_ms)
+        self._queued.add(task_id)
+        self._remote_running.add(task_id)
+
+    async def take_queued(self, task_id: str) -> bool:
+        """Claim a task from the job queue for this node
+
+        Returns:
+            bool: False if the task was cancelled or waited too long and must not run
+        """
+        await self._redis.initialize()
+        taken = await self._redis.client.eval(
+            _TAKE_QUEUED_SCRIPT, 1, self._lease_key(task_id), QUEUED_OWNER, self.node_id, self._lease_ms
+        )
+        if taken:
+            self._owned.add(task_id)
+        return bool(taken)
+
+    async def queued_lease_lost(self, task_id: str) -> bool:
+        """Check whether a queued task nobody took lost its lease without being cancelled
+
+        Returns:
+            bool: True if the node that queued the task went away before a worker was free
+        """
+        await self._redis.initialize()
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            pipe.exists(self._lease_key(task_id))
+            pipe.exists(self._cancelled_key(task_id))
+            leased, cancelled = await pipe.execute()
+        return not leased and not cancelled
+
+    async def release(self, task_id: str) -> None:
+        """Drop the lease of a finished task and tell other nodes it is done"""
+        self._owned.discard(task_id)
+        try:
+            await self._redis.client.eval(_RELEASE_SCRIPT, 1, self._lease_key(task_id), self.node_id)
+            await self._publish("done", task_id)
+        except Exception as e:
+            logger.warning(f"Failed to release task {task_id}: {e}")
+
+    async def owner(self, task_id: str) -> Optional[str]:
+        """Get the node executing a task, None if no live node holds it"""
+        if task_id in self._owned:
+            return self.node_id
+        await self._redis.initialize()
+        node_id = await self._redis.client.get(self._lease_key(task_id))
+        if node_id is not None:
+            self._remote_running.add(task_id)
+        return node_id
+
+    def is_running(self, task_id: str) -> bool:
+        """Check from local state whether a task looked up with owner() is still running"""
+        return task_id in self._owned or task_id in self._remote_running
+
+    async def cancel(self, task_id: str) -> None:
+        """Ask the node executing a task to cancel it, or drop it from the job queue"""
+        self._queued.discard(task_id)
+        await self._redis.client.eval(
+            _CANCEL_QUEUED_SCRIPT, 2, self._lease_key(task_id), self._cancelled_key(task_id),
+            QUEUED_OWNER, CANCELLED_MARKER_SECONDS,
+        )
+        await self._publish("cancel", task_id)
+
+    async def _publish(self, action: str, task_id: str) -> None:
+        await self._redis.client.publish(CONTROL_CHANNEL, json.dumps({"action": action, "task_id": task_id}))
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_seconds)
+            try:
+                await self._renew(list(self._owned))
+                await self._renew_queued(list(self._queued))
+                await self._forget_expired(list(self._remote_running))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task lease heartbeat failed: {e}")
+
+    async def _renew(self, task_ids: Iterable[str]) -> None:
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                pipe.eval(_RENEW_SCRIPT, 1, self._lease_key(task_id), self.node_id, self._lease_ms)
+            results = await pipe.execute()
+        for task_id, renewed in zip(task_ids, results):
+            if not renewed and task_id in self._owned:
+                # The lease lapsed, e.g. after a long pause, but the task is still ours
+                logger.warning(f"Lease of task {task_id} expired, claiming it again")
+                await self._redis.client.set(self._lease_key(task_id), self.node_id, px=self._lease_ms)
+
+    async def _renew_queued(self, task_ids: Iterable[str]) -> None:
+        """Keep the tasks this node queued waiting until a worker takes them"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                pipe.eval(_RENEW_SCRIPT, 1, self._lease_key(task_id), QUEUED_OWNER, self._lease_ms)
+            results = await pipe.execute()
+        for task_id, renewed in zip(task_ids, results):
+            if not renewed:
+                # A worker took the task or it was cancelled
+                self._queued.discard(task_id)
+
+    async def _forget_expired(self, task_ids: Iterable[str]) -> None:
+        """Stop treating tasks as running once their owner stopped heartbeating"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                pipe.exists(self._lease_key(task_id))
+            results = await pipe.execute()
+        for task_id, exists in zip(task_ids, results):
+            if not exists:
+                self._remote_running.discard(task_id)
+
+    async def _listen_loop(self) -> None:
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._redis.initialize()
+                    self._pubsub = self._redis.client.pubsub(ignore_subscribe_messages=True)
+                    await self._pubsub.subscribe(CONTROL_CHANNEL)
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                if not message or message.get("type") != "message":
+                    continue
+                self._dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task control subscription lost, reconnecting: {e}")
+                await self._close_pubsub()
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    def _dispatch(self, message: Dict[str, str]) -> None:
+        action, task_id = message.get("action"), message.get("task_id")
+        if action == "done":
+            self._remote_running.discard(task_id)
+        elif action == "cancel" and task_id in self._owned and self._cancel_handler:
+            logger.info(f"Cancelling task {task_id} on request of another node")
+            self._cancel_handler(task_id)
+
+    async def _close_pubsub(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close task control subscription: {e}")
+
+
+@lru_cache()
+def get_task_registry() -> RedisTaskRegistry:
+    """Get the process-wide task registry"""
+    return RedisTaskRegistry(lease_seconds=get_settings().task_lease_seconds)
@@ -1,19 +1,31 @@
-from typing import Dict, Optional, List, Type, TypeVar, Generic, get_args, Self
+from typing import Any, Dict, Iterable, Optional, List, Type, TypeVar, Generic, get_args, Self
 from datetime import datetime, timezone, UTC
 from beanie import Document
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.domain.models.agent import Agent
 from app.domain.models.memory import Memory
-from app.domain.models.event import AgentEvent
+from app.domain.utils.event_codec import TaggedAgentEvent
 from app.domain.models.session import Session, SessionStatus
 from app.domain.models.file import FileInfo
 from app.domain.models.user import User, UserRole
 from app.domain.models.scheduled_task import ScheduledTask, ScheduledTaskStatus, ScheduledTaskConfig
 from app.domain.models.scheduled_task_execution import ScheduledTaskExecution, ExecutionStatus
-from pymongo import IndexModel, ASCENDING
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 T = TypeVar('T', bound=BaseModel)
 
+
+def get_collection(document_cls: Type[Document]):
+    """Get the raw async collection behind a Beanie document
+
+    Beanie 1.x exposes a Motor collection and 2.x a PyMongo async one; both share
+    the methods used by the repositories.
+    """
+    if hasattr(document_cls, "get_pymongo_collection"):
+        return document_cls.get_pymongo_collection()
+    return document_cls.get_motor_collection()
+
+
 class BaseDocument(Document, Generic[T]):
     def __init_subclass__(cls, id_field="id", domain_model_class: Type[T] = None, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -45,6 +57,35 @@ class BaseDocument(Document, Generic[T]):
         data[cls._ID_FIELD] = data.pop('id')
         return cls.model_validate(data)
 
+    @classmethod
+    async def upsert_from_domain(cls, domain_obj: T, exclude: Iterable[str] = ()) -> None:
+        """Insert or overwrite the document of a domain model in a single round trip
+
+        Only fields of the document schema are written, so fields maintained
+        elsewhere, and the ones in exclude, keep their stored value.
+        """
+        document = cls.from_domain(domain_obj)
+        data = document.model_dump(exclude={'id', 'revision_id', 'created_at', *exclude})
+        if 'updated_at' in cls.model_fields:
+            data['updated_at'] = datetime.now(UTC)
+        update = {"$set": data}
+        if 'created_at' in cls.model_fields:
+            update["$setOnInsert"] = {"created_at": document.created_at}
+        await get_collection(cls).update_one({cls._ID_FIELD: domain_obj.id}, update, upsert=True)
+
+    @classmethod
+    async def update_fields(cls, doc_id: str, fields: Dict[str, Any]) -> bool:
+        """Set only the given fields of a document
+
+        Returns:
+            bool: False if no document has the ID
+        """
+        fields = dict(fields)
+        if 'updated_at' in cls.model_fields:
+            fields.setdefault('updated_at', datetime.now(UTC))
+        result = await get_collection(cls).update_one({cls._ID_FIELD: doc_id}, {"$set": fields})
+        return result.matched_count > 0
+
 class UserDocument(BaseDocument[User], id_field="user_id", domain_model_class=User):
     """MongoDB document for User"""
     user_id: str
@@ -95,15 +136,32 @@ class SessionDocument(BaseDocument[Session], id_field="session_id", domain_model
     latest_message_at: Optional[datetime] = None
     created_at: datetime = datetime.now(timezone.utc)
     updated_at: datetime = datetime.now(timezone.utc)
-    events: List[AgentEvent]
     status: SessionStatus
     files: List[FileInfo] = []
     is_shared: Optional[bool] = False
+    event_seq: int = 0  # Sequence number of the last event appended to session_events
     class Settings:
         name = "sessions"
         indexes = [
-            "session_id",
-            "user_id",  # Add index for user_id for efficient queries
+            # Multikey on file paths, also serves plain session_id lookups as its prefix
+            IndexModel([("session_id", ASCENDING), ("files.file_path", ASCENDING)]),
+            # Serves the session list of a user in display order without an in-memory sort
+            IndexModel([("user_id", ASCENDING), ("latest_message_at", DESCENDING), ("session_id", DESCENDING)]),
+        ]
+
+
+class SessionEventDocument(Document):
+    """MongoDB document for a single session event, stored apart from the session"""
+    session_id: str
+    seq: int
+    event: TaggedAgentEvent
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        name = "session_events"
+        indexes = [
+            IndexModel([("session_id", ASCENDING), ("seq", ASCENDING)], unique=True),
+            IndexModel([("session_id", ASCENDING), ("event.id", ASCENDING)]),  # Resolve pagination cursors
         ]
 
 
@@ -159,4 +217,15 @@ class ScheduledTaskExecutionDocument(BaseDocument[ScheduledTaskExecution], id_fi
             "task_id",
             "user_id",
             IndexModel([("task_id", ASCENDING), ("scheduled_at", ASCENDING)]),
-        ]
\ No newline at end of file
+        ]
+
+
+# Every document collection, in the form init_beanie expects
+DOCUMENT_MODELS = [
+    AgentDocument,
+    SessionDocument,
+    SessionEventDocument,
+    UserDocument,
+    ScheduledTaskDocument,
+    ScheduledTaskExecutionDocument,
+]
@@ -14,18 +14,7 @@ class MongoAgentRepository(AgentRepository):
 
     async def save(self, agent: Agent) -> None:
         """Save or update an agent"""
-        mongo_agent = await AgentDocument.find_one(
-            AgentDocument.agent_id == agent.id
-        )
-        
-        if not mongo_agent:
-            mongo_agent = AgentDocument.from_domain(agent)
-            await mongo_agent.save()
-            return
-        
-        # Update fields from agent domain model
-        mongo_agent.update_from_domain(agent)
-        await mongo_agent.save()
+        await AgentDocument.upsert_from_domain(agent)
 
     async def find_by_id(self, agent_id: str) -> Optional[Agent]:
         """Find an agent by its ID"""
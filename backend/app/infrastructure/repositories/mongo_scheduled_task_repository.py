@@ -20,18 +20,7 @@ class MongoScheduledTaskRepository(ScheduledTaskRepository):
 
     async def save(self, task: ScheduledTask) -> None:
         """Save or update a scheduled task"""
-        mongo_task = await ScheduledTaskDocument.find_one(
-            ScheduledTaskDocument.task_id == task.id
-        )
-
-        if not mongo_task:
-            mongo_task = ScheduledTaskDocument.from_domain(task)
-            await mongo_task.save()
-            return
-
-        # Update fields from task domain model
-        mongo_task.update_from_domain(task)
-        await mongo_task.save()
+        await ScheduledTaskDocument.upsert_from_domain(task)
 
     async def find_by_id(self, task_id: str) -> Optional[ScheduledTask]:
         """Find a task by ID"""
@@ -144,17 +133,7 @@ class MongoScheduledTaskExecutionRepository(ScheduledTaskExecutionRepository):
 
     async def save(self, execution: ScheduledTaskExecution) -> None:
         """Save or update an execution record"""
-        mongo_execution = await ScheduledTaskExecutionDocument.find_one(
-            ScheduledTaskExecutionDocument.execution_id == execution.id
-        )
-
-        if not mongo_execution:
-            mongo_execution = ScheduledTaskExecutionDocument.from_domain(execution)
-            await mongo_execution.save()
-            return
-
-        mongo_execution.update_from_domain(execution)
-        await mongo_execution.save()
+        await ScheduledTaskExecutionDocument.upsert_from_domain(execution)
 
     async def find_by_id(self, execution_id: str) -> Optional[ScheduledTaskExecution]:
         """Find execution by ID"""
@@ -1,32 +1,88 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from datetime import datetime, UTC
-from app.domain.models.session import Session, SessionStatus
+from pymongo import ReturnDocument, DESCENDING
+from pymongo.errors import BulkWriteError
+from app.domain.models.session import Session, SessionMetadata, SessionStatus
 from app.domain.models.file import FileInfo
 from app.domain.repositories.session_repository import SessionRepository
-from app.domain.models.event import BaseEvent
-from app.infrastructure.models.documents import SessionDocument
+from app.domain.models.event import BaseEvent, AgentEvent
+from app.infrastructure.models.documents import SessionDocument, SessionEventDocument, get_collection
+from app.infrastructure.external.notifier import get_session_notifier
+from app.infrastructure.external.cache import get_session_metadata_cache
+from app.domain.utils.event_codec import event_to_document
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields read by the session list
+SESSION_LIST_PROJECTION = {
+    "_id": 0,
+    "session_id": 1,
+    "user_id": 1,
+    "agent_id": 1,
+    "title": 1,
+    "status": 1,
+    "unread_message_count": 1,
+    "latest_message": 1,
+    "latest_message_at": 1,
+    "is_shared": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+# Session fields held in the metadata cache, writes to them invalidate it
+METADATA_FIELDS = frozenset(("user_id", "agent_id", "status", "sandbox_id", "task_id", "is_shared"))
+METADATA_PROJECTION = {"_id": 0, "session_id": 1, **{field: 1 for field in METADATA_FIELDS}}
+
 class MongoSessionRepository(SessionRepository):
-    """MongoDB implementation of SessionRepository"""
-    
+    """MongoDB implementation of SessionRepository
+
+    Changes visible in the session list are published to the owner's session
+    change channel. Writes to metadata fields invalidate the metadata cache.
+    """
+
+    def __init__(self):
+        self._notifier = get_session_notifier()
+        self._metadata_cache = get_session_metadata_cache()
+
+    async def _update_session(self, session_id: str, update: dict) -> None:
+        """Apply an update to a session and notify the owner's listeners"""
+        document = await get_collection(SessionDocument).find_one_and_update(
+            {"session_id": session_id},
+            update,
+            projection={"user_id": 1},
+        )
+        if not document:
+            raise ValueError(f"Session {session_id} not found")
+        if METADATA_FIELDS.intersection(update.get("$set", {})):
+            await self._metadata_cache.invalidate(session_id)
+        await self._notifier.publish(document["user_id"], session_id)
+
     async def save(self, session: Session) -> None:
         """Save or update a session"""
-        mongo_session = await SessionDocument.find_one(
-            SessionDocument.session_id == session.id
+        # The event counter is advanced concurrently by add_event and never overwritten
+        await SessionDocument.upsert_from_domain(session, exclude={"event_seq"})
+        await self._metadata_cache.invalidate(session.id)
+        await self._notifier.publish(session.user_id, session.id)
+
+    async def get_metadata(self, session_id: str) -> Optional[SessionMetadata]:
+        """Get the fields needed to authorize and route requests for a session"""
+        metadata = await self._metadata_cache.get(session_id)
+        if metadata:
+            return metadata
+        document = await get_collection(SessionDocument).find_one(
+            {"session_id": session_id}, projection=METADATA_PROJECTION
         )
-        
-        if not mongo_session:
-            mongo_session = SessionDocument.from_domain(session)
-            await mongo_session.save()
-            return
-        
-        # Update fields from session domain model
-        mongo_session.update_from_domain(session)
-        await mongo_session.save()
+        if not document:
+            return None
+        document["id"] = document.pop("session_id")
+        metadata = SessionMetadata.model_validate(document)
+        await self._metadata_cache.fill(metadata)
+        return metadata
 
+    async def update_fields(self, session_id: str, fields: Dict[str, Any]) -> None:
+        """Update only the given fields of a session"""
+        await self._update_session(session_id, {"$set": {**fields, "updated_at": datetime.now(UTC)}})
 
     async def find_by_id(self, session_id: str) -> Optional[Session]:
         """Find a session by its ID"""
@@ -42,6 +98,37 @@ class MongoSessionRepository(SessionRepository):
         ).sort("-latest_message_at").to_list()
         return [mongo_session.to_domain() for mongo_session in mongo_sessions]
     
+    async def find_list_by_user_id(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[Optional[datetime], str]] = None,
+    ) -> List[Session]:
+        """Find a user's sessions for the session list, most recent message first"""
+        query: Dict[str, Any] = {"user_id": user_id}
+        if before:
+            before_at, before_id = before
+            if before_at is None:
+                # Sessions without a message sort last, ordered by ID among themselves
+                query.update({"latest_message_at": None, "session_id": {"$lt": before_id}})
+            else:
+                query["$or"] = [
+                    {"latest_message_at": {"$lt": before_at}},
+                    {"latest_message_at": before_at, "session_id": {"$lt": before_id}},
+                    {"latest_message_at": None},
+                ]
+        cursor = get_collection(SessionDocument).find(query, projection=SESSION_LIST_PROJECTION).sort(
+            [("latest_message_at", DESCENDING), ("session_id", DESCENDING)]
+        )
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        sessions = []
+        async for raw_session in cursor:
+            raw_session["id"] = raw_session.pop("session_id")
+            raw_session.setdefault("latest_message_at", None)
+            sessions.append(Session.model_validate(raw_session))
+        return sessions
+
     async def find_by_id_and_user_id(self, session_id: str, user_id: str) -> Optional[Session]:
         """Find a session by ID and user ID (for authorization)"""
         mongo_session = await SessionDocument.find_one(
@@ -52,33 +139,104 @@ class MongoSessionRepository(SessionRepository):
     
     async def update_title(self, session_id: str, title: str) -> None:
         """Update the title of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$set": {"title": title, "updated_at": datetime.now(UTC)}}
-        )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        await self._update_session(session_id, {"$set": {"title": title, "updated_at": datetime.now(UTC)}})
 
     async def update_latest_message(self, session_id: str, message: str, timestamp: datetime) -> None:
         """Update the latest message of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$set": {"latest_message": message, "latest_message_at": timestamp, "updated_at": datetime.now(UTC)}}
+        await self._update_session(session_id, {"$set": {"latest_message": message, "latest_message_at": timestamp, "updated_at": datetime.now(UTC)}})
+
+    async def add_event(self, session_id: str, event: BaseEvent) -> None:
+        """Append an event to the session's event log"""
+        # Allocate the next sequence number atomically, then insert the event on its own
+        counter = await get_collection(SessionDocument).find_one_and_update(
+            {"session_id": session_id},
+            {"$inc": {"event_seq": 1}, "$set": {"updated_at": datetime.now(UTC)}},
+            projection={"event_seq": 1},
+            return_document=ReturnDocument.AFTER,
         )
-        if not result:
+        if not counter:
             raise ValueError(f"Session {session_id} not found")
+        # Insert the raw document, the event is already validated and Beanie's encoder is slow
+        await get_collection(SessionEventDocument).insert_one({
+            "session_id": session_id,
+            "seq": counter["event_seq"],
+            "event": event_to_document(event),
+            "created_at": datetime.now(UTC),
+        })
 
-    async def add_event(self, session_id: str, event: BaseEvent) -> None:
-        """Add an event to a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$push": {"events": event.model_dump()}, "$set": {"updated_at": datetime.now(UTC)}}
+    async def add_events(
+        self,
+        session_id: str,
+        events: List[BaseEvent],
+        fields: Optional[Dict[str, Any]] = None,
+        unread_increment: int = 0,
+        documents: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Append events and update the session with one counter update and one insert"""
+        update: Dict[str, Any] = {"$set": {**(fields or {}), "updated_at": datetime.now(UTC)}}
+        increments = {}
+        if events:
+            increments["event_seq"] = len(events)
+        if unread_increment:
+            increments["unread_message_count"] = unread_increment
+        if increments:
+            update["$inc"] = increments
+        counter = await get_collection(SessionDocument).find_one_and_update(
+            {"session_id": session_id},
+            update,
+            projection={"event_seq": 1, "user_id": 1},
+            return_document=ReturnDocument.AFTER,
         )
-        if not result:
+        if not counter:
             raise ValueError(f"Session {session_id} not found")
+        if events:
+            # The counter now points at the last event of the batch
+            first_seq = counter["event_seq"] - len(events) + 1
+            now = datetime.now(UTC)
+            if documents is None:
+                documents = [event_to_document(event) for event in events]
+            await get_collection(SessionEventDocument).insert_many([
+                {"session_id": session_id, "seq": seq, "event": document, "created_at": now}
+                for seq, document in enumerate(documents, start=first_seq)
+            ])
+        if fields and METADATA_FIELDS.intersection(fields):
+            await self._metadata_cache.invalidate(session_id)
+        if fields or unread_increment:
+            await self._notifier.publish(counter["user_id"], session_id)
+
+    async def get_events(self, session_id: str, after_seq: int = 0, limit: Optional[int] = None) -> List[AgentEvent]:
+        """Get events of a session in order, starting after the given sequence number"""
+        query = SessionEventDocument.find(
+            SessionEventDocument.session_id == session_id,
+            SessionEventDocument.seq > after_seq
+        ).sort("+seq")
+        if limit is not None:
+            query = query.limit(limit)
+        return [document.event for document in await query.to_list()]
+
+    async def get_latest_events(self, session_id: str, limit: int, before_seq: Optional[int] = None) -> List[AgentEvent]:
+        """Get the latest events of a session in chronological order"""
+        query = SessionEventDocument.find(SessionEventDocument.session_id == session_id)
+        if before_seq is not None:
+            query = query.find(SessionEventDocument.seq < before_seq)
+        documents = await query.sort("-seq").limit(limit).to_list()
+        return [document.event for document in reversed(documents)]
+
+    async def get_event_seq(self, session_id: str, event_id: str) -> Optional[int]:
+        """Get the sequence number of an event by its ID"""
+        document = await get_collection(SessionEventDocument).find_one(
+            {"session_id": session_id, "event.id": event_id},
+            projection={"seq": 1}
+        )
+        return document["seq"] if document else None
+
+    async def get_last_event(self, session_id: str, event_type: str) -> Optional[AgentEvent]:
+        """Get the most recent event of a given type"""
+        document = await SessionEventDocument.find(
+            SessionEventDocument.session_id == session_id,
+            {"event.type": event_type}
+        ).sort("-seq").first_or_none()
+        return document.event if document else None
     
     async def add_file(self, session_id: str, file_info: FileInfo) -> None:
         """Add a file to a session"""
@@ -102,17 +260,14 @@ class MongoSessionRepository(SessionRepository):
 
     async def get_file_by_path(self, session_id: str, file_path: str) -> Optional[FileInfo]:
         """Get file by path from a session"""
-        mongo_session = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
+        # Served by the multikey file path index, only the matching entry is returned
+        document = await get_collection(SessionDocument).find_one(
+            {"session_id": session_id, "files.file_path": file_path},
+            projection={"_id": 0, "files": {"$elemMatch": {"file_path": file_path}}}
         )
-        if not mongo_session:
-            raise ValueError(f"Session {session_id} not found")
-        
-        # Search for file with matching path
-        for file_info in mongo_session.files:
-            if file_info.file_path == file_path:
-                return file_info
-        return None
+        if not document or not document.get("files"):
+            return None
+        return FileInfo.model_validate(document["files"][0])
 
     async def delete(self, session_id: str) -> None:
         """Delete a session"""
@@ -121,6 +276,11 @@ class MongoSessionRepository(SessionRepository):
         )
         if mongo_session:
             await mongo_session.delete()
+            await self._metadata_cache.invalidate(session_id)
+            await self._notifier.publish(mongo_session.user_id, session_id)
+        await SessionEventDocument.find(
+            SessionEventDocument.session_id == session_id
+        ).delete()
 
     async def get_all(self) -> List[Session]:
         """Get all sessions"""
@@ -129,51 +289,62 @@ class MongoSessionRepository(SessionRepository):
     
     async def update_status(self, session_id: str, status: SessionStatus) -> None:
         """Update the status of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$set": {"status": status, "updated_at": datetime.now(UTC)}}
-        )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        await self._update_session(session_id, {"$set": {"status": status, "updated_at": datetime.now(UTC)}})
 
     async def update_unread_message_count(self, session_id: str, count: int) -> None:
         """Update the unread message count of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$set": {"unread_message_count": count, "updated_at": datetime.now(UTC)}}
-        )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        await self._update_session(session_id, {"$set": {"unread_message_count": count, "updated_at": datetime.now(UTC)}})
 
     async def increment_unread_message_count(self, session_id: str) -> None:
         """Atomically increment the unread message count of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$inc": {"unread_message_count": 1}, "$set": {"updated_at": datetime.now(UTC)}}
-        )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        await self._update_session(session_id, {"$inc": {"unread_message_count": 1}, "$set": {"updated_at": datetime.now(UTC)}})
 
     async def decrement_unread_message_count(self, session_id: str) -> None:
         """Atomically decrement the unread message count of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$inc": {"unread_message_count": -1}, "$set": {"updated_at": datetime.now(UTC)}}
-        )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        await self._update_session(session_id, {"$inc": {"unread_message_count": -1}, "$set": {"updated_at": datetime.now(UTC)}})
 
     async def update_shared_status(self, session_id: str, is_shared: bool) -> None:
         """Update the shared status of a session"""
-        result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
-        ).update(
-            {"$set": {"is_shared": is_shared, "updated_at": datetime.now(UTC)}}
-        )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        await self._update_session(session_id, {"$set": {"is_shared": is_shared, "updated_at": datetime.now(UTC)}})
+
+    async def migrate_embedded_events(self) -> int:
+        """Move events still embedded in session documents into session_events
 
+        Safe to run repeatedly: sessions without an events array are skipped and
+        events already copied by an interrupted run are ignored.
+
+        Returns:
+            Number of sessions migrated
+        """
+        sessions = get_collection(SessionDocument)
+        events = get_collection(SessionEventDocument)
+        migrated = 0
+        cursor = sessions.find(
+            {"events": {"$exists": True}},
+            projection={"session_id": 1, "events": 1}
+        )
+        async for raw_session in cursor:
+            session_id = raw_session["session_id"]
+            embedded = raw_session.get("events") or []
+            if embedded:
+                now = datetime.now(UTC)
+                try:
+                    await events.insert_many(
+                        [
+                            {"session_id": session_id, "seq": seq, "event": event, "created_at": now}
+                            for seq, event in enumerate(embedded, start=1)
+                        ],
+                        ordered=False,
+                    )
+                except BulkWriteError as e:
+                    # Duplicate keys come from a previous partial run, anything else is fatal
+                    if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                        raise
+            await sessions.update_one(
+                {"_id": raw_session["_id"]},
+                {"$set": {"event_seq": len(embedded)}, "$unset": {"events": ""}}
+            )
+            migrated += 1
+        if migrated:
+            logger.info(f"Migrated embedded events of {migrated} sessions to session_events")
+        return migrated
@@ -6,6 +6,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from croniter import croniter
 import pytz
 
+from app.domain.external.task import TaskPriority
 from app.domain.models.scheduled_task import ScheduledTask, ScheduledTaskStatus
 from app.domain.models.scheduled_task_execution import ScheduledTaskExecution, ExecutionStatus
 from app.domain.repositories.scheduled_task_repository import (
@@ -124,7 +125,8 @@ class SchedulerService:
                 session_id=session.id,
                 user_id=task.user_id,
                 message=task.config.prompt,
-                attachments=[]  # TODO: Handle attachments if needed
+                attachments=[],  # TODO: Handle attachments if needed
+                priority=TaskPriority.SCHEDULED,
             ):
                 # Events are processed but we just need to wait for completion
                 pass
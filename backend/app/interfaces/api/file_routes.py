@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, UploadFile, File, Request
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+import urllib.parse
 import logging
+import re
 
 from app.application.services.file_service import FileService
 from app.application.errors.exceptions import NotFoundError
@@ -9,11 +14,15 @@ from app.domain.models.user import User
 from app.interfaces.schemas.base import APIResponse
 from app.interfaces.schemas.file import FileInfoResponse
 from app.interfaces.schemas.resource import AccessTokenRequest, SignedUrlResponse
+from app.domain.models.file import FileInfo
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# A single byte range, lists of ranges are served as the whole file
+_BYTE_RANGE = re.compile(r"bytes\s*=\s*(\d*)-(\d*)", re.IGNORECASE)
+
 @router.post("", response_model=APIResponse[FileInfoResponse])
 async def upload_file(
     file: UploadFile = File(...),
@@ -31,67 +40,135 @@ async def upload_file(
     
     return APIResponse.success(await FileInfoResponse.from_file_info(result))
 
+class _UnsatisfiableRange(Exception):
+    """The requested byte range lies outside the file"""
+
+
+def _parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Resolve a Range header to the [start, end) byte range to send
+
+    Only a single range is served, other forms are answered with the whole
+    file as HTTP allows.
+
+    Returns:
+        The byte range, None to send the whole file
+
+    Raises:
+        _UnsatisfiableRange: The range starts past the end of the file
+    """
+    match = _BYTE_RANGE.fullmatch(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range, the final bytes of the file
+        if int(last) == 0 or size == 0:
+            raise _UnsatisfiableRange()
+        return max(size - int(last), 0), size
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise _UnsatisfiableRange()
+    return start, end
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Check the conditional GET headers, If-None-Match takes precedence"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    return last_modified <= since
+
+
+def _file_response(request: Request, file_info: FileInfo, file_service: FileService) -> Response:
+    """Stream a file honouring conditional and range requests"""
+    # Stored files never change, so ID and size identify the content
+    etag = f'"{file_info.file_id}-{file_info.size or 0}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        # Let clients keep a copy but revalidate it, a deleted file must not be served from cache
+        "Cache-Control": "private, no-cache",
+    }
+    last_modified = None
+    if file_info.upload_date:
+        last_modified = file_info.upload_date.replace(microsecond=0)
+        if last_modified.tzinfo is None:
+            # MongoDB returns naive UTC datetimes
+            last_modified = last_modified.replace(tzinfo=UTC)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    # Encode filename properly for Content-Disposition header
+    # Use URL encoding for non-ASCII characters to ensure latin-1 compatibility
+    encoded_filename = urllib.parse.quote(file_info.filename or "", safe='')
+    headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{encoded_filename}"
+
+    size = file_info.size or 0
+    start, end, status_code = 0, size, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A range is only valid for the representation the client already holds part of
+    if range_header and (if_range is None or if_range.strip() in (etag, headers.get("Last-Modified"))):
+        try:
+            byte_range = _parse_byte_range(range_header, size)
+        except _UnsatisfiableRange:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+
+    return StreamingResponse(
+        file_service.stream_file(file_info.file_id, start, end),
+        status_code=status_code,
+        media_type=file_info.content_type or 'application/octet-stream',
+        headers=headers
+    )
+
 @router.get("/{file_id}")
 async def download_file_with_signature(
     file_id: str,
+    request: Request,
     file_service: FileService = Depends(get_file_service),
     signature: str = Depends(verify_signature),
 ):
     """Download file with optional access token"""
     
-    # Download file (authentication is handled by middleware for non-token requests)
-    try:
-        file_data, file_info = await file_service.download_file(file_id)
-    except FileNotFoundError:
+    # The signature grants access, so ownership is not checked
+    file_info = await file_service.get_file_info(file_id)
+    if not file_info:
         raise NotFoundError("File not found")
-    except PermissionError:
-        raise NotFoundError("File not found")  # Don't reveal if file exists but user has no access
-    
-    # Encode filename properly for Content-Disposition header
-    # Use URL encoding for non-ASCII characters to ensure latin-1 compatibility
-    import urllib.parse
-    encoded_filename = urllib.parse.quote(file_info.filename, safe='')
-    
-    headers = {
-        'Content-Disposition': f'attachment; filename*=UTF-8\'\'{encoded_filename}'
-    }
-    
-    return StreamingResponse(
-        file_data,
-        media_type=file_info.content_type or 'application/octet-stream',
-        headers=headers
-    )
+    return _file_response(request, file_info, file_service)
 
 @router.get("/{file_id}/download")
 async def download_file(
     file_id: str,
+    request: Request,
     file_service: FileService = Depends(get_file_service),
     current_user: User = Depends(get_optional_current_user)
 ):
     """Download file with optional access token"""
     
-    # Download file (authentication is handled by middleware for non-token requests)
-    try:
-        file_data, file_info = await file_service.download_file(file_id, current_user.id if current_user else None)
-    except FileNotFoundError:
+    # Missing files and files of other users both look not found
+    file_info = await file_service.get_file_info(file_id, current_user.id if current_user else None)
+    if not file_info:
         raise NotFoundError("File not found")
-    except PermissionError:
-        raise NotFoundError("File not found")  # Don't reveal if file exists but user has no access
-    
-    # Encode filename properly for Content-Disposition header
-    # Use URL encoding for non-ASCII characters to ensure latin-1 compatibility
-    import urllib.parse
-    encoded_filename = urllib.parse.quote(file_info.filename, safe='')
-    
-    headers = {
-        'Content-Disposition': f'attachment; filename*=UTF-8\'\'{encoded_filename}'
-    }
-    
-    return StreamingResponse(
-        file_data,
-        media_type=file_info.content_type or 'application/octet-stream',
-        headers=headers
-    )
+    return _file_response(request, file_info, file_service)
 
 @router.delete("/{file_id}", response_model=APIResponse[None])
 async def delete_file(
@@ -134,7 +211,8 @@ async def create_file_signed_url(
     
     try:
         # Create signed URL using file service
-        signed_url = await file_service.create_signed_url(
+        # A cached signature may expire sooner than requested, so report its real lifetime
+        signed_url, expires_in = await file_service.create_signed_url_with_expiry(
             file_id=file_id,
             user_id=current_user.id,
             expire_minutes=request_data.expire_minutes
@@ -142,7 +220,7 @@ async def create_file_signed_url(
         
         return APIResponse.success(SignedUrlResponse(
             signed_url=signed_url,
-            expires_in=request_data.expire_minutes * 60,
+            expires_in=expires_in,
         ))
     except FileNotFoundError:
         raise NotFoundError("File not found")
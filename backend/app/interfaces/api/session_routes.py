@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query
+from fastapi import APIRouter, Depends, Header, WebSocket, WebSocketDisconnect, Query
 from sse_starlette.sse import EventSourceResponse
 from typing import AsyncGenerator, List, Optional
 from sse_starlette.event import ServerSentEvent
@@ -10,12 +10,12 @@ from app.interfaces.dependencies import get_file_service
 
 from app.application.services.agent_service import AgentService
 from app.application.services.token_service import TokenService
-from app.application.errors.exceptions import NotFoundError, UnauthorizedError
+from app.application.errors.exceptions import NotFoundError, UnauthorizedError, BadRequestError
 from app.interfaces.dependencies import get_agent_service, get_current_user, get_optional_current_user, get_token_service, verify_signature_websocket
 from app.interfaces.schemas.base import APIResponse
 from app.interfaces.schemas.session import (
     ChatRequest, ShellViewRequest, CreateSessionResponse, GetSessionResponse,
-    ListSessionItem, ListSessionResponse, ShellViewResponse,
+    ListSessionItem, ListSessionResponse, DeletedSessionItem, ShellViewResponse,
     ShareSessionResponse, SharedSessionResponse
 )
 from app.interfaces.schemas.file import FileViewRequest, FileViewResponse
@@ -23,9 +23,12 @@ from app.interfaces.schemas.resource import AccessTokenRequest, SignedUrlRespons
 from app.interfaces.schemas.event import EventMapper
 from app.domain.models.file import FileInfo
 from app.domain.models.user import User
+from app.domain.models.session import Session
 
 logger = logging.getLogger(__name__)
-SESSION_POLL_INTERVAL = 5
+SESSION_EVENTS_PAGE_SIZE = 200
+SESSION_EVENTS_MAX_PAGE_SIZE = 1000
+SESSION_LIST_MAX_PAGE_SIZE = 200
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -44,18 +47,37 @@ async def create_session(
 @router.get("/{session_id}", response_model=APIResponse[GetSessionResponse])
 async def get_session(
     session_id: str,
+    after: Optional[str] = Query(None, description="Return events following this event ID"),
+    before: Optional[str] = Query(None, description="Return events preceding this event ID"),
+    limit: int = Query(SESSION_EVENTS_PAGE_SIZE, ge=1, le=SESSION_EVENTS_MAX_PAGE_SIZE),
+    summary: bool = Query(False, description="Omit tool arguments and content"),
     current_user: User = Depends(get_current_user),
     agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[GetSessionResponse]:
+    """Get a session with one page of its events
+
+    Without a cursor the latest events are returned. Pass the first returned
+    event ID as `before` to load older history, or the last one as `after`
+    to catch up on newer events.
+    """
+    if after and before:
+        raise BadRequestError("Only one of after and before can be given")
     session = await agent_service.get_session(session_id, current_user.id)
     if not session:
         raise NotFoundError("Session not found")
+    events, has_more = await agent_service.get_session_events_page(
+        session.id,
+        limit,
+        after_event_id=after,
+        before_event_id=before,
+    )
     return APIResponse.success(GetSessionResponse(
         session_id=session.id,
         title=session.title,
         status=session.status,
-        events=await EventMapper.events_to_sse_events(session.events),
-        is_shared=session.is_shared
+        events=await EventMapper.events_to_sse_events(events, summary=summary),
+        is_shared=session.is_shared,
+        has_more=has_more
     ))
 
 @router.delete("/{session_id}", response_model=APIResponse[None])
@@ -85,65 +107,102 @@ async def clear_unread_message_count(
     await agent_service.clear_unread_message_count(session_id, current_user.id)
     return APIResponse.success()
 
+def _to_list_session_item(session: Session) -> ListSessionItem:
+    return ListSessionItem(
+        session_id=session.id,
+        title=session.title,
+        status=session.status,
+        unread_message_count=session.unread_message_count,
+        latest_message=session.latest_message,
+        latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None,
+        is_shared=session.is_shared
+    )
+
 @router.get("", response_model=APIResponse[ListSessionResponse])
 async def get_all_sessions(
+    limit: Optional[int] = Query(None, ge=1, le=SESSION_LIST_MAX_PAGE_SIZE, description="Page size, all sessions if omitted"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     current_user: User = Depends(get_current_user),
     agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[ListSessionResponse]:
-    sessions = await agent_service.get_all_sessions(current_user.id)
-    session_items = [
-        ListSessionItem(
-            session_id=session.id,
-            title=session.title,
-            status=session.status,
-            unread_message_count=session.unread_message_count,
-            latest_message=session.latest_message,
-            latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None,
-            is_shared=session.is_shared
-        ) for session in sessions
-    ]
-    return APIResponse.success(ListSessionResponse(sessions=session_items))
+    """List the user's sessions, most recent message first
+
+    Pass a limit to page through the list, following next_cursor until it is null.
+    """
+    if limit is None:
+        if cursor:
+            raise BadRequestError("A cursor requires a limit")
+        sessions, next_cursor = await agent_service.get_all_sessions(current_user.id), None
+    else:
+        sessions, next_cursor = await agent_service.get_sessions_page(current_user.id, limit, cursor)
+    session_items = [_to_list_session_item(session) for session in sessions]
+    return APIResponse.success(ListSessionResponse(sessions=session_items, next_cursor=next_cursor))
 
 @router.post("")
 async def stream_sessions(
     current_user: User = Depends(get_current_user),
     agent_service: AgentService = Depends(get_agent_service)
 ) -> EventSourceResponse:
+    """Stream the session list
+
+    The full list is sent once as a `sessions` event. After that only changed
+    sessions are pushed as `session` events, and deleted ones as
+    `session_deleted`. The full list is sent again if notifications may have
+    been lost.
+    """
+    async def full_list_event() -> ServerSentEvent:
+        sessions = await agent_service.get_all_sessions(current_user.id)
+        return ServerSentEvent(
+            event="sessions",
+            data=ListSessionResponse(
+                sessions=[_to_list_session_item(session) for session in sessions]
+            ).model_dump_json()
+        )
+
     async def event_generator() -> AsyncGenerator[ServerSentEvent, None]:
-        while True:
-            sessions = await agent_service.get_all_sessions(current_user.id)
-            session_items = [
-                ListSessionItem(
-                    session_id=session.id,
-                    title=session.title,
-                    status=session.status,
-                    unread_message_count=session.unread_message_count,
-                    latest_message=session.latest_message,
-                    latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None,
-                    is_shared=session.is_shared
-                ) for session in sessions
-            ]
-            yield ServerSentEvent(
-                event="sessions",
-                data=ListSessionResponse(sessions=session_items).model_dump_json()
-            )
-            await asyncio.sleep(SESSION_POLL_INTERVAL)
+        # Subscribe before loading the list so no change slips in between
+        changes = await agent_service.subscribe_session_changes(current_user.id)
+        try:
+            yield await full_list_event()
+            while True:
+                changed = [await changes.get()]
+                while not changes.empty():
+                    changed.append(changes.get_nowait())
+                if None in changed:
+                    yield await full_list_event()
+                    continue
+                for session_id in dict.fromkeys(changed):
+                    session = await agent_service.get_session(session_id, current_user.id)
+                    if session:
+                        yield ServerSentEvent(
+                            event="session",
+                            data=_to_list_session_item(session).model_dump_json()
+                        )
+                    else:
+                        yield ServerSentEvent(
+                            event="session_deleted",
+                            data=DeletedSessionItem(session_id=session_id).model_dump_json()
+                        )
+        finally:
+            await agent_service.unsubscribe_session_changes(current_user.id, changes)
     return EventSourceResponse(event_generator())
 
 @router.post("/{session_id}/chat")
 async def chat(
     session_id: str,
     request: ChatRequest,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
     current_user: User = Depends(get_current_user),
     agent_service: AgentService = Depends(get_agent_service)
 ) -> EventSourceResponse:
+    """Stream a session's events, resuming after event_id or the Last-Event-ID header"""
     async def event_generator() -> AsyncGenerator[ServerSentEvent, None]:
         async for event in agent_service.chat(
             session_id=session_id,
             user_id=current_user.id,
             message=request.message,
             timestamp=datetime.fromtimestamp(request.timestamp) if request.timestamp else None,
-            event_id=request.event_id,
+            event_id=request.event_id or last_event_id,
             attachments=request.attachments
         ):
             logger.debug(f"Received event from chat: {event}")
@@ -151,6 +210,7 @@ async def chat(
             logger.debug(f"Received event: {sse_event}")
             if sse_event:
                 yield ServerSentEvent(
+                    id=event.id,
                     event=sse_event.event,
                     data=sse_event.data.model_dump_json() if sse_event.data else None
                 )
@@ -349,8 +409,7 @@ async def get_shared_session_files(
     agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[List[FileInfo]]:
     files = await agent_service.get_shared_session_files(session_id)
-    for file in files:
-        await get_file_service().enrich_with_file_url(file)
+    await get_file_service().enrich_with_file_urls(files)
     return APIResponse.success(files)
 
 
@@ -389,6 +448,6 @@ async def get_shared_session(
         session_id=session.id,
         title=session.title,
         status=session.status,
-        events=await EventMapper.events_to_sse_events(session.events),
+        events=await EventMapper.events_to_sse_events(await agent_service.get_session_events(session.id)),
         is_shared=session.is_shared
     ))
\ No newline at end of file
@@ -18,6 +18,7 @@ from app.application.services.token_service import TokenService
 from app.application.services.email_service import EmailService
 from app.application.services.scheduled_task_service import ScheduledTaskService
 from app.infrastructure.external.cache import get_cache
+from app.infrastructure.external.notifier import get_session_notifier
 from app.infrastructure.scheduler.scheduler_service import SchedulerService
 
 # Import all required dependencies for agent service
@@ -73,6 +74,8 @@ def get_agent_service() -> AgentService:
         file_storage=file_storage,
         search_engine=search_engine,
         mcp_repository=mcp_repository,
+        session_notifier=get_session_notifier(),
+        dispatch_to_workers=get_settings().agent_workers_enabled,
     )
 
 
@@ -112,6 +115,7 @@ def get_auth_service() -> AuthService:
     return AuthService(
         user_repository=user_repository,
         token_service=get_token_service(),
+        cache=get_cache(),
     )
 
 
@@ -15,6 +15,7 @@ from app.domain.models.event import (
     StepEvent,
     SkillEvent,
     SkillStatus,
+    QueuedEvent,
 )
 
 class BaseEventData(BaseModel):
@@ -69,13 +70,13 @@ class MessageSSEEvent(BaseSSEEvent):
     data: MessageEventData
 
     @classmethod
-    async def from_event_async(cls, event: MessageEvent) -> Self:
+    async def from_event_async(cls, event: MessageEvent, signed_urls: Optional[Dict[str, str]] = None) -> Self:
         return cls(
             data=MessageEventData(
                 **BaseEventData.base_event_data(event),
                 role=event.role,
                 content=event.message,
-                attachments=[await FileInfoResponse.from_file_info(attachment) for attachment in event.attachments] if event.attachments else None
+                attachments=[await FileInfoResponse.from_file_info(attachment, signed_urls) for attachment in event.attachments] if event.attachments else None
             )
         )
 
@@ -92,11 +93,16 @@ class ToolSSEEvent(BaseSSEEvent):
     data: ToolEventData
 
     @classmethod
-    async def from_event_async(cls, event: ToolEvent) -> Self:
+    async def from_event_async(cls, event: ToolEvent, signed_urls: Optional[Dict[str, str]] = None) -> Self:
         content = event.tool_content
         if isinstance(content, BrowserToolContent):
-            from app.interfaces.dependencies import get_file_service
-            content = BrowserToolContent(screenshot=await get_file_service().create_signed_url(content.screenshot))
+            if signed_urls is not None and content.screenshot in signed_urls:
+                screenshot_url = signed_urls[content.screenshot]
+            else:
+                from app.interfaces.dependencies import get_file_service
+                # Screenshots are uploaded in the background, so the file may not exist yet
+                screenshot_url = await get_file_service().create_signed_url(content.screenshot, verify_file=False)
+            content = BrowserToolContent(screenshot=screenshot_url)
         return cls(
             data=ToolEventData(
                 **BaseEventData.base_event_data(event),
@@ -109,6 +115,20 @@ class ToolSSEEvent(BaseSSEEvent):
             )
         )
 
+    @classmethod
+    def summary_from_event(cls, event: ToolEvent) -> Self:
+        """Build the event without arguments or content, so no file URLs need signing"""
+        return cls(
+            data=ToolEventData(
+                **BaseEventData.base_event_data(event),
+                tool_call_id=event.tool_call_id,
+                name=event.tool_name,
+                status=event.status,
+                function=event.function_name,
+                args={}
+            )
+        )
+
 class DoneSSEEvent(BaseSSEEvent):
     event: Literal["done"] = "done"
 
@@ -136,6 +156,26 @@ class SkillSSEEvent(BaseSSEEvent):
         )
 
 
+class QueuedEventData(BaseEventData):
+    position: int
+    eta_seconds: Optional[int] = None
+
+
+class QueuedSSEEvent(BaseSSEEvent):
+    event: Literal["queued"] = "queued"
+    data: QueuedEventData
+
+    @classmethod
+    def from_event(cls, event: QueuedEvent) -> Self:
+        return cls(
+            data=QueuedEventData(
+                **BaseEventData.base_event_data(event),
+                position=event.position,
+                eta_seconds=event.eta_seconds
+            )
+        )
+
+
 class ErrorEventData(BaseEventData):
     error: str
 
@@ -206,6 +246,7 @@ AgentSSEEvent = Union[
     ErrorSSEEvent,
     WaitSSEEvent,
     SkillSSEEvent,
+    QueuedSSEEvent,
 ]
 
 @dataclass
@@ -259,7 +300,14 @@ class EventMapper:
         return mapping
     
     @staticmethod
-    async def event_to_sse_event(event: AgentEvent) -> AgentSSEEvent:
+    async def event_to_sse_event(
+        event: AgentEvent,
+        summary: bool = False,
+        signed_urls: Optional[Dict[str, str]] = None,
+    ) -> AgentSSEEvent:
+        if summary and isinstance(event, ToolEvent):
+            return ToolSSEEvent.summary_from_event(event)
+
         # Get mapping dynamically
         event_type_mapping = EventMapper._get_event_type_mapping()
         
@@ -270,7 +318,7 @@ class EventMapper:
             # Prioritize from_event_async class method if exists, otherwise use from_event
             sse_event_class = event_mapping.sse_event_class
             if hasattr(sse_event_class, 'from_event_async'):
-                sse_event = await sse_event_class.from_event_async(event)
+                sse_event = await sse_event_class.from_event_async(event, signed_urls=signed_urls)
             else:
                 sse_event = sse_event_class.from_event(event)
             return sse_event
@@ -278,8 +326,43 @@ class EventMapper:
         return CommonEventData.from_event(event)
     
     @staticmethod
-    async def events_to_sse_events(events: List[AgentEvent]) -> List[AgentSSEEvent]:
-        """Create SSE event list from event list"""
-        return list(filter(lambda x: x is not None, [
-            await EventMapper.event_to_sse_event(event) for event in events if event
-        ]))
\ No newline at end of file
+    async def resolve_signed_urls(events: List[AgentEvent], summary: bool = False) -> Dict[str, str]:
+        """Sign the URLs of every file referenced by a batch of events at once
+
+        Screenshots are signed without a lookup since their upload may still be
+        running, attachments are verified with a single query.
+        """
+        from app.interfaces.dependencies import get_file_service
+        screenshot_ids = []
+        attachment_ids = []
+        for event in events:
+            if isinstance(event, ToolEvent) and not summary and isinstance(event.tool_content, BrowserToolContent):
+                screenshot_ids.append(event.tool_content.screenshot)
+            elif isinstance(event, MessageEvent) and event.attachments:
+                attachment_ids.extend(attachment.file_id for attachment in event.attachments)
+
+        file_service = get_file_service()
+        signed_urls = {}
+        if screenshot_ids:
+            signed_urls.update(await file_service.create_signed_urls(screenshot_ids, verify_files=False))
+        if attachment_ids:
+            signed_urls.update(await file_service.create_signed_urls(attachment_ids))
+        return signed_urls
+
+    @staticmethod
+    async def events_to_sse_events(events: List[AgentEvent], summary: bool = False) -> List[AgentSSEEvent]:
+        """Create SSE event list from event list
+
+        File URLs of the whole batch are resolved up front in bulk.
+
+        Args:
+            events: Events to map, in order
+            summary: Omit tool arguments and content
+        """
+        events = [event for event in events if event]
+        signed_urls = await EventMapper.resolve_signed_urls(events, summary)
+        sse_events = [
+            await EventMapper.event_to_sse_event(event, summary=summary, signed_urls=signed_urls)
+            for event in events
+        ]
+        return [sse_event for sse_event in sse_events if sse_event is not None]
\ No newline at end of file
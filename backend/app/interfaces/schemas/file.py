@@ -26,9 +26,13 @@ class FileInfoResponse(BaseModel):
     file_url: Optional[str]
 
     @staticmethod
-    async def from_file_info(file_info: FileInfo) -> "FileInfoResponse":
-        from app.interfaces.dependencies import get_file_service
-        file_service = get_file_service()
+    async def from_file_info(file_info: FileInfo, signed_urls: Optional[Dict[str, str]] = None) -> "FileInfoResponse":
+        """Build the response, taking the URL from signed_urls when it was resolved in bulk"""
+        if signed_urls is not None:
+            file_url = signed_urls.get(file_info.file_id)
+        else:
+            from app.interfaces.dependencies import get_file_service
+            file_url = await get_file_service().create_signed_url(file_info.file_id)
         return FileInfoResponse(
             file_id=file_info.file_id,
             filename=file_info.filename,
@@ -36,5 +40,5 @@ class FileInfoResponse(BaseModel):
             size=file_info.size,
             upload_date=file_info.upload_date,
             metadata=file_info.metadata,
-            file_url=await file_service.create_signed_url(file_info.file_id)
+            file_url=file_url
         )
@@ -29,6 +29,7 @@ class GetSessionResponse(BaseModel):
     status: SessionStatus
     events: List[AgentSSEEvent] = []
     is_shared: bool = False
+    has_more: bool = False  # Whether more events exist beyond the returned page
 
 
 class ListSessionItem(BaseModel):
@@ -42,9 +43,15 @@ class ListSessionItem(BaseModel):
     is_shared: bool = False
 
 
+class DeletedSessionItem(BaseModel):
+    """Deleted session notification schema"""
+    session_id: str
+
+
 class ListSessionResponse(BaseModel):
     """List session response schema"""
     sessions: List[ListSessionItem]
+    next_cursor: Optional[str] = None  # Pass as cursor to load the next page, None on the last page
 
 
 class ConsoleRecord(BaseModel):
@@ -7,17 +7,17 @@ import asyncio
 from app.core.config import get_settings
 from app.infrastructure.storage.mongodb import get_mongodb
 from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.browser.playwright_manager import get_playwright_manager
 from app.interfaces.dependencies import get_agent_service, get_scheduler_service
 from app.interfaces.api.routes import router
 from app.infrastructure.logging import setup_logging
 from app.interfaces.errors.exception_handlers import register_exception_handlers
-from app.infrastructure.models.documents import (
-    AgentDocument,
-    SessionDocument,
-    UserDocument,
-    ScheduledTaskDocument,
-    ScheduledTaskExecutionDocument
-)
+from app.infrastructure.models.documents import DOCUMENT_MODELS
+from app.infrastructure.repositories.mongo_session_repository import MongoSessionRepository
+from app.infrastructure.external.task.stream_sweeper import get_task_stream_sweeper
+from app.infrastructure.external.file.garbage_collector import get_file_blob_collector
+from app.infrastructure.external.task.task_registry import get_task_registry
+from app.infrastructure.external.task.redis_task import RedisStreamTask
 from beanie import init_beanie
 
 # Initialize logging system
@@ -40,19 +40,27 @@ async def lifespan(app: FastAPI):
     # Initialize Beanie
     await init_beanie(
         database=get_mongodb().client[settings.mongodb_database],
-        document_models=[
-            AgentDocument,
-            SessionDocument,
-            UserDocument,
-            ScheduledTaskDocument,
-            ScheduledTaskExecutionDocument
-        ]
+        document_models=DOCUMENT_MODELS
     )
     logger.info("Successfully initialized Beanie")
 
+    # Move events still embedded in old session documents into session_events
+    await MongoSessionRepository().migrate_embedded_events()
+
     # Initialize Redis
     await get_redis().initialize()
 
+    # Heartbeat task leases and follow cancel requests from other replicas
+    await get_task_registry().start(cancel_handler=RedisStreamTask.cancel_local)
+
+    # Start removing task streams left behind by crashed processes
+    stream_sweeper = get_task_stream_sweeper()
+    await stream_sweeper.start()
+
+    # Start deleting stored file content no file references anymore
+    blob_collector = get_file_blob_collector()
+    await blob_collector.start()
+
     # Start scheduler service
     scheduler_service = get_scheduler_service()
     await scheduler_service.start()
@@ -69,12 +77,10 @@ async def lifespan(app: FastAPI):
         await scheduler_service.stop()
         logger.info("Scheduler service stopped")
 
-        # Disconnect from MongoDB
-        await get_mongodb().shutdown()
-        # Disconnect from Redis
-        await get_redis().shutdown()
-
+        await stream_sweeper.stop()
+        await blob_collector.stop()
 
+        # Agents release their task leases through Redis, so they go first
         logger.info("Cleaning up AgentService instance")
         try:
             await asyncio.wait_for(get_agent_service().shutdown(), timeout=30.0)
@@ -84,6 +90,14 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Error during AgentService cleanup: {str(e)}")
 
+        # Disconnect from MongoDB
+        await get_mongodb().shutdown()
+        # Disconnect from Redis
+        await get_redis().shutdown()
+
+        # Stop the shared Playwright driver after agents released their browsers
+        await get_playwright_manager().shutdown()
+
 app = FastAPI(title="Manus AI Agent", lifespan=lifespan)
 
 # Configure CORS
@@ -0,0 +1,162 @@
+"""
+Agent worker entry point, run with `python -m app.worker`
+
+API servers started with AGENT_WORKERS_ENABLED only queue tasks and stream
+their output. Workers take the queued tasks and execute them, so agent flows
+no longer compete with request handling and both tiers scale independently.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import signal
+from typing import Any, Dict, Set
+
+from beanie import init_beanie
+
+from app.core.config import get_settings
+from app.domain.external.task import TaskPriority
+from app.infrastructure.logging import setup_logging
+from app.infrastructure.models.documents import DOCUMENT_MODELS
+from app.infrastructure.storage.mongodb import get_mongodb
+from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.browser.playwright_manager import get_playwright_manager
+from app.infrastructure.external.message_queue.redis_consumer_queue import RedisStreamConsumerQueue
+from app.infrastructure.external.task.redis_task import RedisStreamTask, get_agent_job_queue
+from app.infrastructure.external.task.task_registry import get_task_registry
+from app.interfaces.dependencies import get_agent_service, get_scheduled_task_service
+
+logger = logging.getLogger(__name__)
+
+# How long a job queue read blocks before checking for shutdown
+JOB_BLOCK_MS = 5000
+LOST_TASK_ERROR = "The task was lost while waiting for an agent worker, please send your message again"
+
+
+class AgentWorker:
+    """Run queued agent tasks in this process, up to a fixed number at once"""
+
+    def __init__(self, concurrency: int):
+        """
+        Args:
+            concurrency: Maximum number of tasks running at the same time
+        """
+        self._concurrency = max(concurrency, 1)
+        self._running: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop taking new jobs, running tasks are cancelled on shutdown"""
+        self._stopping.set()
+
+    async def _startup(self) -> None:
+        settings = get_settings()
+        await get_mongodb().initialize()
+        await init_beanie(
+            database=get_mongodb().client[settings.mongodb_database],
+            document_models=DOCUMENT_MODELS,
+        )
+        await get_redis().initialize()
+        await get_task_registry().start(cancel_handler=RedisStreamTask.cancel_local)
+        # Makes the scheduled task tool available to the flows run here
+        get_scheduled_task_service()
+
+    async def _shutdown(self) -> None:
+        try:
+            await asyncio.wait_for(get_agent_service().shutdown(), timeout=30.0)
+        except Exception as e:
+            logger.error(f"Error during AgentService cleanup: {str(e)}")
+        await get_mongodb().shutdown()
+        await get_redis().shutdown()
+        await get_playwright_manager().shutdown()
+
+    async def run(self) -> None:
+        """Take jobs from the queue until stopped"""
+        await self._startup()
+        job_queue = get_agent_job_queue()
+        logger.info(f"Agent worker started, running up to {self._concurrency} tasks")
+        try:
+            while not self._stopping.is_set():
+                if len(self._running) >= self._concurrency:
+                    await asyncio.wait(set(self._running), return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                job_id, data = await job_queue.pop(block_ms=JOB_BLOCK_MS)
+                if job_id is None:
+                    continue
+                execution = asyncio.create_task(self._execute(job_queue, job_id, json.loads(data)))
+                self._running.add(execution)
+                execution.add_done_callback(self._running.discard)
+        finally:
+            logger.info("Agent worker stopping")
+            await self._shutdown()
+
+    async def _execute(self, job_queue: RedisStreamConsumerQueue, job_id: str, job: Dict[str, Any]) -> None:
+        task_id = job["task_id"]
+        registry = get_task_registry()
+        taken = await registry.take_queued(task_id)
+        if not taken and await registry.queued_lease_lost(task_id):
+            # The node that queued the task went away, nobody streams its output anymore
+            await get_agent_service().fail_queued_task(job["session_id"], task_id, LOST_TASK_ERROR)
+        # The task lease tracks the task from here on, an unacknowledged job is redelivered
+        await job_queue.ack(job_id)
+        if not taken:
+            logger.info(f"Skipping task {task_id}, it was cancelled or taken by another worker")
+            return
+        try:
+            task = await get_agent_service().execute_task(
+                job["session_id"], task_id, TaskPriority(job.get("priority", TaskPriority.INTERACTIVE))
+            )
+        except Exception:
+            logger.exception(f"Failed to start task {task_id}")
+            task = None
+        if task is None:
+            await registry.release(task_id)
+            return
+        await task.wait()
+
+
+def _run_process(concurrency: int) -> None:
+    setup_logging()
+    worker = AgentWorker(concurrency)
+
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, worker.stop)
+        await worker.run()
+
+    asyncio.run(main())
+
+
+def main() -> None:
+    """Start the configured number of worker processes"""
+    settings = get_settings()
+    if settings.agent_worker_processes <= 1:
+        _run_process(settings.agent_worker_concurrency)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_run_process,
+            args=(settings.agent_worker_concurrency,),
+            name=f"agent-worker-{index}",
+        )
+        for index in range(settings.agent_worker_processes)
+    ]
+
+    def forward(signum, frame) -> None:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
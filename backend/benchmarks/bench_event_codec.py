@@ -0,0 +1,92 @@
+"""
+Microbenchmark of the per-event serialization work on the agent event path
+
+Each event is published to the task output stream, read back by the chat
+stream and persisted to MongoDB, including the BSON encoding of the inserted
+document. Compares the code path before the event codec, serializing twice
+for the stream and for MongoDB, and the shared serialization.
+
+Usage:
+    python -m benchmarks.bench_event_codec [iterations]
+"""
+import sys
+import timeit
+from datetime import datetime, UTC
+
+import bson
+from pydantic import TypeAdapter
+from beanie.odm.utils.encoder import Encoder
+
+from app.domain.models.event import (
+    AgentEvent,
+    MessageEvent,
+    PlanEvent,
+    PlanStatus,
+    ToolEvent,
+    ToolStatus,
+    BrowserToolContent,
+)
+from app.domain.models.plan import Plan, Step
+from app.domain.utils.event_codec import decode_event, document_to_json, event_to_document
+
+
+def sample_events():
+    return {
+        "message": MessageEvent(message="Here is the summary of the page " * 20),
+        "tool": ToolEvent(
+            tool_call_id="call_1",
+            tool_name="browser",
+            function_name="browser_navigate",
+            function_args={"url": "https://example.com", "load_media": False},
+            status=ToolStatus.CALLED,
+            tool_content=BrowserToolContent(screenshot="6650f1c2a8b4d3e5f7a9b1c3"),
+            function_result={"success": True, "data": "x" * 2000},
+        ),
+        "plan": PlanEvent(
+            plan=Plan(goal="Research", steps=[Step(description=f"Step {i}") for i in range(8)]),
+            status=PlanStatus.CREATED,
+        ),
+    }
+
+
+def persist(document):
+    """BSON encoding done by the driver for the inserted event document"""
+    bson.encode({"session_id": "session-1", "seq": 1, "event": document, "created_at": datetime.now(UTC)})
+
+
+def previous_path(event):
+    data = event.model_dump_json()
+    TypeAdapter(AgentEvent).validate_json(data)
+    persist(Encoder().encode(event))
+
+
+def twice_path(event):
+    data = event.model_dump_json()
+    decode_event(data)
+    persist(event.model_dump())
+
+
+def shared_path(event):
+    document = event_to_document(event)
+    decode_event(document_to_json(document))
+    persist(document)
+
+
+REPEATS = 5
+PATHS = {"previous": previous_path, "twice": twice_path, "shared": shared_path}
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'event':<10}" + "".join(f"{name + ' (us)':>16}" for name in PATHS))
+    for name, event in sample_events().items():
+        # Best of several runs, the others mostly measure noise from the rest of the machine
+        timings = [
+            min(timeit.repeat(lambda: path(event), number=iterations, repeat=REPEATS)) / iterations * 1e6
+            for path in PATHS.values()
+        ]
+        print(f"{name:<10}" + "".join(f"{timing:>16.1f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
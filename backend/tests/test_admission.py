@@ -0,0 +1,84 @@
+"""
+Unit tests for task admission control
+"""
+import asyncio
+from unittest.mock import Mock, AsyncMock
+
+from app.domain.external.task import TaskPriority
+from app.infrastructure.external.task.admission import TaskAdmissionController
+
+
+class TestTaskAdmissionController:
+    """Test node limits, priority order and queue position reports"""
+
+    def setup_method(self):
+        self.controller = TaskAdmissionController(node_limit=1, cluster_limit=0, lease_seconds=30, poll_seconds=0.05)
+        self.admitted = []
+        self.positions = {}
+
+    async def start(self, task_id, priority):
+        async def on_wait(position, eta_seconds):
+            self.positions.setdefault(task_id, []).append(position)
+
+        await self.controller.acquire(task_id, priority, on_wait)
+        self.admitted.append(task_id)
+
+    async def test_unlimited_admits_immediately(self):
+        controller = TaskAdmissionController(node_limit=0, cluster_limit=0, lease_seconds=30)
+        on_wait = AsyncMock()
+
+        await controller.acquire("task-1", TaskPriority.INTERACTIVE, on_wait)
+        on_wait.assert_not_awaited()
+
+    async def test_interactive_overtakes_scheduled(self):
+        await self.start("running", TaskPriority.INTERACTIVE)
+        scheduled = asyncio.create_task(self.start("scheduled", TaskPriority.SCHEDULED))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(self.start("interactive", TaskPriority.INTERACTIVE))
+        await asyncio.sleep(0.01)
+
+        assert self.positions == {"scheduled": [1, 2], "interactive": [1]}
+
+        await self.controller.release("running")
+        await interactive
+        assert self.admitted == ["running", "interactive"]
+
+        await self.controller.release("interactive")
+        await scheduled
+        assert self.admitted == ["running", "interactive", "scheduled"]
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        await self.start("running", TaskPriority.INTERACTIVE)
+        waiting = asyncio.create_task(self.start("waiting", TaskPriority.INTERACTIVE))
+        await asyncio.sleep(0.01)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+        assert self.controller._waiting == []
+
+    async def test_eta_follows_task_durations(self):
+        await self.start("first", TaskPriority.INTERACTIVE)
+        await self.controller.release("first")
+        on_wait = AsyncMock()
+        await self.start("running", TaskPriority.INTERACTIVE)
+
+        waiting = asyncio.create_task(self.controller.acquire("waiting", TaskPriority.INTERACTIVE, on_wait))
+        await asyncio.sleep(0.01)
+
+        on_wait.assert_awaited_once_with(1, 1)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+
+    async def test_cluster_position_reported_from_redis(self):
+        controller = TaskAdmissionController(node_limit=0, cluster_limit=2, lease_seconds=30, poll_seconds=0.01)
+        controller._redis = Mock()
+        controller._redis.initialize = AsyncMock()
+        controller._redis.client.eval = AsyncMock(side_effect=[3, 0])
+        on_wait = AsyncMock()
+
+        await controller.acquire("task-1", TaskPriority.SCHEDULED, on_wait)
+
+        on_wait.assert_awaited_once_with(3, None)
+        assert controller._redis.client.eval.await_count == 2
+        controller._heartbeat.cancel()
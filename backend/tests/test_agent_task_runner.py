@@ -0,0 +1,100 @@
+"""
+Unit tests for the agent task runner's event persistence
+"""
+from unittest.mock import Mock, AsyncMock
+
+from app.domain.models.event import MessageEvent, PlanEvent, PlanStatus, WaitEvent
+from app.domain.models.plan import Plan
+from app.domain.services.agent_task_runner import AgentTaskRunner
+from app.domain.utils.event_codec import encode_event
+
+
+class MemorySessionRepository:
+    """Keeps written events in memory and serves them like the MongoDB repository"""
+
+    def __init__(self):
+        self.events = []
+
+    async def add_events(self, session_id, events, fields=None, unread_increment=0, documents=None):
+        self.events.extend(events)
+
+    async def add_event(self, session_id, event):
+        self.events.append(event)
+
+    async def get_event_seq(self, session_id, event_id):
+        return next((seq for seq, event in enumerate(self.events, 1) if event.id == event_id), None)
+
+    async def get_last_event(self, session_id, event_type):
+        return next((event for event in reversed(self.events) if event.type == event_type), None)
+
+
+class PlanReadingFlow:
+    """Flow that records the plan it finds and emits a plan on the first run"""
+
+    def __init__(self, repository, task):
+        self._repository = repository
+        self._task = task
+        self.seen_plans = []
+
+    async def run(self, message):
+        plan_event = await self._repository.get_last_event("session-1", "plan")
+        self.seen_plans.append(plan_event.plan if plan_event else None)
+        if len(self.seen_plans) == 1:
+            yield PlanEvent(plan=Plan(title="First plan"), status=PlanStatus.CREATED)
+            # A new user message arrives while the flow is running
+            self._task.input_stream.is_empty.return_value = False
+        else:
+            yield WaitEvent()
+
+
+class TestAgentTaskRunner:
+    """Test that interrupted runs hand their events to the next run"""
+
+    def setup_method(self):
+        self.repository = MemorySessionRepository()
+        self.task = Mock()
+        self.task.input_stream.is_empty = AsyncMock(return_value=False)
+        self.task.input_stream.ack = AsyncMock()
+        self.task.output_stream.put = AsyncMock(side_effect=lambda data: f"{len(self.repository.events)}-1")
+        messages = iter([("1-0", MessageEvent(message="Start")), ("2-0", MessageEvent(message="Change"))])
+
+        async def pop():
+            event_id, event = next(messages)
+            self.task.input_stream.is_empty.return_value = True
+            return event_id, encode_event(event)
+
+        self.task.input_stream.pop = pop
+        # The first message starts the task, so chat has persisted it already
+        self.repository.events.append(MessageEvent(id="1-0", message="Start"))
+        self.runner = AgentTaskRunner(
+            session_id="session-1",
+            agent_id="agent-1",
+            user_id="user-1",
+            llm=Mock(),
+            sandbox=Mock(ensure_sandbox=AsyncMock()),
+            browser=Mock(),
+            agent_repository=Mock(),
+            session_repository=self.repository,
+            json_parser=Mock(),
+            file_storage=Mock(),
+            mcp_repository=Mock(get_mcp_config=AsyncMock()),
+        )
+        self.runner._mcp_tool = Mock(initialized=AsyncMock())
+        self.runner._screenshot_service = Mock(flush=AsyncMock())
+        self.flow = PlanReadingFlow(self.repository, self.task)
+        self.runner._flow = self.flow
+
+    async def test_interrupted_plan_visible_to_next_run(self):
+        await self.runner.run(self.task)
+
+        assert [plan.title if plan else None for plan in self.flow.seen_plans] == [None, "First plan"]
+
+    async def test_message_to_running_task_follows_buffered_events(self):
+        await self.runner.run(self.task)
+
+        assert [(event.type, getattr(event, "message", None)) for event in self.repository.events] == [
+            ("message", "Start"),
+            ("plan", None),
+            ("message", "Change"),
+            ("wait", None),
+        ]
@@ -0,0 +1,54 @@
+"""
+Unit tests for agent workers taking tasks from the job queue
+"""
+from unittest.mock import Mock, AsyncMock, patch
+
+import pytest
+
+from app.worker import AgentWorker, LOST_TASK_ERROR
+
+JOB = {"task_id": "task-1", "session_id": "session-1", "priority": 0}
+
+
+class TestAgentWorker:
+    """Test how a worker settles the jobs it pops"""
+
+    def setup_method(self):
+        self.registry = Mock()
+        self.registry.take_queued = AsyncMock(return_value=False)
+        self.registry.queued_lease_lost = AsyncMock(return_value=False)
+        self.agent_service = Mock()
+        self.agent_service.fail_queued_task = AsyncMock()
+        self.agent_service.execute_task = AsyncMock(return_value=None)
+        self.registry.release = AsyncMock()
+        self.job_queue = Mock()
+        self.job_queue.ack = AsyncMock()
+        self.worker = AgentWorker(concurrency=1)
+
+    async def _execute(self):
+        with patch("app.worker.get_task_registry", return_value=self.registry), \
+                patch("app.worker.get_agent_service", return_value=self.agent_service):
+            await self.worker._execute(self.job_queue, "job-1", JOB)
+
+    async def test_lost_task_reported_to_session(self):
+        self.registry.queued_lease_lost.return_value = True
+
+        await self._execute()
+
+        self.agent_service.fail_queued_task.assert_awaited_once_with("session-1", "task-1", LOST_TASK_ERROR)
+        self.job_queue.ack.assert_awaited_once_with("job-1")
+        self.agent_service.execute_task.assert_not_awaited()
+
+    async def test_cancelled_task_skipped_quietly(self):
+        await self._execute()
+
+        self.agent_service.fail_queued_task.assert_not_awaited()
+        self.job_queue.ack.assert_awaited_once_with("job-1")
+
+    async def test_job_not_acknowledged_when_take_fails(self):
+        self.registry.take_queued.side_effect = ConnectionError("Redis unavailable")
+
+        with pytest.raises(ConnectionError):
+            await self._execute()
+
+        self.job_queue.ack.assert_not_awaited()
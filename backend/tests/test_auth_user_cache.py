@@ -0,0 +1,78 @@
+"""
+Unit tests for caching users verified from access tokens
+"""
+from unittest.mock import Mock, AsyncMock
+
+from app.application.services.auth_service import AuthService
+from app.core.config import get_settings
+from app.domain.models.user import User
+
+
+class MemoryCache:
+    """Dict backed stand-in for the Cache interface"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=None, only_if_absent=False):
+        if only_if_absent and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.values.pop(key, None) is not None
+
+
+class TestAuthUserCache:
+    """Test token verification served from the cache"""
+
+    def setup_method(self):
+        self.user = User(id="user-1", fullname="Test User", email="test@example.com", password_hash="secret")
+        self.repository = Mock()
+        self.repository.get_user_by_id = AsyncMock(side_effect=lambda user_id: self.user.model_copy())
+        self.repository.update_user = AsyncMock(side_effect=lambda user: user)
+        token_service = Mock()
+        token_service.get_user_from_token = Mock(return_value={"id": "user-1", "fullname": "Test User"})
+        self.cache = MemoryCache()
+        self.service = AuthService(self.repository, token_service, cache=self.cache)
+        self.service.settings = get_settings().model_copy(
+            update={"auth_provider": "password", "auth_user_cache_ttl_seconds": 30}
+        )
+
+    async def test_repeated_verification_served_from_cache(self):
+        first = await self.service.verify_token("token")
+        second = await self.service.verify_token("token")
+
+        assert first.id == second.id == "user-1"
+        assert second.password_hash is None
+        self.repository.get_user_by_id.assert_awaited_once()
+
+    async def test_deactivation_invalidates_cached_user(self):
+        await self.service.verify_token("token")
+
+        await self.service.deactivate_user("user-1")
+        self.user.deactivate()
+
+        assert await self.service.verify_token("token") is None
+
+    async def test_user_read_before_deactivation_not_cached(self):
+        stale_user = self.user.model_copy()
+        reads = []
+
+        async def get_user_by_id(user_id):
+            reads.append(user_id)
+            if len(reads) == 1:
+                # The user is deactivated while this request still holds the old state
+                await self.service.deactivate_user("user-1")
+                self.user.deactivate()
+                return stale_user
+            return self.user.model_copy()
+
+        self.repository.get_user_by_id = AsyncMock(side_effect=get_user_by_id)
+        await self.service.verify_token("token")
+
+        assert await self.service.verify_token("token") is None
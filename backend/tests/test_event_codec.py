@@ -0,0 +1,43 @@
+"""
+Unit tests for the agent event codec
+"""
+from pydantic import TypeAdapter
+
+from app.domain.models.event import MessageEvent, WaitEvent, ToolEvent, ToolStatus, BrowserToolContent
+from app.domain.utils.event_codec import (
+    TaggedAgentEvent,
+    decode_event,
+    document_to_json,
+    encode_event,
+    event_to_document,
+)
+
+
+class TestEventCodec:
+    """Test event round trips"""
+
+    def test_round_trip_keeps_event_class(self):
+        event = ToolEvent(
+            tool_call_id="call_1",
+            tool_name="browser",
+            function_name="browser_view",
+            function_args={},
+            status=ToolStatus.CALLED,
+            tool_content=BrowserToolContent(screenshot="file-1"),
+        )
+
+        decoded = decode_event(encode_event(event))
+
+        assert isinstance(decoded, ToolEvent)
+        assert decoded == event
+
+    def test_decode_accepts_bytes(self):
+        assert isinstance(decode_event(encode_event(WaitEvent()).encode()), WaitEvent)
+
+    def test_document_round_trips_through_json_and_storage(self):
+        event = MessageEvent(message="hi")
+        document = event_to_document(event)
+
+        assert document["type"] == "message"
+        assert decode_event(document_to_json(document)) == event
+        assert TypeAdapter(TaggedAgentEvent).validate_python(document) == event
@@ -0,0 +1,104 @@
+"""
+Unit tests for the in-process output stream fan-out hub
+"""
+import asyncio
+
+from app.domain.services.event_stream_hub import EventStreamHub
+
+
+class MemoryStream:
+    """Append-only stream with the read semantics of a Redis stream"""
+
+    def __init__(self):
+        self.messages = []
+        self.reads = 0
+        self._changed = asyncio.Event()
+
+    async def put(self, data):
+        message_id = f"{len(self.messages) + 1}-0"
+        self.messages.append((message_id, data))
+        self._changed.set()
+        return message_id
+
+    async def get_latest_id(self):
+        return self.messages[-1][0] if self.messages else "0"
+
+    def _after(self, start_id, count):
+        start = int((start_id or "0").split("-")[0])
+        return self.messages[start:start + count]
+
+    async def get_batch(self, start_id=None, count=100, block_ms=None):
+        self.reads += 1
+        messages = self._after(start_id, count)
+        if messages or block_ms is None:
+            return messages
+        self._changed.clear()
+        try:
+            await asyncio.wait_for(self._changed.wait(), block_ms / 1000)
+        except asyncio.TimeoutError:
+            return []
+        return self._after(start_id, count)
+
+
+async def collect(subscription, count):
+    received = []
+    async for messages in subscription:
+        received.extend(message_id for message_id, _ in messages)
+        if len(received) >= count:
+            break
+    await subscription.aclose()
+    return received
+
+
+class TestEventStreamHub:
+    """Test catch-up, live fan-out and slow subscribers"""
+
+    async def test_subscriber_catches_up_then_follows_live(self):
+        stream = MemoryStream()
+        await stream.put("a")
+        await stream.put("b")
+        hub = EventStreamHub(stream, block_ms=1000)
+
+        reader = asyncio.create_task(collect(hub.subscribe("1-0"), 2))
+        await asyncio.sleep(0.01)
+        await stream.put("c")
+
+        assert await reader == ["2-0", "3-0"]
+        assert hub.subscriber_count == 0
+
+    async def test_subscribers_share_one_reader(self):
+        stream = MemoryStream()
+        hub = EventStreamHub(stream, block_ms=1000)
+
+        readers = [asyncio.create_task(collect(hub.subscribe(), 3)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        for data in "abc":
+            await stream.put(data)
+            await asyncio.sleep(0)
+
+        for reader in readers:
+            assert await reader == ["1-0", "2-0", "3-0"]
+        # A blocking read per arrival rather than one per subscriber
+        assert stream.reads <= 5
+
+    async def test_overflowed_subscriber_resumes_without_gaps(self):
+        stream = MemoryStream()
+        await stream.put("a")
+        hub = EventStreamHub(stream, batch_size=1, block_ms=1000, buffer_batches=1)
+        subscription = hub.subscribe()
+
+        first = await subscription.__anext__()
+        # The subscriber stops consuming while more than its buffer arrives
+        for data in "bcd":
+            await stream.put(data)
+            await asyncio.sleep(0.01)
+
+        rest = await collect(subscription, 3)
+        assert [message_id for message_id, _ in first] + rest == ["1-0", "2-0", "3-0", "4-0"]
+
+    async def test_unknown_start_id_replays_from_beginning(self):
+        stream = MemoryStream()
+        await stream.put("a")
+        hub = EventStreamHub(stream, block_ms=1000)
+
+        assert await collect(hub.subscribe("not-a-stream-id"), 1) == ["1-0"]
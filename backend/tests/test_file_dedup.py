@@ -0,0 +1,89 @@
+"""
+Unit tests for content-addressed file storage
+"""
+import hashlib
+import io
+from unittest.mock import Mock, AsyncMock
+
+from app.infrastructure.external.file.gridfsfile import GridFSFileStorage, _hash_content
+
+CONTENT = b"screenshot" * 1000
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+class NonSeekableStream(io.RawIOBase):
+    """Stream that can only be read forward, like a socket"""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+
+class TestHashContent:
+    """Test hashing streams before upload"""
+
+    def test_seekable_stream_is_rewound(self):
+        stream = io.BytesIO(CONTENT)
+
+        content, sha256, size = _hash_content(stream)
+
+        assert content is stream
+        assert (sha256, size) == (SHA256, len(CONTENT))
+        assert content.read() == CONTENT
+
+    def test_non_seekable_stream_is_spooled(self):
+        content, sha256, size = _hash_content(NonSeekableStream(CONTENT))
+
+        assert (sha256, size) == (SHA256, len(CONTENT))
+        assert content.read() == CONTENT
+
+
+class TestContentAddressedUpload:
+    """Test that identical content is stored once"""
+
+    def setup_method(self):
+        self.storage = GridFSFileStorage(mongodb=Mock())
+        self.blobs = Mock()
+        self.records = Mock()
+        self.records.insert_one = AsyncMock()
+        self.blob_bucket = Mock()
+        self.storage._get_blobs_collection = Mock(return_value=self.blobs)
+        self.storage._get_records_collection = Mock(return_value=self.records)
+        self.storage._get_blob_bucket = Mock(return_value=self.blob_bucket)
+
+    async def test_known_content_only_gains_a_reference(self):
+        self.blobs.find_one_and_update = AsyncMock(return_value={"_id": SHA256, "refcount": 2})
+
+        file_info = await self.storage.upload_file(io.BytesIO(CONTENT), "a.jpg", "user-1")
+
+        self.blob_bucket.open_upload_stream.assert_not_called()
+        record = self.records.insert_one.await_args.args[0]
+        assert record["sha256"] == SHA256
+        assert str(record["_id"]) == file_info.file_id
+        assert file_info.size == len(CONTENT)
+
+    async def test_new_content_is_uploaded_once(self):
+        grid_in = Mock(_id="grid-1", length=len(CONTENT), write=AsyncMock(), close=AsyncMock())
+        self.blob_bucket.open_upload_stream = Mock(return_value=grid_in)
+        self.blob_bucket.delete = AsyncMock()
+        self.blobs.find_one_and_update = AsyncMock(side_effect=[None, {"_id": SHA256, "gridfs_id": "grid-1"}])
+
+        await self.storage.upload_file(io.BytesIO(CONTENT), "a.jpg", "user-1")
+
+        grid_in.write.assert_awaited_once()
+        self.blob_bucket.delete.assert_not_awaited()
+
+    async def test_losing_concurrent_upload_drops_its_copy(self):
+        grid_in = Mock(_id="grid-2", length=len(CONTENT), write=AsyncMock(), close=AsyncMock())
+        self.blob_bucket.open_upload_stream = Mock(return_value=grid_in)
+        self.blob_bucket.delete = AsyncMock()
+        self.blobs.find_one_and_update = AsyncMock(side_effect=[None, {"_id": SHA256, "gridfs_id": "grid-1"}])
+
+        await self.storage.upload_file(io.BytesIO(CONTENT), "a.jpg", "user-1")
+
+        self.blob_bucket.delete.assert_awaited_once_with("grid-2")
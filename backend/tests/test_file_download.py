@@ -0,0 +1,85 @@
+"""
+Unit tests for streamed file downloads with range and conditional requests
+"""
+from datetime import datetime
+from unittest.mock import Mock, AsyncMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.domain.models.file import FileInfo
+from app.interfaces.api.file_routes import router
+from app.interfaces.dependencies import get_file_service, get_optional_current_user
+
+CONTENT = b"0123456789" * 10
+
+
+async def stream_file(file_id, start=0, end=None):
+    data = CONTENT[start:end]
+    for offset in range(0, len(data), 16):
+        yield data[offset:offset + 16]
+
+
+class TestFileDownload:
+    """Test download responses built from file metadata and streamed content"""
+
+    def setup_method(self):
+        file_info = FileInfo(
+            file_id="file-1",
+            filename="report.txt",
+            content_type="text/plain",
+            size=len(CONTENT),
+            upload_date=datetime(2024, 5, 1, 12, 0, 0),
+        )
+        self.file_service = Mock()
+        self.file_service.get_file_info = AsyncMock(return_value=file_info)
+        self.file_service.stream_file = Mock(side_effect=stream_file)
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_file_service] = lambda: self.file_service
+        app.dependency_overrides[get_optional_current_user] = lambda: None
+        self.client = TestClient(app)
+        self.url = "/files/file-1/download"
+
+    def test_full_download_streams_content(self):
+        response = self.client.get(self.url)
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-length"] == "100"
+        assert response.headers["etag"] == '"file-1-100"'
+        assert response.headers["last-modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=10-24"})
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[10:25]
+        assert response.headers["content-range"] == "bytes 10-24/100"
+        self.file_service.stream_file.assert_called_once_with("file-1", 10, 25)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=100-"})
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */100"
+
+    def test_stale_if_range_gets_whole_file(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    def test_matching_etag_not_modified(self):
+        response = self.client.get(self.url, headers={"If-None-Match": '"file-1-100"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        self.file_service.stream_file.assert_not_called()
+
+    def test_if_modified_since(self):
+        unchanged = self.client.get(self.url, headers={"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"})
+        changed = self.client.get(self.url, headers={"If-Modified-Since": "Tue, 30 Apr 2024 12:00:00 GMT"})
+
+        assert unchanged.status_code == 304
+        assert changed.status_code == 200
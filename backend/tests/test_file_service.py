@@ -0,0 +1,59 @@
+"""
+Unit tests for bulk signed URL creation in FileService
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+from app.application.services.file_service import FileService
+
+
+class TestCreateSignedUrls:
+    """Test bulk verification and signature caching"""
+
+    def setup_method(self):
+        self.file_storage = Mock()
+        self.file_storage.get_file_infos = AsyncMock(side_effect=lambda file_ids, user_id: {
+            file_id: Mock() for file_id in file_ids if file_id != "missing"
+        })
+        self.token_service = Mock()
+        self.token_service.create_signed_url = Mock(side_effect=lambda base_url, expire_minutes: f"{base_url}?sig")
+        self.service = FileService(self.file_storage, self.token_service)
+
+    async def test_one_lookup_for_many_files(self):
+        urls = await self.service.create_signed_urls(["a", "b", "missing", "a"])
+
+        assert urls == {"a": "/api/v1/files/a?sig", "b": "/api/v1/files/b?sig"}
+        self.file_storage.get_file_infos.assert_awaited_once_with(["a", "b", "missing"], None)
+
+    async def test_cached_signature_skips_lookup_and_signing(self):
+        await self.service.create_signed_urls(["a"])
+        await self.service.create_signed_urls(["a"])
+
+        assert self.file_storage.get_file_infos.await_count == 1
+        assert self.token_service.create_signed_url.call_count == 1
+
+    async def test_cache_does_not_cross_users(self):
+        await self.service.create_signed_urls(["a"], user_id="user-1")
+        await self.service.create_signed_urls(["a"], user_id="user-2")
+
+        assert self.file_storage.get_file_infos.await_count == 2
+
+    async def test_unverified_signing_needs_no_lookup(self):
+        urls = await self.service.create_signed_urls(["shot"], verify_files=False)
+
+        assert urls == {"shot": "/api/v1/files/shot?sig"}
+        self.file_storage.get_file_infos.assert_not_awaited()
+
+    async def test_single_missing_file_raises(self):
+        with pytest.raises(FileNotFoundError):
+            await self.service.create_signed_url("missing")
+
+    async def test_cached_signature_reports_remaining_lifetime(self):
+        with patch("app.application.services.file_service.time.time", return_value=1000.0):
+            _, expires_in = await self.service.create_signed_url_with_expiry("a", expire_minutes=30)
+        with patch("app.application.services.file_service.time.time", return_value=1600.0):
+            _, cached_expires_in = await self.service.create_signed_url_with_expiry("a", expire_minutes=30)
+
+        assert expires_in == 1800
+        assert cached_expires_in == 1200
+        assert self.token_service.create_signed_url.call_count == 1
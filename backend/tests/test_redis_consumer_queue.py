@@ -0,0 +1,52 @@
+"""
+Unit tests for the consumer group based Redis stream queue
+"""
+from unittest.mock import Mock, AsyncMock
+
+from app.infrastructure.external.message_queue.redis_consumer_queue import RedisStreamConsumerQueue
+
+
+class TestRedisStreamConsumerQueue:
+    """Test delivery, reclaim and emptiness checks"""
+
+    def setup_method(self):
+        self.client = Mock()
+        self.client.xgroup_create = AsyncMock()
+        self.client.xautoclaim = AsyncMock(return_value=["0-0", [], []])
+        self.client.xreadgroup = AsyncMock(return_value=[["task:input:1", [("1-0", {"data": "hello"})]]])
+        self.client.xpending_range = AsyncMock(return_value=[])
+        self.queue = RedisStreamConsumerQueue("task:input:1")
+        self.queue._redis = Mock()
+        self.queue._redis.client = self.client
+
+    async def test_pop_reads_new_message(self):
+        assert await self.queue.pop() == ("1-0", "hello")
+        self.client.xgroup_create.assert_awaited_once()
+        assert self.client.xreadgroup.call_args.args[2] == {"task:input:1": ">"}
+
+    async def test_pop_prefers_reclaimed_message(self):
+        self.client.xautoclaim = AsyncMock(return_value=["0-0", [("0-1", {"data": "lost"})], []])
+
+        assert await self.queue.pop() == ("0-1", "lost")
+        self.client.xreadgroup.assert_not_awaited()
+
+    async def test_reclaim_attempts_are_rate_limited(self):
+        await self.queue.pop()
+        await self.queue.pop()
+        assert self.client.xautoclaim.await_count == 1
+
+    async def test_own_in_flight_message_is_not_waiting(self):
+        await self.queue.pop()
+        self.client.xinfo_groups = AsyncMock(return_value=[
+            {"name": "consumers", "pending": 1, "lag": 0, "last-delivered-id": "1-0"}
+        ])
+
+        assert await self.queue.is_empty()
+        self.client.xpending_range.assert_not_awaited()
+
+    async def test_undelivered_message_is_waiting(self):
+        self.client.xinfo_groups = AsyncMock(return_value=[
+            {"name": "consumers", "pending": 0, "lag": 1, "last-delivered-id": "0-0"}
+        ])
+
+        assert not await self.queue.is_empty()
@@ -0,0 +1,47 @@
+"""
+Unit tests for the sandbox browser request interception policy
+"""
+from unittest.mock import Mock
+
+from app.infrastructure.external.browser.request_policy import RequestPolicy, RequestAction, TRACKER_DOMAINS
+
+
+class TestRequestPolicy:
+    """Test request decisions"""
+
+    def setup_method(self):
+        settings = Mock()
+        settings.browser_blocked_resource_types = "image, media,font"
+        settings.browser_block_trackers = True
+        settings.browser_blocked_domains = "ads.example.com"
+        self.policy = RequestPolicy.from_settings(settings)
+
+    def test_main_frame_document_always_allowed(self):
+        assert self.policy.action_for("document", "https://doubleclick.net/", main_frame=True) == RequestAction.ALLOW
+
+    def test_tracker_subdomain_blocked(self):
+        assert self.policy.action_for("script", "https://www.google-analytics.com/analytics.js") == RequestAction.BLOCK
+        assert self.policy.action_for("document", "https://cdn.ads.example.com/frame") == RequestAction.BLOCK
+
+    def test_similar_host_not_blocked(self):
+        assert self.policy.action_for("script", "https://notdoubleclick.net/app.js") == RequestAction.ALLOW
+
+    def test_images_stubbed_other_media_blocked(self):
+        assert self.policy.action_for("image", "https://example.com/a.png") == RequestAction.STUB
+        assert self.policy.action_for("font", "https://example.com/a.woff2") == RequestAction.BLOCK
+        assert self.policy.action_for("stylesheet", "https://example.com/a.css") == RequestAction.ALLOW
+
+    def test_allow_media_override(self):
+        self.policy.allow_media = True
+        assert self.policy.action_for("image", "https://example.com/a.png") == RequestAction.ALLOW
+        # Trackers stay blocked even when media is allowed
+        assert self.policy.action_for("image", "https://doubleclick.net/pixel.gif") == RequestAction.BLOCK
+
+    def test_disabled_policy(self):
+        settings = Mock()
+        settings.browser_blocked_resource_types = ""
+        settings.browser_block_trackers = False
+        settings.browser_blocked_domains = ""
+        policy = RequestPolicy.from_settings(settings)
+        assert not policy.enabled
+        assert "doubleclick.net" in TRACKER_DOMAINS
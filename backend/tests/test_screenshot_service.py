@@ -0,0 +1,91 @@
+"""
+Unit tests for screenshot capture, deduplication and background upload
+"""
+import io
+import pytest
+from unittest.mock import Mock, AsyncMock
+from PIL import Image, ImageDraw
+
+from app.domain.services.screenshot_service import ScreenshotService, difference_hash, hash_distance
+
+
+def make_image(text: str = "", image_format: str = "JPEG") -> bytes:
+    """Render a simple page-like image"""
+    image = Image.new("RGB", (640, 480), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 640, 60), fill="navy")
+    if text:
+        draw.rectangle((40, 120, 600, 400), fill="gray")
+        draw.text((60, 140), text, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=75)
+    return buffer.getvalue()
+
+
+class TestDifferenceHash:
+    """Test perceptual hashing"""
+
+    def test_same_image_same_hash(self):
+        assert difference_hash(make_image("a")) == difference_hash(make_image("a"))
+
+    def test_different_images_differ(self):
+        first = difference_hash(make_image())
+        second = difference_hash(make_image("content"))
+        assert hash_distance(first, second) > 0
+
+    def test_invalid_data_returns_none(self):
+        assert difference_hash(b"not an image") is None
+
+
+class TestScreenshotService:
+    """Test screenshot deduplication and upload scheduling"""
+
+    def setup_method(self):
+        self.browser = Mock()
+        self.file_storage = Mock()
+        self.file_storage.upload_file = AsyncMock()
+        self.file_storage.new_file_id = Mock(side_effect=["id-1", "id-2", "id-3"])
+        self.service = ScreenshotService(self.browser, self.file_storage, "user-1")
+
+    async def test_capture_uploads_in_background(self):
+        self.browser.screenshot = AsyncMock(return_value=make_image())
+
+        file_id = await self.service.capture()
+        await self.service.flush()
+
+        assert file_id == "id-1"
+        self.browser.screenshot.assert_awaited_once_with(image_format="jpeg", quality=75)
+        kwargs = self.file_storage.upload_file.call_args.kwargs
+        assert kwargs["file_id"] == "id-1"
+        assert kwargs["content_type"] == "image/jpeg"
+
+    async def test_duplicate_frame_reuses_file_id(self):
+        self.browser.screenshot = AsyncMock(return_value=make_image())
+
+        first = await self.service.capture()
+        second = await self.service.capture()
+        await self.service.flush()
+
+        assert first == second
+        assert self.file_storage.upload_file.await_count == 1
+
+    async def test_changed_frame_is_uploaded(self):
+        self.browser.screenshot = AsyncMock(side_effect=[make_image(), make_image("content")])
+
+        first = await self.service.capture()
+        second = await self.service.capture()
+        await self.service.flush()
+
+        assert first != second
+        assert self.file_storage.upload_file.await_count == 2
+
+    async def test_failed_upload_is_not_reused(self):
+        self.browser.screenshot = AsyncMock(return_value=make_image())
+        self.file_storage.upload_file = AsyncMock(side_effect=[RuntimeError("boom"), None])
+
+        first = await self.service.capture()
+        await self.service.flush()
+        second = await self.service.capture()
+        await self.service.flush()
+
+        assert first != second
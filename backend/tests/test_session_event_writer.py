@@ -0,0 +1,71 @@
+"""
+Unit tests for write-behind persistence of session events
+"""
+import asyncio
+from unittest.mock import Mock, AsyncMock
+
+import pytest
+
+from app.domain.models.event import DoneEvent, MessageEvent, TitleEvent
+from app.domain.services.session_event_writer import SessionEventWriter
+from app.domain.utils.event_codec import event_to_document
+
+
+class TestSessionEventWriter:
+    """Test batching and flush triggers"""
+
+    def setup_method(self):
+        self.repository = Mock()
+        self.repository.add_events = AsyncMock()
+        self.writer = SessionEventWriter(self.repository, "session-1", flush_interval=0.01, max_batch=10)
+
+    async def test_events_and_fields_written_together(self):
+        title, message = TitleEvent(title="Title"), MessageEvent(message="Hi")
+        self.writer.set_fields(title="Title")
+        await self.writer.add(title)
+        self.writer.increment_unread()
+        await self.writer.add(message)
+        self.repository.add_events.assert_not_awaited()
+
+        await asyncio.sleep(0.05)
+
+        self.repository.add_events.assert_awaited_once_with(
+            "session-1", [title, message], fields={"title": "Title"}, unread_increment=1,
+            documents=[event_to_document(title), event_to_document(message)],
+        )
+
+    async def test_terminal_event_flushes_immediately(self):
+        message, done = MessageEvent(message="Hi"), DoneEvent()
+        await self.writer.add(message)
+        await self.writer.add(done)
+
+        self.repository.add_events.assert_awaited_once_with(
+            "session-1", [message, done], fields={}, unread_increment=0,
+            documents=[event_to_document(message), event_to_document(done)],
+        )
+        await asyncio.sleep(0.05)
+        assert self.repository.add_events.await_count == 1
+
+    async def test_failed_timed_flush_raised_on_next_add(self):
+        self.repository.add_events.side_effect = ValueError("Session session-1 not found")
+        await self.writer.add(MessageEvent(message="Hi"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ValueError):
+            await self.writer.add(MessageEvent(message="Again"))
+
+    async def test_failed_batch_written_on_next_flush(self):
+        self.repository.add_events.side_effect = [ValueError("Connection reset"), None]
+        message = MessageEvent(message="Hi")
+        self.writer.set_fields(title="Title")
+        self.writer.increment_unread()
+        await self.writer.add(message)
+
+        with pytest.raises(ValueError):
+            await self.writer.flush()
+        await self.writer.flush()
+
+        self.repository.add_events.assert_awaited_with(
+            "session-1", [message], fields={"title": "Title"}, unread_increment=1,
+            documents=[event_to_document(message)],
+        )
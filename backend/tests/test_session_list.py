@@ -0,0 +1,57 @@
+"""
+Unit tests for paging through the session list
+"""
+from datetime import datetime, UTC
+from unittest.mock import Mock, AsyncMock
+
+import pytest
+
+from app.application.errors.exceptions import BadRequestError
+from app.application.services.agent_service import AgentService
+from app.domain.models.session import Session
+
+
+class TestSessionListPages:
+    """Test session list cursors"""
+
+    def setup_method(self):
+        self.repository = Mock()
+        self.repository.find_list_by_user_id = AsyncMock()
+        self.service = AgentService(
+            llm=Mock(),
+            agent_repository=Mock(),
+            session_repository=self.repository,
+            sandbox_cls=Mock(),
+            task_cls=Mock(),
+            json_parser=Mock(),
+            file_storage=Mock(),
+            mcp_repository=Mock(),
+        )
+
+    def sessions(self, count):
+        return [
+            Session(id=f"s{index}", user_id="u", agent_id="a", latest_message_at=datetime(2024, 5, 1, 12, 0, index))
+            for index in range(count)
+        ]
+
+    async def test_cursor_resumes_after_last_session(self):
+        self.repository.find_list_by_user_id.return_value = self.sessions(3)
+
+        sessions, cursor = await self.service.get_sessions_page("u", 2)
+        assert [session.id for session in sessions] == ["s0", "s1"]
+        self.repository.find_list_by_user_id.assert_awaited_with("u", limit=3, before=None)
+
+        await self.service.get_sessions_page("u", 2, cursor)
+        self.repository.find_list_by_user_id.assert_awaited_with(
+            "u", limit=3, before=(datetime(2024, 5, 1, 12, 0, 1, tzinfo=UTC), "s1")
+        )
+
+    async def test_last_page_has_no_cursor(self):
+        self.repository.find_list_by_user_id.return_value = self.sessions(2)
+
+        _, cursor = await self.service.get_sessions_page("u", 2)
+        assert cursor is None
+
+    async def test_invalid_cursor_rejected(self):
+        with pytest.raises(BadRequestError):
+            await self.service.get_sessions_page("u", 2, "yesterday_s1")
@@ -0,0 +1,58 @@
+"""
+Unit tests for the session metadata cache
+"""
+from unittest.mock import Mock, AsyncMock
+
+from app.domain.models.session import SessionMetadata
+from app.infrastructure.external.cache.session_metadata_cache import SessionMetadataCache
+
+
+class MemoryRedisClient:
+    """Minimal in-memory stand-in for the string commands used by the cache"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+class TestSessionMetadataCache:
+    """Test read-through fills and invalidation"""
+
+    def setup_method(self):
+        self.cache = SessionMetadataCache(ttl_seconds=300)
+        self.cache._redis = Mock()
+        self.cache._redis.initialize = AsyncMock()
+        self.cache._redis.client = MemoryRedisClient()
+        self.metadata = SessionMetadata(id="session-1", user_id="user-1", agent_id="agent-1")
+
+    async def test_filled_metadata_is_returned(self):
+        assert await self.cache.get("session-1") is None
+
+        await self.cache.fill(self.metadata)
+
+        assert await self.cache.get("session-1") == self.metadata
+
+    async def test_invalidation_blocks_stale_fill(self):
+        await self.cache.fill(self.metadata)
+        await self.cache.invalidate("session-1")
+        # A reader that loaded the session before the write tries to cache the old state
+        await self.cache.fill(self.metadata)
+
+        assert await self.cache.get("session-1") is None
+
+    async def test_disabled_cache_never_stores(self):
+        cache = SessionMetadataCache(ttl_seconds=0)
+        cache._redis = self.cache._redis
+
+        await cache.fill(self.metadata)
+
+        assert await cache.get("session-1") is None
+        assert cache._redis.client.values == {}
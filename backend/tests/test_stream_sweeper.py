@@ -0,0 +1,60 @@
+"""
+Unit tests for the orphaned task stream sweeper
+"""
+import time
+from unittest.mock import Mock, AsyncMock
+
+from app.infrastructure.external.task.stream_sweeper import TaskStreamSweeper
+
+
+def stream_id(seconds_ago: int) -> str:
+    return f"{int((time.time() - seconds_ago) * 1000)}-0"
+
+
+class TestTaskStreamSweeper:
+    """Test which streams a sweep removes"""
+
+    def setup_method(self):
+        self.client = Mock()
+        self.client.xlen = AsyncMock(return_value=5)
+        self.client.memory_usage = AsyncMock(return_value=1000)
+        self.client.delete = AsyncMock()
+        self.sweeper = TaskStreamSweeper(orphan_idle_seconds=3600, interval_seconds=60)
+        self.sweeper._redis = Mock()
+        self.sweeper._redis.initialize = AsyncMock()
+        self.sweeper._redis.client = self.client
+        self.sweeper._registry = Mock()
+        self.sweeper._registry.owner = AsyncMock(return_value=None)
+
+    def set_streams(self, streams):
+        async def scan_iter(**kwargs):
+            for key in streams:
+                yield key
+        self.client.scan_iter = scan_iter
+        self.client.ttl = AsyncMock(side_effect=lambda key: streams[key][0])
+        self.client.xrevrange = AsyncMock(
+            side_effect=lambda key, *args, **kwargs: [(streams[key][1], {})] if streams[key][1] else []
+        )
+
+    async def test_idle_stream_without_expiry_removed(self):
+        self.set_streams({
+            "task:output:old": (-1, stream_id(7200)),
+            "task:output:recent": (-1, stream_id(60)),
+            "task:output:expiring": (300, stream_id(7200)),
+        })
+
+        stats = await self.sweeper.sweep()
+
+        self.client.delete.assert_awaited_once_with("task:output:old")
+        assert stats.removed == 1
+        assert stats.streams == 2
+        assert stats.expiring == 1
+        assert stats.memory_bytes == 2000
+
+    async def test_empty_stream_without_expiry_removed(self):
+        self.set_streams({"task:input:empty": (-1, None)})
+
+        stats = await self.sweeper.sweep()
+
+        self.client.delete.assert_awaited_once_with("task:input:empty")
+        assert stats.streams == 0
@@ -0,0 +1,132 @@
+"""
+Unit tests for the Redis task registry and remote task handles
+"""
+from unittest.mock import Mock, AsyncMock, patch
+
+from app.infrastructure.external.task.redis_task import RedisStreamTask
+from app.infrastructure.external.task.task_registry import RedisTaskRegistry
+
+
+class FakePipeline:
+    """Collects pipelined commands and returns canned results"""
+
+    def __init__(self, results):
+        self.results = results
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    async def execute(self):
+        return self.results
+
+
+class TestRedisTaskRegistry:
+    """Test leases and control messages"""
+
+    def setup_method(self):
+        self.client = Mock()
+        self.client.set = AsyncMock()
+        self.client.get = AsyncMock(return_value=None)
+        self.client.eval = AsyncMock(return_value=1)
+        self.client.publish = AsyncMock()
+        self.registry = RedisTaskRegistry(lease_seconds=30)
+        self.registry._redis = Mock()
+        self.registry._redis.initialize = AsyncMock()
+        self.registry._redis.client = self.client
+
+    async def test_claim_sets_expiring_lease(self):
+        await self.registry.claim("task-1")
+
+        self.client.set.assert_awaited_once_with("task:lease:task-1", self.registry.node_id, px=30000)
+        assert await self.registry.owner("task-1") == self.registry.node_id
+        self.client.get.assert_not_awaited()
+
+    async def test_remote_task_runs_until_done_signal(self):
+        self.client.get = AsyncMock(return_value="other-node")
+
+        assert await self.registry.owner("task-1") == "other-node"
+        assert self.registry.is_running("task-1")
+
+        self.registry._dispatch({"action": "done", "task_id": "task-1"})
+        assert not self.registry.is_running("task-1")
+
+    async def test_release_publishes_done(self):
+        await self.registry.claim("task-1")
+        await self.registry.release("task-1")
+
+        assert not self.registry.is_running("task-1")
+        assert '"done"' in self.client.publish.call_args.args[1]
+
+    async def test_queued_task_runs_once_taken(self):
+        await self.registry.queue("task-1")
+        assert self.registry.is_running("task-1")
+
+        assert await self.registry.take_queued("task-1")
+        assert await self.registry.owner("task-1") == self.registry.node_id
+
+    async def test_queued_lease_renewed_until_taken(self):
+        await self.registry.queue("task-1")
+        self.client.set.assert_awaited_once_with("task:lease:task-1", "queued", px=30000)
+
+        pipeline = FakePipeline([1])
+        self.client.pipeline = Mock(return_value=pipeline)
+        await self.registry._renew_queued(list(self.registry._queued))
+        assert pipeline.commands[0][1][1:] == (1, "task:lease:task-1", "queued", 30000)
+        assert "task-1" in self.registry._queued
+
+        # A worker replaced the queued lease with its own
+        self.client.pipeline = Mock(return_value=FakePipeline([0]))
+        await self.registry._renew_queued(list(self.registry._queued))
+        assert "task-1" not in self.registry._queued
+
+    async def test_lost_queued_lease_told_apart_from_cancel(self):
+        self.client.pipeline = Mock(return_value=FakePipeline([0, 0]))
+        assert await self.registry.queued_lease_lost("task-1")
+
+        self.client.pipeline = Mock(return_value=FakePipeline([0, 1]))
+        assert not await self.registry.queued_lease_lost("task-1")
+
+    async def test_cancelled_queued_task_not_taken(self):
+        self.client.eval = AsyncMock(return_value=0)
+
+        assert not await self.registry.take_queued("task-1")
+        assert not self.registry.is_running("task-1")
+
+    async def test_cancel_only_handled_by_owner(self):
+        handler = Mock()
+        self.registry._cancel_handler = handler
+
+        self.registry._dispatch({"action": "cancel", "task_id": "task-1"})
+        handler.assert_not_called()
+
+        await self.registry.claim("task-1")
+        self.registry._dispatch({"action": "cancel", "task_id": "task-1"})
+        handler.assert_called_once_with("task-1")
+
+
+class TestRemoteRedisStreamTask:
+    """Test looking up tasks that run on another node"""
+
+    async def test_get_returns_handle_for_leased_task(self):
+        registry = Mock()
+        registry.owner = AsyncMock(return_value="other-node")
+        registry.is_running = Mock(return_value=True)
+        with patch("app.infrastructure.external.task.redis_task.get_task_registry", return_value=registry):
+            task = await RedisStreamTask.get("task-1")
+
+            assert task.id == "task-1"
+            assert not task.done
+            assert "task-1" not in RedisStreamTask._task_registry
+
+    async def test_get_returns_none_without_lease(self):
+        registry = Mock()
+        registry.owner = AsyncMock(return_value=None)
+        with patch("app.infrastructure.external.task.redis_task.get_task_registry", return_value=registry):
+            assert await RedisStreamTask.get("task-1") is None
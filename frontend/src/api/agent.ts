@@ -1,7 +1,7 @@
 // Backend API service
 import { apiClient, API_CONFIG, ApiResponse, createSSEConnection, SSECallbacks } from './client';
 import { AgentSSEEvent } from '../types/event';
-import { CreateSessionResponse, GetSessionResponse, ShellViewResponse, FileViewResponse, ListSessionResponse, SignedUrlResponse, ShareSessionResponse, SharedSessionResponse } from '../types/response';
+import { CreateSessionResponse, GetSessionResponse, ShellViewResponse, FileViewResponse, ListSessionResponse, SignedUrlResponse, ShareSessionResponse, SharedSessionResponse, SessionListSSEData } from '../types/response';
 import type { FileInfo } from './file';
 
 
@@ -15,18 +15,38 @@ export async function createSession(): Promise<CreateSessionResponse> {
   return response.data.data;
 }
 
-export async function getSession(sessionId: string): Promise<GetSessionResponse> {
-  const response = await apiClient.get<ApiResponse<GetSessionResponse>>(`/sessions/${sessionId}`);
+export interface GetSessionParams {
+  after?: string;
+  before?: string;
+  limit?: number;
+  summary?: boolean;
+}
+
+/**
+ * Get a session with one page of events, the latest ones by default
+ * @param sessionId Session ID
+ * @param params Pagination cursor, page size and summary mode
+ */
+export async function getSession(sessionId: string, params?: GetSessionParams): Promise<GetSessionResponse> {
+  const response = await apiClient.get<ApiResponse<GetSessionResponse>>(`/sessions/${sessionId}`, { params });
   return response.data.data;
 }
 
-export async function getSessions(): Promise<ListSessionResponse> {
-  const response = await apiClient.get<ApiResponse<ListSessionResponse>>('/sessions');
+export interface GetSessionsParams {
+  limit?: number;
+  cursor?: string;
+}
+
+export async function getSessions(params?: GetSessionsParams): Promise<ListSessionResponse> {
+  const response = await apiClient.get<ApiResponse<ListSessionResponse>>('/sessions', { params });
   return response.data.data;
 }
 
-export async function getSessionsSSE(callbacks?: SSECallbacks<ListSessionResponse>): Promise<() => void> {
-  return createSSEConnection<ListSessionResponse>(
+/**
+ * Stream the session list: a full `sessions` event first, then `session` and `session_deleted` changes
+ */
+export async function getSessionsSSE(callbacks?: SSECallbacks<SessionListSSEData>): Promise<() => void> {
+  return createSSEConnection<SessionListSSEData>(
     '/sessions',
     {
       method: 'POST'
@@ -5,6 +5,8 @@ export default {
   'New Chat': 'New Chat',
   'New Task': 'New Task',
   'Thinking': 'Thinking',
+  'Queued at position {position}': 'Queued at position {position}',
+  'Load earlier messages': 'Load earlier messages',
   'Task Progress': 'Task Progress',
   'Task Completed': 'Task Completed',
   'Create a task to get started': 'Create a task to get started',
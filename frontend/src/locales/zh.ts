@@ -5,6 +5,8 @@ export default {
   'New Chat': '新对话',
   'New Task': '新建任务',
   'Thinking': '思考中',
+  'Queued at position {position}': '排队中，第 {position} 位',
+  'Load earlier messages': '加载更早的消息',
   'Task Progress': '任务进度',
   'Task Completed': '任务已完成',
   'Create a task to get started': '新建一个任务以开始',
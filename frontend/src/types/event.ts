@@ -1,8 +1,8 @@
 import type { FileInfo } from '../api/file';
 
 export type AgentSSEEvent = {
-  event: 'tool' | 'step' | 'message' | 'error' | 'done' | 'title' | 'wait' | 'plan' | 'attachments';
-  data: ToolEventData | StepEventData | MessageEventData | ErrorEventData | DoneEventData | TitleEventData | WaitEventData | PlanEventData;
+  event: 'tool' | 'step' | 'message' | 'error' | 'done' | 'title' | 'wait' | 'plan' | 'attachments' | 'queued';
+  data: ToolEventData | StepEventData | MessageEventData | ErrorEventData | DoneEventData | TitleEventData | WaitEventData | PlanEventData | QueuedEventData;
 }
 
 export interface BaseEventData {
@@ -41,6 +41,11 @@ export interface DoneEventData extends BaseEventData {
 export interface WaitEventData extends BaseEventData {
 }
 
+export interface QueuedEventData extends BaseEventData {
+  position: number;
+  eta_seconds?: number;
+}
+
 export interface TitleEventData extends BaseEventData {
   title: string;
 }
@@ -17,6 +17,7 @@ export interface GetSessionResponse {
     status: SessionStatus;
     events: AgentSSEEvent[];
     is_shared: boolean;
+    has_more: boolean;
 }
 
 export interface ListSessionItem {
@@ -31,8 +32,15 @@ export interface ListSessionItem {
 
 export interface ListSessionResponse {
     sessions: ListSessionItem[];
+    next_cursor?: string | null;
 }
 
+export interface DeletedSessionItem {
+    session_id: string;
+}
+
+export type SessionListSSEData = ListSessionResponse | ListSessionItem | DeletedSessionItem;
+
 export interface ConsoleRecord {
     ps1: string;
     command: string;